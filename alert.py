@@ -1,10 +1,12 @@
-import requests
 import time
 import io
 from datetime import datetime
 import pytz
 from PIL import Image, ImageDraw, ImageFont
 
+from broker_sim import dhan_http
+from rate_limit import SCHEDULER
+
 # ──────────────────────────────────────────────
 # CONFIG
 # ──────────────────────────────────────────────
@@ -27,6 +29,9 @@ API_BASE        = "https://api.dhan.co/v2"
 OPTIONCHAIN_URL = f"{API_BASE}/optionchain"
 EXPIRY_LIST_URL = f"{API_BASE}/optionchain/expirylist"
 
+# requests, or the offline simulator / recorder when BROKER_SIM / BROKER_RECORD is set
+HTTP = dhan_http()
+
 INDICES = {
     "NIFTY":  {"Scrip": 13, "Segments": ["IDX_I", "NSE_FNO"], "step": 50},
     "SENSEX": {"Scrip": 1,  "Segments": ["BSE_FNO", "IDX_I"], "step": 100},
@@ -78,7 +83,7 @@ def fmt(val):
 def send_telegram_text(msg):
     for acc in TELEGRAM_ACCOUNTS:
         try:
-            requests.post(
+            HTTP.post(
                 f"https://api.telegram.org/bot{acc['token']}/sendMessage",
                 json={"chat_id": acc["chat_id"], "text": msg, "parse_mode": "Markdown"},
                 timeout=10
@@ -90,7 +95,7 @@ def send_telegram_text(msg):
 def send_telegram_image(img_bytes, caption=""):
     for acc in TELEGRAM_ACCOUNTS:
         try:
-            requests.post(
+            HTTP.post(
                 f"https://api.telegram.org/bot{acc['token']}/sendPhoto",
                 data={"chat_id": acc["chat_id"], "caption": caption, "parse_mode": "Markdown"},
                 files={"photo": ("table.png", img_bytes, "image/png")},
@@ -291,7 +296,8 @@ def fetch_and_alert(index_name, cfg):
     # Step 1: Get nearest expiry
     found_expiry, used_seg = None, None
     for seg in cfg["Segments"]:
-        r = requests.post(EXPIRY_LIST_URL,
+        SCHEDULER.acquire("dhan", "expirylist")
+        r = HTTP.post(EXPIRY_LIST_URL,
                           json={"UnderlyingScrip": cfg["Scrip"], "UnderlyingSeg": seg},
                           headers=_headers(), timeout=10)
         exp_list = r.json().get("data", [])
@@ -304,7 +310,8 @@ def fetch_and_alert(index_name, cfg):
         return
 
     # Step 2: Fetch option chain
-    r_oc = requests.post(OPTIONCHAIN_URL,
+    SCHEDULER.acquire("dhan", "optionchain")
+    r_oc = HTTP.post(OPTIONCHAIN_URL,
                          json={"UnderlyingScrip": cfg["Scrip"], "UnderlyingSeg": used_seg, "Expiry": found_expiry},
                          headers=_headers(), timeout=10)
     data_sec = r_oc.json().get("data", {})
@@ -2,13 +2,16 @@ from __future__ import annotations
 
 import os
 import sqlite3
-from datetime import datetime, timedelta
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import date, datetime, timedelta
 from pathlib import Path
 from typing import Any
 from zoneinfo import ZoneInfo
 
+import numpy as np
 import pandas as pd
-import requests
 import streamlit as st
 
 try:
@@ -16,13 +19,65 @@ try:
 except Exception:  # pragma: no cover
     st_autorefresh = None
 
-from fyers_client import FyersDataClient, fyers_credentials_source
+from chain_stream import chain_stream
+from fyers_client import SHARED_RESPONSES, FyersDataClient, fyers_credentials_source
+from gex import gex_profile
+from greeks import GREEK_FIELDS, chain_greek_columns, years_to_expiry
+from history_store import HistoryStore, Statement, history_store
+from oi_levels import chain_levels
+from rate_limit import SCHEDULER
+from single_flight import SingleFlightCache
+from snapshot_archive import default_archive_path, write_day
+from supabase_client import UpsertTarget, pooled_session, rest_headers, upsert_rows, write_queue
+from zone_stream import Zone, zone_stream
 
 
 IST = ZoneInfo("Asia/Kolkata")
 DB_PATH = Path(__file__).resolve().with_name("option_chain_history.sqlite3")
+ARCHIVE_PATH = default_archive_path()
 AUTO_REFRESH_MS = 60_000
+STREAM_REFRESH_MS = 10_000
 SNAPSHOT_TABLE = "option_chain_snapshots"
+SUMMARY_TABLE = "option_chain_summaries"
+ROLLUP_TABLE = "option_chain_rollups"
+# Bucket width in minutes for each rollup kept next to the 1-minute rows.
+ROLLUP_MINUTES = {"5m": 5, "15m": 15, "1d": 1440}
+HISTORY_RESOLUTIONS = ("1m", *ROLLUP_MINUTES)
+FETCH_TIMEOUT_S = 15.0
+SNAPSHOT_CACHE_SECONDS = 60.0
+STALE_SNAPSHOT_MINUTES = 3
+TABLE_CSS = {
+    "ce_volume": "background-color: #dcfce7; color: #0f172a; font-weight: 800;",
+    "ce_oi": "background-color: #dbeafe; color: #0f172a; font-weight: 800;",
+    "pe_volume": "background-color: #fef3c7; color: #0f172a; font-weight: 800;",
+    "pe_oichg": "background-color: #fce7f3; color: #0f172a; font-weight: 800;",
+    "bullish_tag": "background-color: #dcfce7; color: #0f172a; font-weight: 900;",
+    "bearish_tag": "background-color: #fee2e2; color: #0f172a; font-weight: 900;",
+    "atm": "background-color: #fff7cc; color: #0f172a; font-weight: 900;",
+}
+# The history table is a plain frame with column_config, so delta tones are marks in the text instead of cell colours.
+DELTA_MARKS = {"up": "▲ ", "down": "▼ ", "flat": "· "}
+DELTA_HELP = "▲ rose, ▼ fell, · unchanged since the previous row."
+HISTORY_COLUMN_CONFIG = {
+    "LTP": st.column_config.NumberColumn("LTP", format="%.2f"),
+    "Δ Volume": st.column_config.TextColumn("Δ Volume", help=DELTA_HELP),
+    "Δ OI": st.column_config.TextColumn("Δ OI", help=DELTA_HELP),
+    "OI Chg %": st.column_config.TextColumn("OI Chg %", help=DELTA_HELP),
+}
+# One trading session of 1-minute summaries.
+BIAS_HISTORY_LIMIT = 375
+LEVEL_FIELDS = ("max_pain", "call_wall", "put_wall")
+GEX_FIELDS = ("net_gex", "gamma_flip")
+SUMMARY_FIELDS = ("bias_score", *LEVEL_FIELDS, *GEX_FIELDS)
+HISTORY_COLUMNS = ("snapshot_ts", "snapshot_minute", "ltp", "ltp_change_pct", "volume", "oi", "oi_change_pct", "oi_change", "iv")
+ARCHIVE_ROW_COLUMNS = ("snapshot_ts", "symbol", "strike", "option_type", "option_symbol", "ltp", "ltp_change_pct", "volume", "oi", "oi_change_pct", "oi_change", "iv")
+STRIKE_HISTORY_COLUMNS = ("option_type", *HISTORY_COLUMNS, "volume_delta", "oi_delta", "oi_pct_delta")
+SUMMARY_HISTORY_COLUMNS = ("snapshot_ts", "snapshot_minute", "spot", *SUMMARY_FIELDS)
+# FYERS reports option OI in units, so GEX needs no lot-size multiplier.
+GEX_UNITS_PER_OI = 1.0
+# Solved IV/greek columns keyed by chain and minute, shared by reruns and sessions.
+GREEK_CACHE = SingleFlightCache(maxsize=32, ttl=120.0)
+MISSING_EXPIRY_NOTICE = "Stored collector snapshots carry no contract expiries, so greeks and GEX are only shown for live chains."
 
 INDEXES = {
     "NIFTY": {"symbol": "NSE:NIFTY50-INDEX", "step": 50, "label": "NIFTY 50"},
@@ -32,11 +87,53 @@ INDEXES = {
     "SENSEX": {"symbol": "BSE:SENSEX-INDEX", "step": 100, "label": "SENSEX"},
 }
 
+CHAIN_COLUMNS = [
+    "Strike",
+    "IV",
+    "CE Symbol",
+    "CE Volume",
+    "CE OI",
+    "CE OI Chg",
+    "CE OI Chg %",
+    "CE Change",
+    "CE LTP",
+    "PE Symbol",
+    "PE LTP",
+    "PE Change",
+    "PE OI Chg %",
+    "PE OI Chg",
+    "PE OI",
+    "PE Volume",
+]
+
+# Snapshot row field -> normalized chain column suffix, shared by both legs.
+LEG_FIELDS = {
+    "option_symbol": "Symbol",
+    "ltp": "LTP",
+    "ltp_change_pct": "Change",
+    "volume": "Volume",
+    "oi": "OI",
+    "oi_change_pct": "OI Chg %",
+    "oi_change": "OI Chg",
+}
+LEG_INDEX = {"CE": 0, "PE": 1}
+SIGNAL_TOP_N = 5
+
+_SIGNAL_TAGS: dict[int, tuple[weakref.ref, int, pd.DataFrame]] = {}
+
 
 def now_ist() -> datetime:
     return datetime.now(IST)
 
 
+def warn(message: str) -> None:
+    # The collector imports this module outside a Streamlit session.
+    if st.runtime.exists():
+        st.warning(message)
+    else:
+        print(f"[warn] {message}", flush=True)
+
+
 def as_bucket(value: Any) -> str:
     try:
         num = float(value or 0)
@@ -93,8 +190,7 @@ def infer_oi_change(current_oi: float, oi_change_pct: float) -> float:
     return current_oi * oi_change_pct / denom
 
 
-def ensure_db() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+def init_history_schema(conn: sqlite3.Connection) -> None:
     conn.execute(
         """
         CREATE TABLE IF NOT EXISTS option_chain_snapshots (
@@ -110,12 +206,64 @@ def ensure_db() -> sqlite3.Connection:
             oi_change_pct REAL,
             oi_change REAL,
             iv REAL,
+            option_symbol TEXT,
             PRIMARY KEY (snapshot_minute, symbol, strike, option_type)
         )
         """
     )
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(option_chain_snapshots)")}
+    if "option_symbol" not in columns:
+        conn.execute("ALTER TABLE option_chain_snapshots ADD COLUMN option_symbol TEXT")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_snap_lookup ON option_chain_snapshots(symbol, strike, option_type, snapshot_ts)")
-    return conn
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS option_chain_summaries (
+            snapshot_ts TEXT NOT NULL,
+            snapshot_minute TEXT NOT NULL,
+            symbol TEXT NOT NULL,
+            spot REAL,
+            bias_score REAL,
+            max_pain REAL,
+            call_wall REAL,
+            put_wall REAL,
+            net_gex REAL,
+            gamma_flip REAL,
+            PRIMARY KEY (snapshot_minute, symbol)
+        )
+        """
+    )
+    summary_columns = {row[1] for row in conn.execute("PRAGMA table_info(option_chain_summaries)")}
+    for name in SUMMARY_FIELDS:
+        if name not in summary_columns:
+            conn.execute(f"ALTER TABLE option_chain_summaries ADD COLUMN {name} REAL")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_summary_lookup ON option_chain_summaries(symbol, snapshot_ts)")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS option_chain_rollups (
+            resolution TEXT NOT NULL,
+            symbol TEXT NOT NULL,
+            strike INTEGER NOT NULL,
+            option_type TEXT NOT NULL,
+            bucket_ts TEXT NOT NULL,
+            bucket_minute TEXT NOT NULL,
+            first_ts TEXT NOT NULL,
+            last_ts TEXT NOT NULL,
+            ltp REAL,
+            ltp_change_pct REAL,
+            volume REAL,
+            oi_open REAL,
+            oi REAL,
+            oi_change_pct REAL,
+            iv REAL,
+            PRIMARY KEY (resolution, symbol, strike, option_type, bucket_ts)
+        ) WITHOUT ROWID
+        """
+    )
+
+
+def history_db() -> HistoryStore:
+    # Opened once per database path; reruns reuse its connections and writer thread.
+    return history_store(DB_PATH, init_history_schema)
 
 
 def secret_value(key: str, default: str = "") -> str:
@@ -136,6 +284,8 @@ def secret_value(key: str, default: str = "") -> str:
         "SUPABASE_ANON_KEY": ("supabase", "anon_key"),
         "SUPABASE_SERVICE_ROLE_KEY": ("supabase", "service_role_key"),
         "SUPABASE_TABLE": ("supabase", "table"),
+        "SUPABASE_SUMMARY_TABLE": ("supabase", "summary_table"),
+        "SNAPSHOT_SOURCE": ("app", "snapshot_source"),
     }
     section_key = section_map.get(key)
     if section_key is None:
@@ -157,9 +307,16 @@ def supabase_config() -> dict[str, str]:
         or secret_value("SUPABASE_ANON_KEY")
     )
     table = secret_value("SUPABASE_TABLE", SNAPSHOT_TABLE) or SNAPSHOT_TABLE
+    summary_table = secret_value("SUPABASE_SUMMARY_TABLE", SUMMARY_TABLE) or SUMMARY_TABLE
+    rollup_table = secret_value("SUPABASE_ROLLUP_TABLE", ROLLUP_TABLE) or ROLLUP_TABLE
     if not url or not key:
         return {}
-    return {"url": url, "key": key, "table": table}
+    return {"url": url, "key": key, "table": table, "summary_table": summary_table, "rollup_table": rollup_table}
+
+
+def snapshot_source() -> str:
+    source = secret_value("SNAPSHOT_SOURCE", "live").lower()
+    return source if source in {"live", "collector"} else "live"
 
 
 def storage_source() -> str:
@@ -170,115 +327,292 @@ def storage_source() -> str:
 
 
 def supabase_headers(prefer: str | None = None) -> dict[str, str]:
-    cfg = supabase_config()
-    headers = {
-        "apikey": cfg["key"],
-        "Authorization": f"Bearer {cfg['key']}",
-        "Content-Type": "application/json",
-    }
-    if prefer:
-        headers["Prefer"] = prefer
-    return headers
+    return rest_headers(supabase_config()["key"], prefer)
 
 
-def upsert_snapshots_supabase(rows: list[dict[str, Any]]) -> bool:
+def supabase_target(table_key: str = "table") -> UpsertTarget | None:
     cfg = supabase_config()
-    if not cfg or not rows:
-        return False
+    if not cfg:
+        return None
+    conflict = "snapshot_minute,symbol,strike,option_type" if table_key == "table" else "snapshot_minute,symbol"
+    return UpsertTarget(url=f"{cfg['url']}/rest/v1/{cfg[table_key]}", api_key=cfg["key"], on_conflict=conflict)
 
-    url = f"{cfg['url']}/rest/v1/{cfg['table']}"
-    params = {"on_conflict": "snapshot_minute,symbol,strike,option_type"}
-    response = requests.post(
-        url,
-        params=params,
-        headers=supabase_headers("resolution=merge-duplicates"),
-        json=rows,
-        timeout=20,
-    )
-    response.raise_for_status()
+
+def upsert_snapshots_supabase(rows: list[dict[str, Any]], table_key: str = "table") -> bool:
+    target = supabase_target(table_key)
+    if target is None or not rows:
+        return False
+    upsert_rows(target, rows)
     return True
 
 
-def load_history_supabase(symbol: str, strike: int, option_type: str, limit: int) -> pd.DataFrame | None:
+def load_history_supabase(symbol: str, strike: int, option_type: str, limit: int, resolution: str = "1m") -> pd.DataFrame | None:
     cfg = supabase_config()
     if not cfg:
         return None
 
-    url = f"{cfg['url']}/rest/v1/{cfg['table']}"
     params = {
-        "select": "snapshot_ts,snapshot_minute,ltp,ltp_change_pct,volume,oi,oi_change_pct,oi_change,iv",
+        "select": ",".join(HISTORY_COLUMNS),
         "symbol": f"eq.{symbol}",
         "strike": f"eq.{int(strike)}",
         "option_type": f"eq.{option_type}",
         "order": "snapshot_ts.desc",
         "limit": str(limit),
     }
-    response = requests.get(url, params=params, headers=supabase_headers(), timeout=20)
+    if resolution == "1m":
+        url = f"{cfg['url']}/rest/v1/{cfg['table']}"
+    else:
+        url = f"{cfg['url']}/rest/v1/{cfg['rollup_table']}"
+        params.update(
+            select="snapshot_ts:bucket_ts,snapshot_minute:bucket_minute,ltp,ltp_change_pct,volume,oi,oi_change_pct,oi_open,iv",
+            resolution=f"eq.{resolution}",
+            order="bucket_ts.desc",
+        )
+    response = pooled_session().get(url, params=params, headers=supabase_headers(), timeout=20)
     response.raise_for_status()
-    return pd.DataFrame(response.json()).sort_values("snapshot_ts").reset_index(drop=True)
+    df = pd.DataFrame(response.json(), columns=[*HISTORY_COLUMNS, "oi_open"])
+    if resolution != "1m":
+        df["oi_change"] = pd.to_numeric(df["oi"]) - pd.to_numeric(df["oi_open"])
+    return df[list(HISTORY_COLUMNS)]
+
+
+def history_leg_query(resolution: str) -> tuple[str, tuple[Any, ...]]:
+    """SQL for one contract's newest rows at a resolution, plus the params that precede (symbol, strike, option_type, limit)."""
+    if resolution == "1m":
+        return (
+            f"SELECT option_type, {', '.join(HISTORY_COLUMNS)} FROM option_chain_snapshots"
+            " WHERE symbol = ? AND strike = ? AND option_type = ? ORDER BY snapshot_ts DESC LIMIT ?",
+            (),
+        )
+    # A bucket reports its closing values; its OI change is close minus open.
+    return (
+        "SELECT option_type, bucket_ts AS snapshot_ts, bucket_minute AS snapshot_minute, ltp, ltp_change_pct, volume, oi,"
+        " oi_change_pct, oi - oi_open AS oi_change, iv FROM option_chain_rollups"
+        " WHERE resolution = ? AND symbol = ? AND strike = ? AND option_type = ? ORDER BY bucket_ts DESC LIMIT ?",
+        (resolution,),
+    )
 
 
-def fetch_snapshot(client: FyersDataClient, symbol: str, strikecount: int) -> tuple[float, list[dict[str, Any]]]:
-    quote_resp = client.fyers.quotes(data={"symbols": symbol})
+@st.cache_resource(show_spinner=False)
+def fetch_executor() -> ThreadPoolExecutor:
+    # One quote call plus one chain call per index can be in flight at once.
+    return ThreadPoolExecutor(max_workers=len(INDEXES) + 2, thread_name_prefix="fyers-fetch")
+
+
+def fetch_quotes(client: FyersDataClient, symbols: list[str]) -> dict[str, float]:
+    quote_resp = client.call("quotes", {"symbols": ",".join(symbols)}, cache_seconds=SNAPSHOT_CACHE_SECONDS)
     if quote_resp.get("s") != "ok":
         raise RuntimeError(quote_resp.get("message", "Unable to fetch underlying quote."))
-    spot = safe_float(quote_resp["d"][0]["v"].get("lp", 0))
-
-    chain_resp = client.fyers.optionchain(data={"symbol": symbol, "strikecount": strikecount, "timestamp": "", "greeks": "1"})
+    spots: dict[str, float] = {}
+    for item in quote_resp.get("d", []):
+        values = item.get("v", {})
+        name = str(item.get("n") or values.get("symbol") or "").strip()
+        spots[name] = safe_float(values.get("lp", 0))
+    if len(symbols) == 1 and symbols[0] not in spots and quote_resp.get("d"):
+        spots[symbols[0]] = safe_float(quote_resp["d"][0]["v"].get("lp", 0))
+    return spots
+
+
+def fetch_chain(client: FyersDataClient, symbol: str, strikecount: int) -> list[dict[str, Any]]:
+    chain_resp = client.call(
+        "optionchain",
+        {"symbol": symbol, "strikecount": strikecount, "timestamp": "", "greeks": "1"},
+        cache_seconds=SNAPSHOT_CACHE_SECONDS,
+    )
     if chain_resp.get("s") != "ok":
         raise RuntimeError(chain_resp.get("message", "Unable to fetch FYERS option chain."))
-    return spot, chain_resp.get("data", {}).get("optionsChain", [])
+    data = chain_resp.get("data", {})
+    contracts = data.get("optionsChain", [])
+    # Without an explicit expiry FYERS returns the nearest one, listed first in expiryData.
+    expiries = data.get("expiryData") or []
+    expiry = safe_float(expiries[0].get("expiry", 0)) if expiries else 0.0
+    if not expiry:
+        return contracts
+    return [contract if "expiry" in contract else {**contract, "expiry": expiry} for contract in contracts]
 
 
-def normalize_chain(spot: float, options_chain: list[dict[str, Any]], step: int, strikecount: int) -> pd.DataFrame:
-    grouped: dict[int, dict[str, dict[str, Any]]] = {}
-    for contract in options_chain:
-        strike = safe_int(contract.get("strike_price"))
-        side = str(contract.get("option_type", "")).upper().strip()
-        if strike > 0 and side in {"CE", "PE"}:
-            grouped.setdefault(strike, {})[side] = contract
+def _wait(future: Any, deadline: float, label: str) -> Any:
+    try:
+        return future.result(timeout=max(deadline - time.monotonic(), 0.0))
+    except FutureTimeout as exc:
+        future.cancel()
+        raise RuntimeError(f"FYERS {label} request timed out.") from exc
 
-    center = step_round(spot, step) if spot else 0
-    strikes = [center + (i * step) for i in range(-strikecount, strikecount + 1)]
 
-    rows: list[dict[str, Any]] = []
-    for strike in strikes:
-        ce = grouped.get(strike, {}).get("CE", {})
-        pe = grouped.get(strike, {}).get("PE", {})
+def fetch_snapshots(
+    client: FyersDataClient,
+    symbols: list[str],
+    strikecount: int,
+    timeout: float = FETCH_TIMEOUT_S,
+) -> tuple[dict[str, tuple[float, list[dict[str, Any]]]], dict[str, Exception]]:
+    executor = fetch_executor()
+    deadline = time.monotonic() + timeout
+    quote_future = executor.submit(fetch_quotes, client, symbols)
+    chain_futures = {symbol: executor.submit(fetch_chain, client, symbol, strikecount) for symbol in symbols}
 
-        ce_oi = safe_float(ce.get("oi", 0))
-        pe_oi = safe_float(pe.get("oi", 0))
-        ce_oi_pct = safe_float(ce.get("oichp", 0))
-        pe_oi_pct = safe_float(pe.get("oichp", 0))
+    try:
+        spots = _wait(quote_future, deadline, "quote")
+        quote_error: Exception | None = None
+    except Exception as exc:
+        spots, quote_error = {}, exc
+
+    snapshots: dict[str, tuple[float, list[dict[str, Any]]]] = {}
+    errors: dict[str, Exception] = {}
+    for symbol, future in chain_futures.items():
+        try:
+            chain = _wait(future, deadline, f"{symbol} option chain")
+        except Exception as exc:
+            errors[symbol] = exc
+            continue
+        if quote_error is not None:
+            errors[symbol] = quote_error
+        elif symbol not in spots:
+            errors[symbol] = RuntimeError(f"Unable to fetch underlying quote for {symbol}.")
+        else:
+            snapshots[symbol] = (spots[symbol], chain)
+    return snapshots, errors
 
-        rows.append(
-            {
-                "Strike": strike,
-                "IV": ((safe_float(ce.get("iv", 0)) + safe_float(pe.get("iv", 0))) / 2) or None,
-                "CE Symbol": str(ce.get("symbol", "")).strip(),
-                "CE Volume": safe_float(ce.get("volume", 0)),
-                "CE OI": ce_oi,
-                "CE OI Chg": infer_oi_change(ce_oi, ce_oi_pct),
-                "CE OI Chg %": ce_oi_pct,
-                "CE Change": safe_float(ce.get("ltpchp", ce.get("chp", 0))),
-                "CE LTP": safe_float(ce.get("ltp", 0)),
-                "PE Symbol": str(pe.get("symbol", "")).strip(),
-                "PE LTP": safe_float(pe.get("ltp", 0)),
-                "PE Change": safe_float(pe.get("ltpchp", pe.get("chp", 0))),
-                "PE OI Chg %": pe_oi_pct,
-                "PE OI Chg": infer_oi_change(pe_oi, pe_oi_pct),
-                "PE OI": pe_oi,
-                "PE Volume": safe_float(pe.get("volume", 0)),
-            }
-        )
 
-    return pd.DataFrame(rows).sort_values("Strike").reset_index(drop=True)
+def fetch_snapshot(client: FyersDataClient, symbol: str, strikecount: int) -> tuple[float, list[dict[str, Any]]]:
+    snapshots, errors = fetch_snapshots(client, [symbol], strikecount)
+    if symbol in errors:
+        raise errors[symbol]
+    return snapshots[symbol]
+
+
+def stream_snapshot(client: FyersDataClient, symbol: str, step: int, strikecount: int) -> tuple[float, pd.DataFrame]:
+    stream = chain_stream(client.socket_token)
+    book = stream.book(symbol)
+    if book is None or book.needs_reseed(book.spot, strikecount, step):
+        spot, options_chain = fetch_snapshot(client, symbol, strikecount)
+        book = stream.track(symbol, normalize_chain(spot, options_chain, step, strikecount), spot, strikecount, step)
+    return book.snapshot()
+
+
+def _numeric(values: tuple[Any, ...] | list[Any]) -> np.ndarray:
+    try:
+        numbers = np.asarray(values, dtype=float)
+        # None converts to NaN here; send it through the slow path so it becomes 0 like safe_float.
+        if not np.isnan(numbers).any():
+            return numbers
+    except (TypeError, ValueError):
+        pass
+    return pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").fillna(0.0).to_numpy(dtype=float)
+
+
+def _infer_oi_change(oi: np.ndarray, oi_pct: np.ndarray) -> np.ndarray:
+    denom = 100.0 + oi_pct
+    valid = (oi > 0) & (oi_pct != 0) & (np.abs(denom) >= 1e-9)
+    return np.where(valid, oi * oi_pct / np.where(valid, denom, 1.0), 0.0)
+
+
+def normalize_chain(spot: float, options_chain: list[dict[str, Any]], step: int, strikecount: int) -> pd.DataFrame:
+    center = step_round(spot, step) if spot else 0
+    strikes = center + step * np.arange(-strikecount, strikecount + 1, dtype=np.int64)
+    width = len(strikes)
+
+    # One pass over the raw contracts; everything after this works on whole columns.
+    fields = [
+        (
+            contract.get("strike_price"),
+            LEG_INDEX.get(str(contract.get("option_type", "")).upper().strip(), -1),
+            str(contract.get("symbol", "")).strip(),
+            contract.get("ltp", 0),
+            contract.get("ltpchp", contract.get("chp", 0)),
+            contract.get("oi", 0),
+            contract.get("oichp", 0),
+            contract.get("volume", 0),
+            contract.get("iv", 0),
+            contract.get("expiry", 0),
+        )
+        for contract in options_chain
+    ]
+    raw_strike, side, symbol, ltp, change, oi, oi_pct, volume, iv, expiry = zip(*fields) if fields else ([],) * 10
+
+    strike = np.trunc(_numeric(raw_strike)).astype(np.int64)
+    side_index = np.asarray(side, dtype=np.int64)
+    offset = strike - strikes[0]
+    position = offset // step
+    keep = (strike > 0) & (side_index >= 0) & (offset % step == 0) & (position >= 0) & (position < width)
+    # Later duplicates of a strike/side replace earlier ones.
+    slot = (side_index * width + position)[keep]
+    rows = np.flatnonzero(keep)
+    _, last = np.unique(slot[::-1], return_index=True)
+    rows = rows[::-1][last]
+    slot = slot[::-1][last]
+
+    def legs(values: np.ndarray) -> np.ndarray:
+        out = np.zeros(2 * width, dtype=values.dtype)
+        out[slot] = values[rows]
+        return out.reshape(2, width)
+
+    symbols = np.full(2 * width, "", dtype=object)
+    symbols[slot] = np.asarray(symbol, dtype=object)[rows]
+    symbols = symbols.reshape(2, width)
+    ltp_by_leg = legs(_numeric(ltp))
+    change_by_leg = legs(_numeric(change))
+    oi_by_leg = legs(_numeric(oi))
+    oi_pct_by_leg = legs(_numeric(oi_pct))
+    volume_by_leg = legs(_numeric(volume))
+    iv_by_leg = legs(_numeric(iv))
+    oi_change_by_leg = _infer_oi_change(oi_by_leg, oi_pct_by_leg)
+    expiry_by_strike = legs(_numeric(expiry)).max(axis=0)
+
+    avg_iv = (iv_by_leg[0] + iv_by_leg[1]) / 2
+    iv_column: Any = np.where(avg_iv != 0, avg_iv, np.nan)
+    if not np.any(avg_iv != 0):
+        iv_column = pd.Series([None] * width, dtype=object)
+
+    return pd.DataFrame(
+        {
+            "Strike": strikes,
+            "IV": iv_column,
+            "CE Symbol": symbols[0],
+            "CE Volume": volume_by_leg[0],
+            "CE OI": oi_by_leg[0],
+            "CE OI Chg": oi_change_by_leg[0],
+            "CE OI Chg %": oi_pct_by_leg[0],
+            "CE Change": change_by_leg[0],
+            "CE LTP": ltp_by_leg[0],
+            "PE Symbol": symbols[1],
+            "PE LTP": ltp_by_leg[1],
+            "PE Change": change_by_leg[1],
+            "PE OI Chg %": oi_pct_by_leg[1],
+            "PE OI Chg": oi_change_by_leg[1],
+            "PE OI": oi_by_leg[1],
+            "PE Volume": volume_by_leg[1],
+            "Expiry": expiry_by_strike,
+        }
+    )
 
 
-def store_snapshot(symbol: str, frame: pd.DataFrame) -> None:
+def with_greeks(frame: pd.DataFrame, spot: float, now: float | None = None) -> pd.DataFrame:
+    """The chain plus solved IV and greeks for both legs; chains without expiries come back unchanged.
+
+    Only the panels and summaries that use greeks call this, and results are
+    shared per chain and minute, so reruns of the same snapshot solve once.
+    """
+    if frame.empty or not spot or "Expiry" not in frame:
+        return frame
+    minute = (time.time() if now is None else now) // 60 * 60
+    strikes = _column(frame, "Strike")
+    expiry = _column(frame, "Expiry")
+    ltp = frame[["CE LTP", "PE LTP"]].to_numpy(dtype=float).T
+    key = (float(spot), minute, strikes.tobytes(), expiry.tobytes(), ltp.tobytes())
+    columns = GREEK_CACHE.get(key, lambda: chain_greek_columns(spot, strikes, years_to_expiry(expiry, minute), ltp))
+    return frame.assign(**columns)
+
+
+def store_snapshot(
+    symbol: str,
+    frame: pd.DataFrame,
+    spot: float | None = None,
+    stamp: datetime | None = None,
+    background: bool = True,
+) -> None:
     if frame.empty:
         return
-    stamp = now_ist()
+    stamp = stamp or now_ist()
     minute = stamp.strftime("%Y-%m-%d %H:%M")
     rows: list[dict[str, Any]] = []
     for _, row in frame.iterrows():
@@ -297,6 +631,7 @@ def store_snapshot(symbol: str, frame: pd.DataFrame) -> None:
                     "oi_change_pct": safe_float(row["CE OI Chg %"]),
                     "oi_change": safe_float(row["CE OI Chg"]),
                     "iv": safe_float(row["IV"]),
+                    "option_symbol": str(row.get("CE Symbol", "") or ""),
                 },
                 {
                     "snapshot_ts": stamp.isoformat(),
@@ -311,16 +646,48 @@ def store_snapshot(symbol: str, frame: pd.DataFrame) -> None:
                     "oi_change_pct": safe_float(row["PE OI Chg %"]),
                     "oi_change": safe_float(row["PE OI Chg"]),
                     "iv": safe_float(row["IV"]),
+                    "option_symbol": str(row.get("PE Symbol", "") or ""),
                 },
             ]
         )
+    summaries = (
+        []
+        if spot is None
+        else [
+            {
+                "snapshot_ts": stamp.isoformat(),
+                "snapshot_minute": minute,
+                "symbol": symbol,
+                "spot": spot,
+                "bias_score": market_bias(frame, symbol)["score"],
+                **frame_levels(frame),
+                **gex_summary(frame_gex(frame, spot, stamp.timestamp())),
+            }
+        ]
+    )
+
+    target = supabase_target()
+    if target is not None and background:
+        # Upserts are batched on a background thread; rows that still fail
+        # after retries land in SQLite instead of blocking this rerun.
+        queue = write_queue()
+        queue.submit(target, rows, fallback=lambda failed: write_snapshots_sqlite(failed, []))
+        summary_target = supabase_target("summary_table")
+        if summaries and summary_target is not None:
+            queue.submit(summary_target, summaries, fallback=lambda failed: write_snapshots_sqlite([], failed))
+        return
 
     try:
         if upsert_snapshots_supabase(rows):
+            upsert_snapshots_supabase(summaries, table_key="summary_table")
             return
     except Exception as exc:
-        st.warning(f"Supabase snapshot write failed; using local SQLite for this refresh: {exc}")
+        warn(f"Supabase snapshot write failed; using local SQLite for this refresh: {exc}")
+
+    write_snapshots_sqlite(rows, summaries, wait=not background)
+
 
+def snapshot_statements(rows: list[dict[str, Any]], summaries: list[dict[str, Any]]) -> list[Statement]:
     payload = [
         (
             row["snapshot_ts"],
@@ -335,45 +702,235 @@ def store_snapshot(symbol: str, frame: pd.DataFrame) -> None:
             row["oi_change_pct"],
             row["oi_change"],
             row["iv"],
+            row["option_symbol"],
         )
         for row in rows
     ]
-    with ensure_db() as conn:
-        conn.executemany(
+    summary_payload = [
+        (row["snapshot_ts"], row["snapshot_minute"], row["symbol"], row["spot"], *(row.get(name) for name in SUMMARY_FIELDS)) for row in summaries
+    ]
+    return [
+        (
             """
             INSERT OR REPLACE INTO option_chain_snapshots
-            (snapshot_ts, snapshot_minute, symbol, strike, option_type, ltp, ltp_change_pct, volume, oi, oi_change_pct, oi_change, iv)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            (snapshot_ts, snapshot_minute, symbol, strike, option_type, ltp, ltp_change_pct, volume, oi, oi_change_pct, oi_change, iv, option_symbol)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
             payload,
+        ),
+        (
+            """
+            INSERT OR REPLACE INTO option_chain_summaries
+            (snapshot_ts, snapshot_minute, symbol, spot, bias_score, max_pain, call_wall, put_wall, net_gex, gamma_flip)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            summary_payload,
+        ),
+        *rollup_statements(rows),
+    ]
+
+
+def rollup_statements(rows: list[dict[str, Any]]) -> list[Statement]:
+    buckets: dict[str, list[tuple[str, str, str]]] = {}
+    for row in rows:
+        if row["snapshot_ts"] not in buckets:
+            stamp = datetime.fromisoformat(row["snapshot_ts"])
+            starts = [(resolution, rollup_bucket(stamp, resolution)) for resolution in ROLLUP_MINUTES]
+            buckets[row["snapshot_ts"]] = [(resolution, start.isoformat(), start.strftime("%Y-%m-%d %H:%M")) for resolution, start in starts]
+    rollup_payload = [
+        (
+            resolution,
+            row["symbol"],
+            row["strike"],
+            row["option_type"],
+            bucket_ts,
+            bucket_minute,
+            row["snapshot_ts"],
+            row["snapshot_ts"],
+            row["ltp"],
+            row["ltp_change_pct"],
+            row["volume"],
+            row["oi"],
+            row["oi"],
+            row["oi_change_pct"],
+            row["iv"],
+        )
+        for row in rows
+        for resolution, bucket_ts, bucket_minute in buckets[row["snapshot_ts"]]
+    ]
+    return [
+        (
+            # Folds each minute into its open buckets in the same transaction: close values follow the
+            # latest minute, OI open the earliest, volume keeps its high. Rewriting a minute is idempotent.
+            """
+            INSERT INTO option_chain_rollups
+            (resolution, symbol, strike, option_type, bucket_ts, bucket_minute, first_ts, last_ts, ltp, ltp_change_pct, volume, oi_open, oi, oi_change_pct, iv)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (resolution, symbol, strike, option_type, bucket_ts) DO UPDATE SET
+                oi_open = CASE WHEN excluded.first_ts <= first_ts THEN excluded.oi_open ELSE oi_open END,
+                first_ts = MIN(first_ts, excluded.first_ts),
+                ltp = CASE WHEN excluded.last_ts >= last_ts THEN excluded.ltp ELSE ltp END,
+                ltp_change_pct = CASE WHEN excluded.last_ts >= last_ts THEN excluded.ltp_change_pct ELSE ltp_change_pct END,
+                oi = CASE WHEN excluded.last_ts >= last_ts THEN excluded.oi ELSE oi END,
+                oi_change_pct = CASE WHEN excluded.last_ts >= last_ts THEN excluded.oi_change_pct ELSE oi_change_pct END,
+                iv = CASE WHEN excluded.last_ts >= last_ts THEN excluded.iv ELSE iv END,
+                last_ts = MAX(last_ts, excluded.last_ts),
+                volume = MAX(COALESCE(volume, excluded.volume), COALESCE(excluded.volume, volume))
+            """,
+            rollup_payload,
+        ),
+    ]
+
+
+def rollup_bucket(stamp: datetime, resolution: str) -> datetime:
+    width = ROLLUP_MINUTES[resolution]
+    if width >= 1440:
+        return stamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    return stamp.replace(minute=stamp.minute - stamp.minute % width, second=0, microsecond=0)
+
+
+def backfill_rollups(chunk_minutes: int = 500) -> int:
+    """Rebuild rollups from the 1-minute rows already stored locally, for history written before they existed."""
+    minutes = 0
+    last = ""
+    while True:
+        with history_db().reader() as conn:
+            stamps = [row[0] for row in conn.execute(
+                "SELECT DISTINCT snapshot_minute FROM option_chain_snapshots WHERE snapshot_minute > ? ORDER BY snapshot_minute LIMIT ?",
+                (last, chunk_minutes),
+            )]
+            if not stamps:
+                return minutes
+            rows = pd.read_sql_query(
+                "SELECT * FROM option_chain_snapshots WHERE snapshot_minute > ? AND snapshot_minute <= ?",
+                conn,
+                params=(last, stamps[-1]),
+            )
+        rows = rows.astype(object).where(rows.notna(), None)
+        history_db().write(rollup_statements(rows.to_dict("records")), wait=True)
+        minutes += len(stamps)
+        last = stamps[-1]
+
+
+def write_snapshots_sqlite(rows: list[dict[str, Any]], summaries: list[dict[str, Any]], wait: bool = False) -> None:
+    # The writer thread commits this in the background unless the caller waits for it.
+    history_db().write(snapshot_statements(rows, summaries), wait=wait)
+
+
+def frame_from_snapshot_rows(rows: pd.DataFrame) -> pd.DataFrame:
+    if rows.empty:
+        return pd.DataFrame(columns=CHAIN_COLUMNS)
+
+    rows = rows.assign(strike=rows["strike"].astype(int))
+    strikes = sorted(rows["strike"].unique())
+    frame = pd.DataFrame({"Strike": strikes})
+    iv = pd.Series(0.0, index=strikes)
+    for side in ("CE", "PE"):
+        leg = rows.loc[rows["option_type"] == side].drop_duplicates("strike", keep="last").set_index("strike").reindex(strikes)
+        for field, suffix in LEG_FIELDS.items():
+            if field == "option_symbol":
+                frame[f"{side} {suffix}"] = leg[field].fillna("").astype(str).to_numpy() if field in leg else ""
+            else:
+                frame[f"{side} {suffix}"] = pd.to_numeric(leg[field], errors="coerce").fillna(0.0).to_numpy()
+        iv = iv.where(iv != 0, pd.to_numeric(leg["iv"], errors="coerce").fillna(0.0))
+    frame["IV"] = [value or None for value in iv.to_numpy()]
+    return frame[CHAIN_COLUMNS]
+
+
+def trim_chain(frame: pd.DataFrame, spot: float, step: int, strikecount: int) -> pd.DataFrame:
+    if frame.empty or not spot:
+        return frame
+    center = step_round(spot, step)
+    window = frame["Strike"].between(center - strikecount * step, center + strikecount * step)
+    return frame.loc[window].reset_index(drop=True)
+
+
+def load_latest_snapshot_supabase(symbol: str) -> tuple[dict[str, Any], pd.DataFrame] | None:
+    cfg = supabase_config()
+    if not cfg:
+        return None
+
+    response = pooled_session().get(
+        f"{cfg['url']}/rest/v1/{cfg['summary_table']}",
+        params={"select": "snapshot_ts,snapshot_minute,spot", "symbol": f"eq.{symbol}", "order": "snapshot_ts.desc", "limit": "1"},
+        headers=supabase_headers(),
+        timeout=20,
+    )
+    response.raise_for_status()
+    summaries = response.json()
+    if not summaries:
+        return {}, pd.DataFrame(columns=CHAIN_COLUMNS)
+
+    summary = summaries[0]
+    response = pooled_session().get(
+        f"{cfg['url']}/rest/v1/{cfg['table']}",
+        params={
+            "select": "strike,option_type,ltp,ltp_change_pct,volume,oi,oi_change_pct,oi_change,iv,option_symbol",
+            "symbol": f"eq.{symbol}",
+            "snapshot_minute": f"eq.{summary['snapshot_minute']}",
+        },
+        headers=supabase_headers(),
+        timeout=20,
+    )
+    response.raise_for_status()
+    return summary, frame_from_snapshot_rows(pd.DataFrame(response.json()))
+
+
+def load_latest_snapshot(symbol: str) -> tuple[dict[str, Any], pd.DataFrame]:
+    try:
+        latest = load_latest_snapshot_supabase(symbol)
+    except Exception as exc:
+        warn(f"Supabase snapshot read failed; using local SQLite: {exc}")
+        latest = None
+    if latest is not None:
+        return latest
+
+    with history_db().reader() as conn:
+        summary = conn.execute(
+            """
+            SELECT snapshot_ts, snapshot_minute, spot
+            FROM option_chain_summaries
+            WHERE symbol = ?
+            ORDER BY snapshot_ts DESC
+            LIMIT 1
+            """,
+            (symbol,),
+        ).fetchone()
+        if summary is None:
+            return {}, pd.DataFrame(columns=CHAIN_COLUMNS)
+        rows = pd.read_sql_query(
+            """
+            SELECT strike, option_type, ltp, ltp_change_pct, volume, oi, oi_change_pct, oi_change, iv, option_symbol
+            FROM option_chain_snapshots
+            WHERE symbol = ? AND snapshot_minute = ?
+            """,
+            conn,
+            params=(symbol, summary[1]),
         )
+    return {"snapshot_ts": summary[0], "snapshot_minute": summary[1], "spot": summary[2]}, frame_from_snapshot_rows(rows)
 
 
-def load_history(symbol: str, strike: int, option_type: str, limit: int = 90) -> pd.DataFrame:
+def load_history(symbol: str, strike: int, option_type: str, limit: int = 90, resolution: str = "1m") -> pd.DataFrame:
+    # Both backends read the newest limit + 1 rows off the contract's time index, from the 1-minute
+    # table or its rollups; the extra, oldest row only seeds the first diff and is dropped below.
     try:
-        supabase_df = load_history_supabase(symbol, strike, option_type, limit)
+        supabase_df = load_history_supabase(symbol, strike, option_type, limit + 1, resolution)
     except Exception as exc:
-        st.warning(f"Supabase history read failed; using local SQLite: {exc}")
+        warn(f"Supabase history read failed; using local SQLite: {exc}")
         supabase_df = None
 
     if supabase_df is not None:
         df = supabase_df
     else:
-        with ensure_db() as conn:
-            df = pd.read_sql_query(
-                """
-                SELECT snapshot_ts, snapshot_minute, ltp, ltp_change_pct, volume, oi, oi_change_pct, oi_change, iv
-                FROM option_chain_snapshots
-                WHERE symbol = ? AND strike = ? AND option_type = ?
-                ORDER BY snapshot_ts ASC
-                """,
-                conn,
-                params=(symbol, int(strike), option_type),
-            )
+        sql, prefix = history_leg_query(resolution)
+        with history_db().reader() as conn:
+            df = pd.read_sql_query(sql, conn, params=(*prefix, symbol, int(strike), option_type, int(limit) + 1))
+        df = df.drop(columns="option_type")
 
     if df.empty:
         return df
 
+    df = df.iloc[::-1].reset_index(drop=True)
     df["snapshot_ts"] = pd.to_datetime(df["snapshot_ts"], errors="coerce")
     df["volume_delta"] = df["volume"].diff().fillna(0)
     df["oi_delta"] = df["oi"].diff().fillna(0)
@@ -381,6 +938,289 @@ def load_history(symbol: str, strike: int, option_type: str, limit: int = 90) ->
     return df.tail(limit).reset_index(drop=True)
 
 
+def load_strike_history_supabase(symbol: str, strike: int, limit: int, resolution: str = "1m") -> pd.DataFrame | None:
+    cfg = supabase_config()
+    if not cfg:
+        return None
+    if cfg["table"] == SNAPSHOT_TABLE and resolution == "1m":
+        # public.strike_history (supabase_schema.sql) returns both legs with their deltas already computed.
+        response = pooled_session().post(
+            f"{cfg['url']}/rest/v1/rpc/strike_history",
+            json={"p_symbol": symbol, "p_strike": int(strike), "p_limit": int(limit)},
+            headers=supabase_headers(),
+            timeout=20,
+        )
+        if response.status_code != 404:
+            response.raise_for_status()
+            return pd.DataFrame(response.json(), columns=list(STRIKE_HISTORY_COLUMNS))
+    # Rollups, custom tables, or a project without the function yet fall back to one windowed read per leg.
+    legs = [load_history(symbol, strike, side, limit, resolution).assign(option_type=side) for side in LEG_INDEX]
+    legs = [leg for leg in legs if not leg.empty]
+    if not legs:
+        return pd.DataFrame(columns=list(STRIKE_HISTORY_COLUMNS))
+    return pd.concat(legs, ignore_index=True)[list(STRIKE_HISTORY_COLUMNS)]
+
+
+def load_strike_history(symbol: str, strike: int, limit: int = 90, resolution: str = "1m") -> pd.DataFrame:
+    """The newest limit rows of both legs of a strike, with volume/OI/OI% deltas, in one round-trip.
+
+    Matches load_history per leg: deltas run over limit + 1 rows so the first
+    one shown is real, and a leg's oldest stored row diffs to 0.
+    """
+    try:
+        df = load_strike_history_supabase(symbol, strike, limit, resolution)
+    except Exception as exc:
+        warn(f"Supabase strike history read failed; using local SQLite: {exc}")
+        df = None
+
+    if df is None:
+        sql, prefix = history_leg_query(resolution)
+        leg = f"SELECT * FROM ({sql})"
+        with history_db().reader() as conn:
+            df = pd.read_sql_query(
+                f"""
+                SELECT option_type, {", ".join(HISTORY_COLUMNS)}, volume_delta, oi_delta, oi_pct_delta
+                FROM (
+                    SELECT *,
+                        COALESCE(volume - LAG(volume) OVER leg, 0) AS volume_delta,
+                        COALESCE(oi - LAG(oi) OVER leg, 0) AS oi_delta,
+                        COALESCE(oi_change_pct - LAG(oi_change_pct) OVER leg, 0) AS oi_pct_delta,
+                        ROW_NUMBER() OVER (PARTITION BY option_type ORDER BY snapshot_ts DESC) AS recent
+                    FROM ({leg} UNION ALL {leg})
+                    WINDOW leg AS (PARTITION BY option_type ORDER BY snapshot_ts)
+                )
+                WHERE recent <= ?
+                ORDER BY option_type, snapshot_ts
+                """,
+                conn,
+                params=(*prefix, symbol, int(strike), "CE", int(limit) + 1, *prefix, symbol, int(strike), "PE", int(limit) + 1, int(limit)),
+            )
+
+    df["snapshot_ts"] = pd.to_datetime(df["snapshot_ts"], errors="coerce")
+    return df.sort_values(["option_type", "snapshot_ts"]).reset_index(drop=True)
+
+
+def load_day_snapshots_supabase(day: date, page_rows: int = 10_000) -> pd.DataFrame | None:
+    cfg = supabase_config()
+    if not cfg:
+        return None
+
+    pages = []
+    while True:
+        response = pooled_session().get(
+            f"{cfg['url']}/rest/v1/{cfg['table']}",
+            params=[
+                ("select", ",".join(ARCHIVE_ROW_COLUMNS)),
+                ("snapshot_minute", f"gte.{day:%Y-%m-%d}"),
+                ("snapshot_minute", f"lt.{day + timedelta(days=1):%Y-%m-%d}"),
+                ("order", "snapshot_minute,symbol,strike,option_type"),
+                ("limit", str(page_rows)),
+                ("offset", str(sum(len(page) for page in pages))),
+            ],
+            headers=supabase_headers(),
+            timeout=60,
+        )
+        response.raise_for_status()
+        # The project may cap rows per response below page_rows, so stop on an empty page only.
+        page = response.json()
+        if not page:
+            break
+        pages.append(page)
+    return pd.DataFrame([row for page in pages for row in page], columns=list(ARCHIVE_ROW_COLUMNS))
+
+
+def load_day_snapshots(day: date) -> pd.DataFrame:
+    try:
+        df = load_day_snapshots_supabase(day)
+    except Exception as exc:
+        warn(f"Supabase day read failed; using local SQLite: {exc}")
+        df = None
+    if df is not None:
+        return df
+    return load_day_snapshots_sqlite(day)
+
+
+def load_day_snapshots_sqlite(day: date) -> pd.DataFrame:
+    with history_db().reader() as conn:
+        # snapshot_minute leads the primary key, so a day is one index range.
+        return pd.read_sql_query(
+            f"""
+            SELECT {", ".join(ARCHIVE_ROW_COLUMNS)}
+            FROM option_chain_snapshots
+            WHERE snapshot_minute >= ? AND snapshot_minute < ?
+            """,
+            conn,
+            params=(f"{day:%Y-%m-%d}", f"{day + timedelta(days=1):%Y-%m-%d}"),
+        )
+
+
+def archive_snapshots(day: date, prune: bool = False) -> dict[str, int]:
+    """Roll one day of live snapshots into the Parquet archive, per symbol.
+
+    prune=True then deletes that day from the local SQLite table; Supabase
+    rows are left for the project's own retention.
+    """
+    rows = load_day_snapshots(day)
+    counts = {str(symbol): write_day(ARCHIVE_PATH, day, str(symbol), group) for symbol, group in rows.groupby("symbol")}
+    if prune and supabase_config():
+        # The day came from Supabase, but SQLite also holds the write-behind fallbacks that may never
+        # have reached it; merge those in before the local copy goes.
+        for symbol, group in load_day_snapshots_sqlite(day).groupby("symbol"):
+            counts[str(symbol)] = write_day(ARCHIVE_PATH, day, str(symbol), group)
+    if prune and counts:
+        history_db().write(
+            [
+                (
+                    "DELETE FROM option_chain_snapshots WHERE snapshot_minute >= ? AND snapshot_minute < ?",
+                    [(f"{day:%Y-%m-%d}", f"{day + timedelta(days=1):%Y-%m-%d}")],
+                )
+            ],
+            wait=True,
+        )
+    return counts
+
+
+def load_summary_history_supabase(symbol: str, limit: int) -> pd.DataFrame | None:
+    cfg = supabase_config()
+    if not cfg:
+        return None
+
+    response = pooled_session().get(
+        f"{cfg['url']}/rest/v1/{cfg['summary_table']}",
+        params={
+            "select": ",".join(SUMMARY_HISTORY_COLUMNS),
+            "symbol": f"eq.{symbol}",
+            "order": "snapshot_ts.desc",
+            "limit": str(limit),
+        },
+        headers=supabase_headers(),
+        timeout=20,
+    )
+    response.raise_for_status()
+    return pd.DataFrame(response.json(), columns=list(SUMMARY_HISTORY_COLUMNS))
+
+
+def load_summary_history(symbol: str, limit: int = BIAS_HISTORY_LIMIT) -> pd.DataFrame:
+    # Reads the per-minute summary rows through the (symbol, snapshot_ts) index
+    # rather than re-scoring stored strikes.
+    try:
+        df = load_summary_history_supabase(symbol, limit)
+    except Exception as exc:
+        warn(f"Supabase summary history read failed; using local SQLite: {exc}")
+        df = None
+
+    if df is None:
+        with history_db().reader() as conn:
+            df = pd.read_sql_query(
+                """
+                SELECT snapshot_ts, snapshot_minute, spot, bias_score, max_pain, call_wall, put_wall, net_gex, gamma_flip
+                FROM option_chain_summaries
+                WHERE symbol = ?
+                ORDER BY snapshot_ts DESC
+                LIMIT ?
+                """,
+                conn,
+                params=(symbol, int(limit)),
+            )
+
+    df["snapshot_ts"] = pd.to_datetime(df["snapshot_ts"], errors="coerce", utc=True).dt.tz_convert(IST)
+    for name in ("spot", *SUMMARY_FIELDS):
+        df[name] = pd.to_numeric(df[name], errors="coerce")
+    return df.dropna(subset=["snapshot_ts"]).sort_values("snapshot_ts").reset_index(drop=True)
+
+
+def bias_panel(history: pd.DataFrame) -> None:
+    history = history.dropna(subset=["bias_score"])
+    if len(history) < 2:
+        return
+    chart = history.set_index("snapshot_ts")[["bias_score"]].rename(columns={"bias_score": "Net Score"})
+    st.caption(f"Net score by minute, last {len(history)} snapshots")
+    st.line_chart(chart, height=180)
+
+
+def frame_levels(frame: pd.DataFrame) -> dict[str, float | None]:
+    return chain_levels(_column(frame, "Strike"), _column(frame, "CE OI"), _column(frame, "PE OI"))
+
+
+def levels_panel(frame: pd.DataFrame, spot: float, history: pd.DataFrame) -> None:
+    levels = frame_levels(frame)
+    columns = st.columns(3)
+    for column, name, label, note in (
+        (columns[0], "max_pain", "Max Pain", "Strike with the lowest total writer payout"),
+        (columns[1], "call_wall", "Call Wall", "Highest CE OI strike"),
+        (columns[2], "put_wall", "Put Wall", "Highest PE OI strike"),
+    ):
+        value = levels[name]
+        with column:
+            if value is None:
+                metric_box(label, "-", note, "neutral")
+            else:
+                tone = "neutral" if name == "max_pain" else "bad" if name == "call_wall" else "good"
+                metric_box(label, f"{value:,.0f}", f"{note}; spot {spot - value:+,.0f}", tone)
+
+    drift = history.dropna(subset=["max_pain"])
+    if len(drift) < 2:
+        return
+    chart = drift.set_index("snapshot_ts")[["spot", *LEVEL_FIELDS]].rename(
+        columns={"spot": "Spot", "max_pain": "Max Pain", "call_wall": "Call Wall", "put_wall": "Put Wall"}
+    )
+    st.caption(f"Max pain and OI walls by minute, last {len(drift)} snapshots")
+    st.line_chart(chart, height=200)
+
+
+def frame_gex(frame: pd.DataFrame, spot: float, now: float | None = None) -> dict[str, Any] | None:
+    frame = with_greeks(frame, spot, now)
+    columns = ("Expiry", *(f"{side} {field}" for side in ("CE", "PE") for field in ("IV", "Gamma")))
+    if not spot or frame.empty or any(column not in frame for column in columns):
+        return None
+    return gex_profile(
+        float(spot),
+        _column(frame, "Strike"),
+        years_to_expiry(_column(frame, "Expiry"), time.time() if now is None else now),
+        _column(frame, "CE IV"),
+        _column(frame, "PE IV"),
+        _column(frame, "CE Gamma"),
+        _column(frame, "PE Gamma"),
+        _column(frame, "CE OI"),
+        _column(frame, "PE OI"),
+        GEX_UNITS_PER_OI,
+    )
+
+
+def gex_summary(profile: dict[str, Any] | None) -> dict[str, float | None]:
+    return {name: None if profile is None else profile[name] for name in GEX_FIELDS}
+
+
+def gex_panel(frame: pd.DataFrame, spot: float, history: pd.DataFrame) -> None:
+    if "Expiry" not in frame:
+        with st.expander("Gamma exposure", expanded=False):
+            st.info(MISSING_EXPIRY_NOTICE)
+        return
+    profile = frame_gex(frame, spot)
+    if profile is None or not np.any(profile["by_strike"]):
+        return
+    with st.expander("Gamma exposure", expanded=False):
+        net = profile["net_gex"]
+        flip = profile["gamma_flip"]
+        c1, c2 = st.columns(2)
+        with c1:
+            regime = "Dealers long gamma, moves get damped" if net > 0 else "Dealers short gamma, moves get amplified"
+            metric_box("Net GEX", f"{net / 1e7:+,.1f} Cr", f"Per 1% move; {regime}", "good" if net > 0 else "bad")
+        with c2:
+            if flip is None:
+                metric_box("Zero Gamma", "-", "No sign change within 5% of spot", "neutral")
+            else:
+                metric_box("Zero Gamma", f"{flip:,.0f}", f"Spot {spot - flip:+,.0f} from the flip", "good" if spot > flip else "bad")
+        by_strike = pd.DataFrame({"Strike": frame["Strike"].to_numpy(), "GEX (Cr)": profile["by_strike"] / 1e7}).set_index("Strike")
+        st.caption("Net dealer gamma exposure by strike, CE positive and PE negative")
+        st.bar_chart(by_strike, height=220)
+        drift = history.dropna(subset=["gamma_flip"])
+        if len(drift) >= 2:
+            chart = drift.set_index("snapshot_ts")[["spot", "gamma_flip"]].rename(columns={"spot": "Spot", "gamma_flip": "Zero Gamma"})
+            st.caption(f"Zero-gamma level by minute, last {len(drift)} snapshots")
+            st.line_chart(chart, height=180)
+
+
 def _rank_suffix(rank: int) -> str:
     if rank <= 2:
         return "+++"
@@ -397,43 +1237,55 @@ def _tone_for_side_signal(side: str, action: str) -> str:
     return "bearish" if action == "BUY" else "bullish"
 
 
-def _empty_tags(frame: pd.DataFrame) -> dict[Any, dict[str, tuple[str, str]]]:
-    return {
-        idx: {"CE": ("-", "neutral"), "PE": ("-", "neutral")}
-        for idx in frame.index
-    }
-
-
-def build_signal_tags(frame: pd.DataFrame, top_n: int = 5) -> dict[Any, dict[str, tuple[str, str]]]:
-    tags = _empty_tags(frame)
-    volume_winners: list[tuple[float, Any, str]] = []
-    oi_winners: list[tuple[float, Any, str]] = []
-
-    for idx, row in frame.iterrows():
-        ce_volume = safe_float(row["CE Volume"])
-        pe_volume = safe_float(row["PE Volume"])
-        ce_oi_pct = safe_float(row["CE OI Chg %"])
-        pe_oi_pct = safe_float(row["PE OI Chg %"])
-
-        if ce_volume > pe_volume:
-            volume_winners.append((ce_volume, idx, "CE"))
-        elif pe_volume > ce_volume:
-            volume_winners.append((pe_volume, idx, "PE"))
-
-        if ce_oi_pct > pe_oi_pct:
-            oi_winners.append((max(ce_oi_pct, 0.0), idx, "CE"))
-        elif pe_oi_pct > ce_oi_pct:
-            oi_winners.append((max(pe_oi_pct, 0.0), idx, "PE"))
-
-    for rank, (_, idx, side) in enumerate(sorted(volume_winners, reverse=True)[:top_n], start=1):
-        label = f"BUY{_rank_suffix(rank)}"
-        tags[idx][side] = (label, _tone_for_side_signal(side, "BUY"))
+def _column(frame: pd.DataFrame, name: str) -> np.ndarray:
+    return pd.to_numeric(frame[name], errors="coerce").to_numpy(dtype=float)
+
+
+def _rank_side_winners(ce: np.ndarray, pe: np.ndarray, order_key: np.ndarray, top_n: int, floor: bool) -> tuple[np.ndarray, np.ndarray]:
+    # The larger leg wins each strike; ties and NaNs produce no winner.
+    side = np.where(ce > pe, 0, np.where(pe > ce, 1, -1))
+    value = np.where(side == 0, ce, pe)
+    if floor:
+        value = np.maximum(value, 0.0)
+    candidates = np.flatnonzero(side >= 0)
+    # Highest value first, later rows first on ties.
+    winners = candidates[np.lexsort((order_key[candidates], value[candidates]))[::-1][:top_n]]
+    return winners, side[winners]
+
+
+def _compute_signal_tags(frame: pd.DataFrame, top_n: int) -> pd.DataFrame:
+    size = len(frame)
+    tag = np.full((2, size), "-", dtype=object)
+    tone = np.full((2, size), "neutral", dtype=object)
+    if size:
+        order_key = np.argsort(np.argsort(frame.index.to_numpy(), kind="stable"), kind="stable")
+        for action, ce_col, pe_col, floor in (
+            ("BUY", "CE Volume", "PE Volume", False),
+            ("SELL", "CE OI Chg %", "PE OI Chg %", True),
+        ):
+            rows, sides = _rank_side_winners(_column(frame, ce_col), _column(frame, pe_col), order_key, top_n, floor)
+            ranks = np.arange(1, len(rows) + 1)
+            tag[sides, rows] = [f"{action}{suffix}" for suffix in np.where(ranks <= 2, "+++", np.where(ranks <= 4, "++", "+"))]
+            tone[sides, rows] = np.where((sides == 0) == (action == "BUY"), "bullish", "bearish")
+    return pd.DataFrame({"CE Tag": tag[0], "CE Tone": tone[0], "PE Tag": tag[1], "PE Tone": tone[1]}, index=frame.index)
+
+
+def build_signal_tags(frame: pd.DataFrame, top_n: int = SIGNAL_TOP_N) -> pd.DataFrame:
+    # market_bias, format_display and the strike cards all tag the same frame in one rerun.
+    cached = _SIGNAL_TAGS.get(id(frame))
+    if cached is not None and cached[0]() is frame and cached[1] == top_n:
+        return cached[2]
+    tags = _compute_signal_tags(frame, top_n)
+    _SIGNAL_TAGS[id(frame)] = (weakref.ref(frame, lambda _, key=id(frame): _SIGNAL_TAGS.pop(key, None)), top_n, tags)
+    return tags
 
-    for rank, (_, idx, side) in enumerate(sorted(oi_winners, reverse=True)[:top_n], start=1):
-        label = f"SELL{_rank_suffix(rank)}"
-        tags[idx][side] = (label, _tone_for_side_signal(side, "SELL"))
 
-    return tags
+def bias_label(score: float) -> str:
+    if score >= 2:
+        return "Bullish"
+    if score <= -2:
+        return "Bearish"
+    return "Range / Neutral"
 
 
 def market_bias(frame: pd.DataFrame, symbol: str) -> dict[str, Any]:
@@ -441,36 +1293,21 @@ def market_bias(frame: pd.DataFrame, symbol: str) -> dict[str, Any]:
         return {"label": "Neutral", "score": 0.0, "reason": "No chain data yet."}
 
     signal_tags = build_signal_tags(frame)
-    atm = int(frame.iloc[len(frame) // 2]["Strike"])
-    step = abs(int(frame.iloc[1]["Strike"]) - int(frame.iloc[0]["Strike"])) if len(frame) > 1 else 50
-    score = 0.0
-    clues: list[str] = []
-
-    for _, row in frame.iterrows():
-        dist = abs(int(row["Strike"]) - atm)
-        weight = max(0.35, 1.0 - (dist / max(step * 8, 1)))
-        tags = signal_tags[row.name]
-        ce_tag, ce_tone = tags["CE"]
-        pe_tag, pe_tone = tags["PE"]
-
-        if ce_tone == "bullish":
-            score += 2.0 * weight
-        elif ce_tone == "bearish":
-            score -= 2.0 * weight
-        if pe_tone == "bullish":
-            score += 2.0 * weight
-        elif pe_tone == "bearish":
-            score -= 2.0 * weight
-        if dist <= step * 2 and (ce_tag != "-" or pe_tag != "-"):
-            clues.append(f"{row['Strike']}: {ce_tag} / {pe_tag}")
-
-    if score >= 2:
-        label = "Bullish"
-    elif score <= -2:
-        label = "Bearish"
-    else:
-        label = "Range / Neutral"
-    return {"label": label, "score": round(score, 2), "reason": clues[0] if clues else "Waiting for more snapshots."}
+    strikes = frame["Strike"].to_numpy(dtype=np.int64)
+    atm = int(strikes[len(strikes) // 2])
+    step = abs(int(strikes[1]) - int(strikes[0])) if len(strikes) > 1 else 50
+    dist = np.abs(strikes - atm)
+    weight = np.maximum(0.35, 1.0 - dist / max(step * 8, 1))
+    tone = signal_tags[["CE Tone", "PE Tone"]].to_numpy()
+    contribution = np.where(tone == "bullish", 2.0, np.where(tone == "bearish", -2.0, 0.0)) * weight[:, None]
+    # A running sum in strike order keeps scores that sit right on the +/-2 label thresholds stable.
+    score = float(np.cumsum(contribution.ravel())[-1])
+
+    ce_tags = signal_tags["CE Tag"].to_numpy()
+    pe_tags = signal_tags["PE Tag"].to_numpy()
+    near = np.flatnonzero((dist <= step * 2) & ((ce_tags != "-") | (pe_tags != "-")))
+    reason = f"{strikes[near[0]]}: {ce_tags[near[0]]} / {pe_tags[near[0]]}" if len(near) else "Waiting for more snapshots."
+    return {"label": bias_label(score), "score": round(score, 2), "reason": reason}
 
 
 def format_display(frame: pd.DataFrame, symbol: str, atm: int) -> pd.DataFrame:
@@ -480,9 +1317,8 @@ def format_display(frame: pd.DataFrame, symbol: str, atm: int) -> pd.DataFrame:
     pe_spread_diff = sorted_frame["PE LTP"] - sorted_frame["PE LTP"].shift(1)
     rows: list[dict[str, Any]] = []
     for _, row in sorted_frame.iterrows():
-        tags = signal_tags[row.name]
-        ce_tag, _ = tags["CE"]
-        pe_tag, _ = tags["PE"]
+        ce_tag = signal_tags.at[row.name, "CE Tag"]
+        pe_tag = signal_tags.at[row.name, "PE Tag"]
         rows.append(
             {
                 "CE Tag": ce_tag,
@@ -505,64 +1341,40 @@ def format_display(frame: pd.DataFrame, symbol: str, atm: int) -> pd.DataFrame:
     return pd.DataFrame(rows)
 
 
-def style_table(display: pd.DataFrame, raw_frame: pd.DataFrame, atm: int) -> pd.io.formats.style.Styler:
-    top_ce_volume = set(raw_frame["CE Volume"].nlargest(3).index)
-    top_ce_oi = set(raw_frame["CE OI"].nlargest(3).index)
-    top_pe_volume = set(raw_frame["PE Volume"].nlargest(3).index)
-    top_pe_oichg = set(raw_frame["PE OI Chg %"].nlargest(3).index)
-
-    def highlight_css(kind: str) -> str:
-        if kind == "ce_volume":
-            return "background-color: #dcfce7; color: #0f172a; font-weight: 800;"
-        if kind == "ce_oi":
-            return "background-color: #dbeafe; color: #0f172a; font-weight: 800;"
-        if kind == "pe_volume":
-            return "background-color: #fef3c7; color: #0f172a; font-weight: 800;"
-        if kind == "pe_oichg":
-            return "background-color: #fce7f3; color: #0f172a; font-weight: 800;"
-        if kind == "bullish_tag":
-            return "background-color: #dcfce7; color: #0f172a; font-weight: 900;"
-        if kind == "bearish_tag":
-            return "background-color: #fee2e2; color: #0f172a; font-weight: 900;"
-        if kind == "atm":
-            return "background-color: #fff7cc; color: #0f172a; font-weight: 900;"
-        return ""
-
-    def tone_from_tag(tag: Any) -> str:
+def _top_positions(values: pd.Series, n: int = 3) -> np.ndarray:
+    # Same picks as Series.nlargest(n): NaN skipped, earlier rows win ties.
+    num = values.to_numpy(dtype=float)
+    order = np.argsort(-num, kind="stable")
+    return order[~np.isnan(num[order])][:n]
+
+
+def _tag_tones(tags: pd.Series) -> list[str]:
+    tones = []
+    for tag in tags.tolist():
         text = str(tag or "").upper()
-        if text.startswith("BUY"):
-            return "bullish"
-        if text.startswith("SELL"):
-            return "bearish"
-        return "neutral"
+        tones.append(TABLE_CSS["bullish_tag"] if text.startswith("BUY") else TABLE_CSS["bearish_tag"] if text.startswith("SELL") else "")
+    return tones
 
-    def row_style(row: pd.Series) -> list[str]:
-        styles = [""] * len(row)
-        strike = int(row.get("Strike", 0))
-        is_atm = strike == atm
-        ce_tone = tone_from_tag(row.get("CE Tag"))
-        pe_tone = tone_from_tag(row.get("PE Tag"))
-
-        if ce_tone != "neutral" and "CE Tag" in row.index:
-            styles[row.index.get_loc("CE Tag")] = highlight_css("bullish_tag") if ce_tone == "bullish" else highlight_css("bearish_tag")
-        if pe_tone != "neutral" and "PE Tag" in row.index:
-            styles[row.index.get_loc("PE Tag")] = highlight_css("bullish_tag") if pe_tone == "bullish" else highlight_css("bearish_tag")
-
-        if row.name in top_ce_volume and "CE Volume" in row.index:
-            styles[row.index.get_loc("CE Volume")] = highlight_css("ce_volume")
-        if row.name in top_ce_oi and "CE OI" in row.index:
-            styles[row.index.get_loc("CE OI")] = highlight_css("ce_oi")
-        if row.name in top_pe_volume and "PE Volume" in row.index:
-            styles[row.index.get_loc("PE Volume")] = highlight_css("pe_volume")
-        if row.name in top_pe_oichg and "PE OI Chg %" in row.index:
-            styles[row.index.get_loc("PE OI Chg %")] = highlight_css("pe_oichg")
-
-        if is_atm and "Strike" in row.index:
-            styles[row.index.get_loc("Strike")] = highlight_css("atm")
-
-        return styles
-
-    styler = display.style.apply(row_style, axis=1)
+
+def chain_style_matrix(display: pd.DataFrame, raw_frame: pd.DataFrame, atm: int) -> pd.DataFrame:
+    styles = np.full(display.shape, "", dtype=object)
+    columns = {column: idx for idx, column in enumerate(display.columns)}
+    for column in ("CE Tag", "PE Tag"):
+        if column in columns:
+            styles[:, columns[column]] = _tag_tones(display[column])
+    for column, kind in (("CE Volume", "ce_volume"), ("CE OI", "ce_oi"), ("PE Volume", "pe_volume"), ("PE OI Chg %", "pe_oichg")):
+        if column in columns:
+            leaders = display.index.isin(raw_frame.index[_top_positions(raw_frame[column])])
+            styles[leaders, columns[column]] = TABLE_CSS[kind]
+    if "Strike" in columns:
+        styles[display["Strike"].astype(int).to_numpy() == atm, columns["Strike"]] = TABLE_CSS["atm"]
+    return pd.DataFrame(styles, index=display.index, columns=display.columns)
+
+
+def style_table(display: pd.DataFrame, raw_frame: pd.DataFrame, atm: int) -> pd.io.formats.style.Styler:
+    # One vectorized pass builds every cell's CSS; Styler applies it as a single frame.
+    styles = chain_style_matrix(display, raw_frame, atm)
+    styler = display.style.apply(lambda _: styles, axis=None)
     styler = styler.set_table_styles(
         [
             {
@@ -847,6 +1659,68 @@ def tag_display_tone(tag: str) -> str:
     return "neutral"
 
 
+ZONE_COLUMNS = ["Type", "Zone", "Low", "High", "CreatedTS", "Created", "Distance", "Status"]
+
+
+def zone_distance(lows: np.ndarray, highs: np.ndarray, spot: float) -> np.ndarray:
+    inside = (lows <= spot) & (spot <= highs)
+    return np.where(inside, 0.0, np.where(spot < lows, lows - spot, spot - highs))
+
+
+def zone_rows(
+    types: list[str], lows: np.ndarray, highs: np.ndarray, created: pd.Series, spot: float, display_date: Any | None, reference_label: str
+) -> pd.DataFrame:
+    lows = np.asarray(lows, dtype=float)
+    highs = np.asarray(highs, dtype=float)
+    inside = (lows <= spot) & (spot <= highs)
+    above = ~inside & (spot < lows)
+    created = created.reset_index(drop=True)
+    return pd.DataFrame(
+        {
+            "Type": types,
+            "Zone": [f"{low:,.2f} - {high:,.2f}" for low, high in zip(lows.tolist(), highs.tolist())],
+            "Low": lows,
+            "High": highs,
+            "CreatedTS": created,
+            "Created": created.dt.strftime("%d %b %H:%M" if display_date is None else "%H:%M"),
+            "Distance": zone_distance(lows, highs, spot),
+            "Status": np.where(
+                inside, f"{reference_label.title()} inside zone", np.where(above, f"Above {reference_label}", f"Below {reference_label}")
+            ),
+        }
+    )
+
+
+def _swing_pivots(values: np.ndarray, lb: int, highs: bool) -> np.ndarray:
+    # Centred window extremes; a pivot at i is only known lb candles later, at i + lb.
+    windows = np.lib.stride_tricks.sliding_window_view(values, 2 * lb + 1)
+    extreme = (np.fmax if highs else np.fmin).reduce(windows, axis=1)
+    level = np.full(len(values), np.nan)
+    confirmed = values[lb : len(values) - lb] == extreme
+    level[np.flatnonzero(confirmed) + 2 * lb] = values[lb : len(values) - lb][confirmed]
+    return level
+
+
+def _structure_breaks(level: np.ndarray, previous_close: np.ndarray, close: np.ndarray, last_candle: np.ndarray, bullish: bool) -> np.ndarray:
+    # A swing level stays armed until the next pivot replaces it or the first qualifying break consumes it.
+    segment = np.maximum.accumulate(np.where(np.isnan(level), -1, np.arange(len(level))))
+    armed = segment >= 0
+    swing = level[np.where(armed, segment, 0)]
+    if bullish:
+        crossed = (previous_close <= swing) & (swing < close)
+    else:
+        crossed = (previous_close >= swing) & (swing > close)
+    hits = np.flatnonzero(armed & crossed & (last_candle >= 0))
+    _, first = np.unique(segment[hits], return_index=True)
+    return hits[first]
+
+
+def _previous_index(mask: np.ndarray) -> np.ndarray:
+    # Index of the last candle before each position where mask held, -1 when none.
+    latest = np.maximum.accumulate(np.where(mask, np.arange(len(mask)), -1))
+    return np.concatenate(([-1], latest[:-1]))
+
+
 def detect_order_blocks(
     candles: pd.DataFrame,
     spot: float,
@@ -857,110 +1731,84 @@ def detect_order_blocks(
     reference_label: str = "spot",
 ) -> pd.DataFrame:
     if candles.empty or len(candles) < (lb * 2) + 2:
-        return pd.DataFrame(columns=["Type", "Zone", "Low", "High", "CreatedTS", "Created", "Distance", "Status"])
-
-    frame = candles.sort_values("timestamp").reset_index(drop=True).copy()
-    pivot_highs: dict[int, float] = {}
-    pivot_lows: dict[int, float] = {}
-    for i in range(lb, len(frame) - lb):
-        high_window = frame.loc[i - lb : i + lb, "high"]
-        low_window = frame.loc[i - lb : i + lb, "low"]
-        if frame.at[i, "high"] == high_window.max():
-            pivot_highs[i + lb] = float(frame.at[i, "high"])
-        if frame.at[i, "low"] == low_window.min():
-            pivot_lows[i + lb] = float(frame.at[i, "low"])
-
-    last_swing_high: float | None = None
-    last_swing_low: float | None = None
-    last_red_idx: int | None = None
-    last_green_idx: int | None = None
-    order_blocks: list[dict[str, Any]] = []
-
-    for i, row in frame.iterrows():
-        if i in pivot_highs:
-            last_swing_high = pivot_highs[i]
-        if i in pivot_lows:
-            last_swing_low = pivot_lows[i]
-
-        previous_close = float(frame.at[i - 1, "close"]) if i > 0 else float(row["close"])
-        close = float(row["close"])
-
-        if last_swing_high is not None and previous_close <= last_swing_high < close and last_red_idx is not None:
-            candle = frame.loc[last_red_idx]
-            order_blocks.append(
-                {
-                    "type": "Bullish OB",
-                    "low": float(candle["low"]),
-                    "high": float(candle["high"]),
-                    "created": candle["timestamp"],
-                }
-            )
-            last_swing_high = None
-
-        if last_swing_low is not None and previous_close >= last_swing_low > close and last_green_idx is not None:
-            candle = frame.loc[last_green_idx]
-            order_blocks.append(
-                {
-                    "type": "Bearish OB",
-                    "low": float(candle["low"]),
-                    "high": float(candle["high"]),
-                    "created": candle["timestamp"],
-                }
-            )
-            last_swing_low = None
-
-        if close > float(row["open"]):
-            last_green_idx = i
-        elif close < float(row["open"]):
-            last_red_idx = i
-
-    rows: list[dict[str, Any]] = []
-    for zone in order_blocks:
-        created_ts = pd.to_datetime(zone["created"])
-        if zone["low"] <= spot <= zone["high"]:
-            status = f"{reference_label.title()} inside zone"
-            distance = 0.0
-        elif spot < zone["low"]:
-            status = f"Above {reference_label}"
-            distance = zone["low"] - spot
-        else:
-            status = f"Below {reference_label}"
-            distance = spot - zone["high"]
-        rows.append(
-            {
-                "Type": zone["type"],
-                "Zone": f"{zone['low']:,.2f} - {zone['high']:,.2f}",
-                "Low": zone["low"],
-                "High": zone["high"],
-                "CreatedTS": created_ts,
-                "Created": created_ts.strftime("%d %b %H:%M") if display_date is None else created_ts.strftime("%H:%M"),
-                "Distance": distance,
-                "Status": status,
-            }
-        )
+        return pd.DataFrame(columns=ZONE_COLUMNS)
+
+    frame = candles.sort_values("timestamp").reset_index(drop=True)
+    open_ = frame["open"].to_numpy(dtype=float)
+    high = frame["high"].to_numpy(dtype=float)
+    low = frame["low"].to_numpy(dtype=float)
+    close = frame["close"].to_numpy(dtype=float)
+    previous_close = np.concatenate((close[:1], close[:-1]))
+    last_green = _previous_index(close > open_)
+    last_red = _previous_index(close < open_)
+
+    bullish = _structure_breaks(_swing_pivots(high, lb, True), previous_close, close, last_red, True)
+    bearish = _structure_breaks(_swing_pivots(low, lb, False), previous_close, close, last_green, False)
+    events = np.concatenate((bullish, bearish))
+    if not len(events):
+        return pd.DataFrame(columns=ZONE_COLUMNS)
+
+    is_bearish = np.concatenate((np.zeros(len(bullish), dtype=bool), np.ones(len(bearish), dtype=bool)))
+    order = np.lexsort((is_bearish, events))
+    is_bearish = is_bearish[order]
+    source = np.where(is_bearish, last_green[events[order]], last_red[events[order]])
+    zones = zone_rows(
+        np.where(is_bearish, "Bearish OB", "Bullish OB").tolist(),
+        low[source],
+        high[source],
+        frame["timestamp"].iloc[source],
+        spot,
+        display_date,
+        reference_label,
+    )
+    return select_order_blocks(zones, per_side_limit, display_date, keep_earliest)
 
-    if not rows:
-        return pd.DataFrame(columns=["Type", "Zone", "Low", "High", "CreatedTS", "Created", "Distance", "Status"])
 
-    zones = pd.DataFrame(rows)
+def select_order_blocks(zones: pd.DataFrame, per_side_limit: int, display_date: Any | None, keep_earliest: bool) -> pd.DataFrame:
     if display_date is not None:
         same_day = zones["CreatedTS"].dt.date == display_date
         if same_day.any():
             zones = zones.loc[same_day].copy()
 
-    selected_parts: list[pd.DataFrame] = []
-    for _, side_frame in zones.groupby("Type", sort=False):
-        if keep_earliest:
-            earliest = side_frame.sort_values("CreatedTS", ascending=True).head(1)
-            remaining = side_frame.drop(index=earliest.index)
-            closest = remaining.sort_values(["Distance", "CreatedTS"], ascending=[True, False]).head(max(per_side_limit - 1, 0))
-            selected_parts.append(pd.concat([earliest, closest]))
-        else:
-            closest = side_frame.sort_values(["Distance", "CreatedTS"], ascending=[True, False]).head(per_side_limit)
-            selected_parts.append(closest)
+    created = zones["CreatedTS"].astype("int64").to_numpy()
+    keep = _order_block_picks(zones["Type"].to_numpy(), created, zones["Distance"].to_numpy(dtype=float), per_side_limit, keep_earliest)
+    return zones.iloc[keep].reset_index(drop=True)
 
-    selected = pd.concat(selected_parts) if selected_parts else zones.head(0)
-    return selected.sort_values("CreatedTS", ascending=False).reset_index(drop=True)
+
+def _order_block_picks(types: np.ndarray, created: np.ndarray, distance: np.ndarray, per_side_limit: int, keep_earliest: bool) -> np.ndarray:
+    # Per side: the earliest zone (when kept), then the nearest by distance, newer first on ties.
+    keep: list[int] = []
+    for side in pd.unique(types):
+        rows = np.flatnonzero(types == side)
+        limit = per_side_limit
+        if keep_earliest:
+            first = int(np.argmin(created[rows]))
+            keep.append(int(rows[first]))
+            rows = np.delete(rows, first)
+            limit = max(per_side_limit - 1, 0)
+        keep.extend(rows[np.lexsort((-created[rows], distance[rows]))][:limit].tolist())
+    keep_rows = np.array(keep, dtype=int)
+    return keep_rows[np.argsort(-created[keep_rows], kind="stable")]
+
+
+def _first_reach(values: np.ndarray, starts: np.ndarray, levels: np.ndarray, below: bool) -> np.ndarray:
+    # First index >= start where values reach level (<= when below, >= otherwise), len(values) if never.
+    # Doubling tables of forward running min/max let every zone binary-search its own horizon at once.
+    n = len(values)
+    reduce = np.minimum if below else np.maximum
+    tables = [values]
+    while (1 << len(tables)) <= n:
+        span = 1 << (len(tables) - 1)
+        previous = tables[-1]
+        tables.append(reduce(previous[:-span], previous[span:]))
+    position = starts.astype(np.int64).copy()
+    for power in range(len(tables) - 1, -1, -1):
+        table = tables[power]
+        fits = position < len(table)
+        window = table[np.minimum(position, len(table) - 1)]
+        clear = fits & ((window > levels) if below else (window < levels))
+        position = np.where(clear, position + (1 << power), position)
+    return np.minimum(position, n)
 
 
 def detect_fvg_zones(
@@ -969,59 +1817,50 @@ def detect_fvg_zones(
     display_date: Any | None = None,
     limit: int = 6,
     reference_label: str = "spot",
+    live_only: bool = False,
 ) -> pd.DataFrame:
     if candles.empty or len(candles) < 3:
-        return pd.DataFrame(columns=["Type", "Zone", "Low", "High", "CreatedTS", "Created", "Distance", "Status"])
-
-    frame = candles.sort_values("timestamp").reset_index(drop=True).copy()
-    rows: list[dict[str, Any]] = []
-    for i in range(2, len(frame)):
-        current = frame.loc[i]
-        middle = frame.loc[i - 1]
-        prior = frame.loc[i - 2]
-        zone_type: str | None = None
-        low = high = 0.0
-
-        if float(prior["high"]) < float(current["low"]) and float(middle["close"]) > float(prior["high"]):
-            zone_type = "Bullish FVG"
-            low = float(prior["high"])
-            high = float(current["low"])
-        elif float(prior["low"]) > float(current["high"]) and float(middle["close"]) < float(prior["low"]):
-            zone_type = "Bearish FVG"
-            low = float(current["high"])
-            high = float(prior["low"])
-
-        if zone_type is None:
-            continue
-
-        created_ts = pd.to_datetime(current["timestamp"])
-        if low <= spot <= high:
-            status = f"{reference_label.title()} inside zone"
-            distance = 0.0
-        elif spot < low:
-            status = f"Above {reference_label}"
-            distance = low - spot
-        else:
-            status = f"Below {reference_label}"
-            distance = spot - high
-
-        rows.append(
-            {
-                "Type": zone_type,
-                "Zone": f"{low:,.2f} - {high:,.2f}",
-                "Low": low,
-                "High": high,
-                "CreatedTS": created_ts,
-                "Created": created_ts.strftime("%d %b %H:%M") if display_date is None else created_ts.strftime("%H:%M"),
-                "Distance": distance,
-                "Status": status,
-            }
-        )
+        return pd.DataFrame(columns=[*ZONE_COLUMNS, "MitigatedTS"])
+
+    frame = candles.sort_values("timestamp").reset_index(drop=True)
+    high = frame["high"].to_numpy(dtype=float)
+    low = frame["low"].to_numpy(dtype=float)
+    close = frame["close"].to_numpy(dtype=float)
+    prior_high, prior_low, middle_close = high[:-2], low[:-2], close[1:-1]
+    bullish = (prior_high < low[2:]) & (middle_close > prior_high)
+    bearish = ~bullish & (prior_low > high[2:]) & (middle_close < prior_low)
+    created = np.flatnonzero(bullish | bearish) + 2
+    if not len(created):
+        return pd.DataFrame(columns=[*ZONE_COLUMNS, "MitigatedTS"])
+
+    is_bullish = bullish[created - 2]
+    zone_low = np.where(is_bullish, high[created - 2], high[created])
+    zone_high = np.where(is_bullish, low[created], low[created - 2])
+
+    # A gap is mitigated once a later candle trades through its far edge.
+    mitigated_at = np.full(len(created), len(frame))
+    mitigated_at[is_bullish] = _first_reach(low, created[is_bullish] + 1, zone_low[is_bullish], below=True)
+    mitigated_at[~is_bullish] = _first_reach(high, created[~is_bullish] + 1, zone_high[~is_bullish], below=False)
+    mitigated = mitigated_at < len(frame)
+    if live_only:
+        keep = ~mitigated
+        created, is_bullish, zone_low, zone_high = created[keep], is_bullish[keep], zone_low[keep], zone_high[keep]
+        mitigated_at, mitigated = mitigated_at[keep], mitigated[keep]
+
+    zones = zone_rows(
+        np.where(is_bullish, "Bullish FVG", "Bearish FVG").tolist(),
+        zone_low,
+        zone_high,
+        frame["timestamp"].iloc[created],
+        spot,
+        display_date,
+        reference_label,
+    )
+    zones["MitigatedTS"] = frame["timestamp"].iloc[np.where(mitigated, mitigated_at, 0)].reset_index(drop=True).where(mitigated)
+    return select_fvg_zones(zones, display_date, limit)
 
-    if not rows:
-        return pd.DataFrame(columns=["Type", "Zone", "Low", "High", "CreatedTS", "Created", "Distance", "Status"])
 
-    zones = pd.DataFrame(rows)
+def select_fvg_zones(zones: pd.DataFrame, display_date: Any | None, limit: int) -> pd.DataFrame:
     if display_date is not None:
         same_day = zones["CreatedTS"].dt.date == display_date
         if same_day.any():
@@ -1030,6 +1869,69 @@ def detect_fvg_zones(
     return zones.sort_values("CreatedTS", ascending=False).head(limit).reset_index(drop=True)
 
 
+def _stream_zone_rows(zones: list[Zone], spot: float, display_date: Any | None, reference_label: str) -> pd.DataFrame:
+    types, lows, highs, created = zip(*zones)
+    return zone_rows(list(types), np.array(lows), np.array(highs), pd.Series(pd.DatetimeIndex(created)), spot, display_date, reference_label)
+
+
+def _stream_zone_keys(zones: list[Zone], spot: float, display_date: Any | None) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    # Row numbers and the keys the selectors rank on, narrowed to display_date the way the frame selectors do.
+    types, lows, highs, created = zip(*zones)
+    stamps = np.fromiter((ts.value for ts in created), dtype=np.int64, count=len(created))
+    rows = np.arange(len(zones))
+    if display_date is not None:
+        tz = created[0].tz
+        day_start = pd.Timestamp(display_date).tz_localize(tz).value
+        day_end = pd.Timestamp(display_date + timedelta(days=1)).tz_localize(tz).value
+        same_day = (stamps >= day_start) & (stamps < day_end)
+        if same_day.any():
+            rows = rows[same_day]
+    distance = zone_distance(np.array(lows, dtype=float)[rows], np.array(highs, dtype=float)[rows], spot)
+    return rows, np.array(types)[rows], stamps[rows], distance
+
+
+def streamed_zones(
+    symbol: str,
+    resolution: str,
+    candles: pd.DataFrame,
+    spot: float,
+    lb: int = 5,
+    per_side_limit: int = 3,
+    display_date: Any | None = None,
+    keep_earliest: bool = True,
+    reference_label: str = "spot",
+    fvg_limit: int = 6,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Order blocks and live FVGs from the persistent stream for (symbol, resolution).
+
+    Matches detect_order_blocks and detect_fvg_zones(live_only=True) on the same
+    window, but only pushes the candles that arrived since the last rerun and
+    only builds display rows for the zones the selectors keep.
+    """
+    view = zone_stream(symbol, resolution, lb).sync(candles)
+    key = (spot, per_side_limit, display_date, keep_earliest, reference_label, fvg_limit, len(candles) >= (lb * 2) + 2)
+    selected = view.selected
+    if selected is not None and selected[0] == key:
+        return selected[1]
+
+    # Same ranking as the batch selectors, run on plain arrays instead of a frame per zone list.
+    if view.blocks and key[-1]:
+        rows, types, created, distance = _stream_zone_keys(view.blocks, spot, display_date)
+        picks = rows[_order_block_picks(types, created, distance, per_side_limit, keep_earliest)]
+        ob_zones = _stream_zone_rows([view.blocks[row] for row in picks], spot, display_date, reference_label)
+    else:
+        ob_zones = pd.DataFrame(columns=ZONE_COLUMNS)
+    if view.open_gaps:
+        rows, _, created, _ = _stream_zone_keys(view.open_gaps, spot, display_date)
+        picks = rows[np.argsort(-created, kind="stable")[:fvg_limit]]
+        fvg_zones = _stream_zone_rows([view.open_gaps[row] for row in picks], spot, display_date, reference_label)
+        fvg_zones["MitigatedTS"] = pd.Series(pd.NaT, index=fvg_zones.index, dtype=fvg_zones["CreatedTS"].dtype)
+    else:
+        fvg_zones = pd.DataFrame(columns=[*ZONE_COLUMNS, "MitigatedTS"])
+    view.selected = (key, (ob_zones, fvg_zones))
+    return ob_zones, fvg_zones
+
+
 def style_order_block_table(table: pd.DataFrame) -> pd.io.formats.style.Styler:
     def row_style(row: pd.Series) -> list[str]:
         text = str(row.get("Type", ""))
@@ -1061,7 +1963,7 @@ def order_block_panel(client: FyersDataClient, symbol: str, spot: float, resolut
         st.warning(f"Unable to fetch order-block candles: {exc}")
         return pd.DataFrame(), 0
 
-    zones = detect_order_blocks(candles, spot, display_date=end_date)
+    zones, _ = streamed_zones(symbol, resolution, candles, spot, display_date=end_date)
     if zones.empty:
         st.info("No active order blocks found in the recent candle window.")
         return zones, len(candles)
@@ -1103,7 +2005,9 @@ def option_contract_ob_context(
 
     # Option contracts are noisier than the index. A wider swing window avoids
     # promoting late displacement candles/FVG stacks as fresh order blocks.
-    ob_zones = detect_order_blocks(
+    ob_zones, fvg_zones = streamed_zones(
+        option_symbol,
+        resolution,
         candles,
         ltp,
         lb=7,
@@ -1112,7 +2016,6 @@ def option_contract_ob_context(
         keep_earliest=True,
         reference_label="LTP",
     )
-    fvg_zones = detect_fvg_zones(candles, ltp, display_date=None, reference_label="LTP")
     zones = pd.concat([ob_zones, fvg_zones], ignore_index=True)
     if not zones.empty:
         zones = zones.sort_values("CreatedTS", ascending=False).reset_index(drop=True)
@@ -1154,87 +2057,77 @@ def selected_option_order_block_panel(
             st.dataframe(style_order_block_table(table), use_container_width=True, hide_index=True)
 
 
-def delta_cell_style(val: Any) -> str:
-    try:
-        num = float(val)
-    except Exception:
-        return ""
-    if num > 0:
-        return "background-color: #dcfce7; color: #0f172a; font-weight: 700;"
-    if num < 0:
-        return "background-color: #fee2e2; color: #0f172a; font-weight: 700;"
-    return "color: #475569;"
+def delta_marks(values: pd.Series) -> np.ndarray:
+    num = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+    return np.where(
+        num > 0,
+        DELTA_MARKS["up"],
+        np.where(num < 0, DELTA_MARKS["down"], np.where(np.isnan(num) & values.notna().to_numpy(), "", DELTA_MARKS["flat"])),
+    )
+
+
+def history_table(view: pd.DataFrame) -> pd.DataFrame:
+    latest_first = view.sort_values("snapshot_ts", ascending=False).reset_index(drop=True)
+    table = latest_first[["Time", "ltp", "volume", "Δ Volume", "oi", "Δ OI", "oi_change_pct"]].rename(
+        columns={"ltp": "LTP", "volume": "Volume", "oi": "OI", "oi_change_pct": "OI Chg %"}
+    )
+    table["Volume"] = table["Volume"].map(as_bucket)
+    table["Δ Volume"] = table["Δ Volume"].map(as_bucket)
+    table["OI"] = table["OI"].map(as_bucket)
+    table["Δ OI"] = table["Δ OI"].map(as_bucket)
+    table["OI Chg %"] = table["OI Chg %"].map(as_pct)
+    for col, raw_col in {"Δ Volume": "volume_delta", "Δ OI": "oi_delta", "OI Chg %": "oi_change_pct"}.items():
+        table[col] = delta_marks(latest_first[raw_col]) + table[col]
+    return table
 
 
 def history_panel(symbol: str, strike: int) -> None:
-    ce_hist = load_history(symbol, strike, "CE")
-    pe_hist = load_history(symbol, strike, "PE")
-    st.subheader(f"Strike {strike} Minute History")
-    st.caption("Stored as 1-minute snapshots. The latest row is shown first, with volume in lakhs/crores and percentages rounded for readability.")
+    resolution = st.radio("Resolution", HISTORY_RESOLUTIONS, horizontal=True, key="history_resolution")
+    history = load_strike_history(symbol, strike, resolution=resolution)
+    st.subheader(f"Strike {strike} {'Minute' if resolution == '1m' else resolution} History")
+    if resolution == "1m":
+        st.caption("Stored as 1-minute snapshots. The latest row is shown first, with volume in lakhs/crores and percentages rounded for readability.")
+    else:
+        st.caption(f"{resolution} buckets rolled up from the minute snapshots: closing LTP and OI, peak volume, OI change since the bucket opened.")
 
-    if ce_hist.empty and pe_hist.empty:
+    if history.empty:
         st.info("No history yet. Keep the app running for a few refreshes and this panel will fill automatically.")
         return
 
-    left, right = st.columns(2)
-
-    def render_history_table(view: pd.DataFrame) -> pd.io.formats.style.Styler:
-        latest_first = view.sort_values("snapshot_ts", ascending=False).reset_index(drop=True)
-        table = latest_first[["Time", "ltp", "volume", "Δ Volume", "oi", "Δ OI", "oi_change_pct"]].rename(
-            columns={"ltp": "LTP", "volume": "Volume", "oi": "OI", "oi_change_pct": "OI Chg %"}
-        )
-        table["LTP"] = table["LTP"].map(lambda v: as_num(v))
-        table["Volume"] = table["Volume"].map(lambda v: as_bucket(v))
-        table["Δ Volume"] = table["Δ Volume"].map(lambda v: as_bucket(v))
-        table["OI"] = table["OI"].map(lambda v: as_bucket(v))
-        table["Δ OI"] = table["Δ OI"].map(lambda v: as_bucket(v))
-        table["OI Chg %"] = table["OI Chg %"].map(lambda v: as_pct(v))
-
-        style = table.style
-        style = style.set_table_styles(
-            [
-                {"selector": "table", "props": [("background-color", "#ffffff"), ("color", "#0f172a")]},
-                {"selector": "thead th", "props": [("background-color", "#f1f5f9"), ("color", "#0f172a")]},
-                {"selector": "tbody td", "props": [("background-color", "#ffffff"), ("color", "#0f172a"), ("border-color", "#dbe4ee")]},
-            ]
-        )
-        def row_style(row: pd.Series) -> list[str]:
-            raw = latest_first.iloc[int(row.name)]
-            styles = [""] * len(row)
-            raw_map = {"Δ Volume": "volume_delta", "Δ OI": "oi_delta", "OI Chg %": "oi_change_pct"}
-            for col, raw_col in raw_map.items():
-                idx = row.index.get_loc(col)
-                styles[idx] = delta_cell_style(raw[raw_col])
-            return styles
-
-        style = style.apply(row_style, axis=1)
-        return style
-
-    with left:
-        st.markdown("**CE snapshot flow**")
-        if ce_hist.empty:
-            st.info("No CE history yet.")
-        else:
-            view = ce_hist.copy()
-            view["Time"] = view["snapshot_ts"].dt.strftime("%H:%M:%S")
+    for col, side in zip(st.columns(2), LEG_INDEX):
+        with col:
+            st.markdown(f"**{side} snapshot flow**")
+            view = history[history["option_type"] == side].reset_index(drop=True)
+            if view.empty:
+                st.info(f"No {side} history yet.")
+                continue
+            view["Time"] = view["snapshot_ts"].dt.strftime({"1m": "%H:%M:%S", "1d": "%d %b"}.get(resolution, "%d %b %H:%M"))
             view["Δ Volume"] = view["volume_delta"].round(0).astype(int)
             view["Δ OI"] = view["oi_delta"].round(0).astype(int)
-            st.dataframe(render_history_table(view), use_container_width=True, hide_index=True)
+            st.dataframe(history_table(view), column_config=HISTORY_COLUMN_CONFIG, use_container_width=True, hide_index=True)
             chart = view.rename(columns={"ltp": "LTP", "oi_change_pct": "OI Chg %"}).set_index("snapshot_ts")
             st.line_chart(chart[["LTP", "OI Chg %"]])
 
-    with right:
-        st.markdown("**PE snapshot flow**")
-        if pe_hist.empty:
-            st.info("No PE history yet.")
-        else:
-            view = pe_hist.copy()
-            view["Time"] = view["snapshot_ts"].dt.strftime("%H:%M:%S")
-            view["Δ Volume"] = view["volume_delta"].round(0).astype(int)
-            view["Δ OI"] = view["oi_delta"].round(0).astype(int)
-            st.dataframe(render_history_table(view), use_container_width=True, hide_index=True)
-            chart = view.rename(columns={"ltp": "LTP", "oi_change_pct": "OI Chg %"}).set_index("snapshot_ts")
-            st.line_chart(chart[["LTP", "OI Chg %"]])
+
+def greeks_panel(frame: pd.DataFrame, spot: float, atm: int) -> None:
+    if "Expiry" not in frame:
+        with st.expander("Greeks by strike", expanded=False):
+            st.info(MISSING_EXPIRY_NOTICE)
+        return
+    frame = with_greeks(frame, spot)
+    columns = [f"{side} {field}" for side in ("CE", "PE") for field in GREEK_FIELDS]
+    if any(column not in frame for column in columns) or frame[columns].isna().all().all():
+        return
+    with st.expander("Greeks by strike", expanded=False):
+        expiry = frame["Expiry"].max()
+        if expiry > 0:
+            st.caption(f"Black-Scholes on LTP, expiry {datetime.fromtimestamp(expiry, IST):%d %b %Y}. Vega per vol point, theta per day.")
+        table = frame[["Strike", *columns]].copy()
+        for column in columns:
+            digits = 4 if column.endswith("Gamma") else 2 if column.endswith(("IV", "Vega", "Theta")) else 3
+            table[column] = table[column].round(digits)
+        table.insert(1, "ATM", np.where(table["Strike"] == atm, "ATM", ""))
+        st.dataframe(table, use_container_width=True, hide_index=True)
 
 
 def strike_checkbox_picker(frame: pd.DataFrame, atm: int) -> int:
@@ -1288,10 +2181,25 @@ def main() -> None:
         show_order_blocks = st.checkbox("Show order blocks", value=True)
         ob_timeframe = st.selectbox("OB timeframe", ["1", "5", "15"], index=1)
         auto_refresh = st.checkbox("Auto refresh every minute", value=True)
+        streaming = st.checkbox("Stream ticks over WebSocket", value=False, disabled=snapshot_source() == "collector")
         if auto_refresh and st_autorefresh is not None:
-            st_autorefresh(interval=AUTO_REFRESH_MS, key="option_chain_refresh")
+            st_autorefresh(interval=STREAM_REFRESH_MS if streaming else AUTO_REFRESH_MS, key="option_chain_refresh")
         st.caption(f"Credentials source: {fyers_credentials_source()}")
         st.caption(f"Storage: {storage_source()}")
+        if supabase_config():
+            writes = write_queue().stats()
+            st.caption(f"Supabase write queue: {writes['pending']} pending, {writes['rows_written']} rows written")
+            if writes["last_error"]:
+                st.caption(f"Last write error: {writes['last_error']}")
+        shared = SHARED_RESPONSES.stats()
+        st.caption(f"Shared FYERS cache: {shared['misses']} upstream, {shared['hits'] + shared['coalesced']} reused")
+        for key, lane in sorted(SCHEDULER.stats().items()):
+            if key.startswith("fyers:"):
+                st.caption(
+                    f"{key}: {lane['queued_live'] + lane['queued_background']} queued, "
+                    f"avg wait {lane['avg_wait_ms']:.0f} ms, max {lane['max_wait_ms']:.0f} ms"
+                )
+        st.caption(f"Snapshots: {'collector (read-only)' if snapshot_source() == 'collector' else 'live fetch'}")
 
     cfg = INDEXES[index_key]
 
@@ -1301,19 +2209,43 @@ def main() -> None:
         st.error(f"FYERS login failed: {exc}")
         st.stop()
 
-    with st.spinner("Pulling live FYERS quote and option chain..."):
+    if snapshot_source() == "collector":
+        summary, frame = load_latest_snapshot(cfg["symbol"])
+        if not summary or frame.empty:
+            st.info("Waiting for the snapshot collector. Start it with `python collector.py`.")
+            st.stop()
+        spot = safe_float(summary.get("spot"))
+        frame = trim_chain(frame, spot, cfg["step"], strikecount)
+        snapshot_ts = pd.to_datetime(summary["snapshot_ts"], errors="coerce")
+        if pd.notna(snapshot_ts) and now_ist() - snapshot_ts > timedelta(minutes=STALE_SNAPSHOT_MINUTES):
+            st.warning(f"Latest collector snapshot is from {summary['snapshot_minute']}; the collector may be stopped.")
+    elif streaming:
         try:
-            spot, options_chain = fetch_snapshot(client, cfg["symbol"], strikecount)
+            spot, frame = stream_snapshot(client, cfg["symbol"], cfg["step"], strikecount)
         except Exception as exc:
             st.error(str(exc))
             st.stop()
+        if frame.empty:
+            st.warning("No option-chain rows were returned.")
+            st.stop()
 
-    frame = normalize_chain(spot, options_chain, cfg["step"], strikecount)
-    if frame.empty:
-        st.warning("No option-chain rows were returned.")
-        st.stop()
+        book = chain_stream(client.socket_token).book(cfg["symbol"])
+        if book is not None and book.claim_minute(now_ist().strftime("%Y-%m-%d %H:%M")):
+            store_snapshot(cfg["symbol"], frame, spot)
+    else:
+        with st.spinner("Pulling live FYERS quote and option chain..."):
+            try:
+                spot, options_chain = fetch_snapshot(client, cfg["symbol"], strikecount)
+            except Exception as exc:
+                st.error(str(exc))
+                st.stop()
+
+        frame = normalize_chain(spot, options_chain, cfg["step"], strikecount)
+        if frame.empty:
+            st.warning("No option-chain rows were returned.")
+            st.stop()
 
-    store_snapshot(cfg["symbol"], frame)
+        store_snapshot(cfg["symbol"], frame, spot)
     bias = market_bias(frame, cfg["symbol"])
     atm = step_round(spot, cfg["step"])
     pcr = frame["PE OI"].sum() / frame["CE OI"].sum() if frame["CE OI"].sum() else 0
@@ -1330,6 +2262,10 @@ def main() -> None:
         metric_box("PCR", f"{pcr:.2f}", "PE OI / CE OI", "good" if pcr > 1 else "bad" if pcr < 1 else "neutral")
     with c5:
         metric_box("ATM Strike", str(atm), "Nearest rounded strike", "neutral")
+    history = load_summary_history(cfg["symbol"])
+    bias_panel(history)
+    levels_panel(frame, spot, history)
+    gex_panel(frame, spot, history)
 
     if show_order_blocks:
         order_block_panel(client, cfg["symbol"], spot, ob_timeframe)
@@ -1377,19 +2313,20 @@ def main() -> None:
         st.session_state._force_strike_radio = f"{selected_strike} {'(ATM)' if selected_strike == atm else ''}".strip()
         strike_checkbox_picker(frame, atm)
 
+    greeks_panel(frame, spot, atm)
     selected_row = frame.loc[frame["Strike"] == selected_strike].iloc[0]
-    tags = build_signal_tags(frame)[selected_row.name]
+    tags = build_signal_tags(frame).loc[selected_row.name]
 
     s1, s2, s3, s4 = st.columns(4)
     with s1:
-        ce_tag, _ = tags["CE"]
+        ce_tag = tags["CE Tag"]
         metric_box("CE Tag", ce_tag, f"OI Chg %: {as_pct(selected_row['CE OI Chg %'])}", tag_display_tone(ce_tag))
     with s2:
         metric_box("Selected Strike", str(selected_strike), f"ATM distance: {selected_strike - atm:+}", "neutral")
     with s3:
         metric_box("Strike IV", as_num(selected_row["IV"]), "Average IV when available", "neutral")
     with s4:
-        pe_tag, _ = tags["PE"]
+        pe_tag = tags["PE Tag"]
         metric_box("PE Tag", pe_tag, f"OI Chg %: {as_pct(selected_row['PE OI Chg %'])}", tag_display_tone(pe_tag))
 
     if show_order_blocks:
@@ -3,12 +3,16 @@ import pandas as pd
 import time
 import io
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from kiteconnect import KiteConnect
 from openpyxl import Workbook
 from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
 from PIL import Image, ImageDraw, ImageFont
 
+import broker_sim
+from rate_limit import SCHEDULER
+
 # ──────────────────────────────────────────────
 # HARDCODE CREDENTIALS CONFIGURATION PLACEHOLDERS
 # ──────────────────────────────────────────────
@@ -100,12 +104,14 @@ def resolve_access_token(raw_token, api_key, api_secret):
         return session_data["access_token"]
     return raw_token
 
-if zerodha_api_key and zerodha_access_token:
+if broker_sim.enabled():
+    st.session_state["kite_client"] = broker_sim.kite_client()
+elif zerodha_api_key and zerodha_access_token:
     try:
         real_token = resolve_access_token(zerodha_access_token, zerodha_api_key, zerodha_api_secret)
         k = KiteConnect(api_key=zerodha_api_key)
         k.set_access_token(real_token)
-        st.session_state["kite_client"] = k
+        st.session_state["kite_client"] = broker_sim.kite_client(k)
     except Exception:
         st.session_state["kite_client"] = None
 else:
@@ -140,6 +146,29 @@ UNDERLYING_MAP = {
     "SENSEX": {"UnderlyingSymbol": "BSE:SENSEX",    "ExchangeSymbol": "SENSEX", "step": 100},
 }
 
+# ──────────────────────────────────────────────
+# BATCHED QUOTE FETCHING
+# ──────────────────────────────────────────────
+KITE_QUOTE_BATCH = 500  # max instruments Kite accepts in one quote() call
+
+@st.cache_resource
+def quote_executor():
+    return ThreadPoolExecutor(max_workers=4)
+
+def fetch_quotes_batched(kite, instruments, batch_size=KITE_QUOTE_BATCH):
+    """Quote any number of instruments in max-size chunks, issued concurrently under the Kite rate limit."""
+    instruments = list(dict.fromkeys(instruments))
+    chunks = [instruments[i:i + batch_size] for i in range(0, len(instruments), batch_size)]
+
+    def fetch_chunk(chunk):
+        SCHEDULER.acquire("kite", "quote")
+        return kite.quote(chunk)
+
+    quotes = {}
+    for result in quote_executor().map(fetch_chunk, chunks):
+        quotes.update(result)
+    return quotes
+
 # ──────────────────────────────────────────────
 # METRICS GRAPHICS & ALERT ENGINE
 # ──────────────────────────────────────────────
@@ -522,6 +551,7 @@ cfg = UNDERLYING_MAP[st.session_state.index_choice]
 # Safely verify backend context using cached connection assets
 if st.session_state["kite_client"] is not None:
     try:
+        SCHEDULER.acquire("kite", "quote")
         indices_quote = st.session_state["kite_client"].quote(cfg["UnderlyingSymbol"])
         ltp = float(indices_quote[cfg["UnderlyingSymbol"]]["last_price"])
         atm = round(ltp / cfg["step"]) * cfg["step"]
@@ -549,10 +579,7 @@ if st.session_state["kite_client"] is not None:
             ]
 
             trading_symbols = chain_instruments["tradingsymbol"].apply(lambda x: f"NFO:{x}").tolist()
-            chunks = [trading_symbols[i:i + 50] for i in range(0, len(trading_symbols), 50)]
-            quotes = {}
-            for chunk in chunks:
-                quotes.update(st.session_state["kite_client"].quote(chunk))
+            quotes = fetch_quotes_batched(st.session_state["kite_client"], trading_symbols)
 
             strikes_data = {}
             for _, inst in chain_instruments.iterrows():
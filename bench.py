@@ -0,0 +1,1209 @@
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from broker_sim import IST, SESSION_CLOSE, SimConfig, SimulatedDhanHttp, SimulatedFyers
+from fyers_client import CANDLE_COLUMNS
+from rate_limit import SCHEDULER
+
+
+# A mid-session weekday minute, so every run sees the same synthetic market.
+BENCH_MINUTE = datetime(2026, 10, 15, 11, 30, tzinfo=IST)
+
+
+class StopRun(Exception):
+    pass
+
+
+def timed(fn: Callable[[], Any], runs: int, setup: Callable[[], Any] | None = None) -> list[float]:
+    samples: list[float] = []
+    for _ in range(runs):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return samples
+
+
+def report(label: str, samples: list[float]) -> None:
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    print(
+        f"{label:<44} runs={len(samples):<4} mean={statistics.fmean(samples):9.2f} ms  "
+        f"p50={statistics.median(samples):9.2f} ms  p95={p95:9.2f} ms  max={ordered[-1]:9.2f} ms",
+        flush=True,
+    )
+
+
+def sim_config(args: argparse.Namespace) -> SimConfig:
+    return SimConfig(
+        latency_s=args.latency_ms / 1000.0,
+        jitter_s=args.jitter_ms / 1000.0,
+        error_rate=args.error_rate,
+        seed=args.seed,
+        fixed_minute=BENCH_MINUTE,
+    )
+
+
+def isolate_storage(directory: Path) -> None:
+    import app
+
+    # Keeps benchmark writes out of the real history database and off Supabase.
+    app.DB_PATH = directory / "bench_history.sqlite3"
+    app.supabase_config = lambda: {}
+
+
+def bench_pipeline(args: argparse.Namespace) -> None:
+    import app
+    from fyers_client import SHARED_RESPONSES, FyersDataClient
+
+    with tempfile.TemporaryDirectory() as tmp:
+        isolate_storage(Path(tmp))
+        app.history_db()
+        client = FyersDataClient(fyers=SimulatedFyers(sim_config(args)))
+        symbols = [cfg["symbol"] for cfg in app.INDEXES.values()]
+
+        def fetch() -> dict[str, Any]:
+            snapshots, _ = app.fetch_snapshots(client, symbols, args.strikecount)
+            return snapshots
+
+        def fetch_and_store() -> None:
+            snapshots = fetch()
+            for cfg in app.INDEXES.values():
+                if cfg["symbol"] not in snapshots:
+                    continue
+                spot, chain = snapshots[cfg["symbol"]]
+                frame = app.normalize_chain(spot, chain, cfg["step"], args.strikecount)
+                app.store_snapshot(cfg["symbol"], frame, spot, stamp=BENCH_MINUTE, background=False)
+
+        report(f"fetch {len(symbols)} chains x{args.strikecount}", timed(fetch, args.runs, SHARED_RESPONSES.clear))
+        report("fetch + normalize + store (SQLite)", timed(fetch_and_store, args.runs, SHARED_RESPONSES.clear))
+
+
+def bench_storage(args: argparse.Namespace) -> None:
+    import app
+
+    with tempfile.TemporaryDirectory() as tmp:
+        isolate_storage(Path(tmp))
+        app.history_db()
+        client = SimulatedFyers(SimConfig(seed=args.seed, fixed_minute=BENCH_MINUTE))
+        cfg = app.INDEXES["NIFTY"]
+        for strikecount in (10, 100):
+            chain = client.optionchain({"symbol": cfg["symbol"], "strikecount": strikecount})["data"]["optionsChain"]
+            spot = float(chain[0]["ltp"])
+            frame = app.normalize_chain(spot, chain, cfg["step"], strikecount)
+            report(
+                f"store_snapshot {len(frame)} strikes",
+                timed(lambda: app.store_snapshot(cfg["symbol"], frame, spot, stamp=BENCH_MINUTE, background=False), args.runs),
+            )
+            report(f"load_latest_snapshot {len(frame)} strikes", timed(lambda: app.load_latest_snapshot(cfg["symbol"]), args.runs))
+            report(f"load_history {len(frame)} strikes", timed(lambda: app.load_history(cfg["symbol"], int(frame["Strike"].iloc[len(frame) // 2]), "CE"), args.runs))
+
+
+def bench_app_main(args: argparse.Namespace) -> None:
+    os.environ["BROKER_SIM"] = "synthetic"
+    os.environ["BROKER_SIM_MINUTE"] = BENCH_MINUTE.strftime("%Y-%m-%d %H:%M")
+    os.environ["BROKER_SIM_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["BROKER_SIM_JITTER_MS"] = str(args.jitter_ms)
+    os.environ["BROKER_SIM_ERROR_RATE"] = str(args.error_rate)
+    os.environ["BROKER_SIM_SEED"] = str(args.seed)
+
+    from streamlit.logger import set_log_level
+
+    import app
+    from fyers_client import SHARED_RESPONSES
+
+    set_log_level("error")
+    stopped = 0
+
+    def stop() -> None:
+        raise StopRun
+
+    def run_main() -> None:
+        nonlocal stopped
+        try:
+            app.main()
+        except StopRun:
+            stopped += 1
+
+    # Outside a script run st.stop() returns normally; raise the way the real runner does.
+    app.st.stop = stop
+    with tempfile.TemporaryDirectory() as tmp:
+        isolate_storage(Path(tmp))
+        report("app.main (cold shared cache)", timed(run_main, args.runs, SHARED_RESPONSES.clear))
+        report("app.main (warm shared cache)", timed(run_main, args.runs))
+    if stopped:
+        print(f"{stopped} runs stopped early on a broker error", flush=True)
+
+
+def bench_alert(args: argparse.Namespace) -> None:
+    import alert
+
+    alert.HTTP = SimulatedDhanHttp(sim_config(args))
+    for name, cfg in alert.INDICES.items():
+        report(f"alert.fetch_and_alert {name}", timed(lambda: alert.fetch_and_alert(name, cfg), args.runs))
+
+
+# The dict-of-dicts normalizer app.normalize_chain replaced, kept as the baseline.
+def normalize_chain_rowwise(app: Any, spot: float, options_chain: list[dict[str, Any]], step: int, strikecount: int) -> pd.DataFrame:
+    grouped: dict[int, dict[str, dict[str, Any]]] = {}
+    for contract in options_chain:
+        strike = app.safe_int(contract.get("strike_price"))
+        side = str(contract.get("option_type", "")).upper().strip()
+        if strike > 0 and side in {"CE", "PE"}:
+            grouped.setdefault(strike, {})[side] = contract
+
+    center = app.step_round(spot, step) if spot else 0
+    strikes = [center + (i * step) for i in range(-strikecount, strikecount + 1)]
+
+    rows: list[dict[str, Any]] = []
+    for strike in strikes:
+        ce = grouped.get(strike, {}).get("CE", {})
+        pe = grouped.get(strike, {}).get("PE", {})
+
+        ce_oi = app.safe_float(ce.get("oi", 0))
+        pe_oi = app.safe_float(pe.get("oi", 0))
+        ce_oi_pct = app.safe_float(ce.get("oichp", 0))
+        pe_oi_pct = app.safe_float(pe.get("oichp", 0))
+
+        rows.append(
+            {
+                "Strike": strike,
+                "IV": ((app.safe_float(ce.get("iv", 0)) + app.safe_float(pe.get("iv", 0))) / 2) or None,
+                "CE Symbol": str(ce.get("symbol", "")).strip(),
+                "CE Volume": app.safe_float(ce.get("volume", 0)),
+                "CE OI": ce_oi,
+                "CE OI Chg": app.infer_oi_change(ce_oi, ce_oi_pct),
+                "CE OI Chg %": ce_oi_pct,
+                "CE Change": app.safe_float(ce.get("ltpchp", ce.get("chp", 0))),
+                "CE LTP": app.safe_float(ce.get("ltp", 0)),
+                "PE Symbol": str(pe.get("symbol", "")).strip(),
+                "PE LTP": app.safe_float(pe.get("ltp", 0)),
+                "PE Change": app.safe_float(pe.get("ltpchp", pe.get("chp", 0))),
+                "PE OI Chg %": pe_oi_pct,
+                "PE OI Chg": app.infer_oi_change(pe_oi, pe_oi_pct),
+                "PE OI": pe_oi,
+                "PE Volume": app.safe_float(pe.get("volume", 0)),
+            }
+        )
+
+    return pd.DataFrame(rows).sort_values("Strike").reset_index(drop=True)
+
+
+def synthetic_chain(strikes: int, step: int = 50, seed: int = 7) -> tuple[float, list[dict[str, Any]]]:
+    client = SimulatedFyers(SimConfig(seed=seed, fixed_minute=BENCH_MINUTE))
+    spot = client.market.spot("NSE:NIFTY50-INDEX")
+    atm = round(spot / step) * step
+    expiry = BENCH_MINUTE.date() + timedelta(days=7)
+    # Stamped the way app.fetch_chain stamps FYERS contracts from expiryData.
+    expiry_ts = datetime.combine(expiry, SESSION_CLOSE, IST).timestamp()
+    chain: list[dict[str, Any]] = [{"symbol": "NSE:NIFTY50-INDEX", "strike_price": -1, "option_type": "", "ltp": spot}]
+    for i in range(-(strikes // 2), strikes - strikes // 2):
+        for side in ("CE", "PE"):
+            leg = client.market.contract("NSE:NIFTY50-INDEX", spot, atm + i * step, side, step, expiry)
+            chain.append({"symbol": f"NSE:NIFTY{atm + i * step}{side}", "strike_price": atm + i * step, "option_type": side, "expiry": expiry_ts, **leg})
+    return spot, chain
+
+
+def bench_normalize(args: argparse.Namespace) -> None:
+    import app
+
+    for strikes in (20, 200, 2000):
+        # Fine strike spacing keeps 2,000 strikes on positive prices.
+        step = 5 if strikes > 400 else 50
+        spot, chain = synthetic_chain(strikes, step, args.seed)
+        strikecount = strikes // 2
+        expected = normalize_chain_rowwise(app, spot, chain, step, strikecount)
+        pd.testing.assert_frame_equal(expected, app.normalize_chain(spot, chain, step, strikecount)[expected.columns])
+        before = timed(lambda: normalize_chain_rowwise(app, spot, chain, step, strikecount), args.runs)
+        # The columnar side also solves IV and greeks for every leg, which the rowwise baseline never did.
+        after = timed(lambda: app.normalize_chain(spot, chain, step, strikecount), args.runs)
+        report(f"normalize_chain rowwise {strikes} strikes", before)
+        report(f"normalize_chain columnar {strikes} strikes", after)
+        print(f"{'':<44} speedup x{statistics.median(before) / statistics.median(after):.1f}", flush=True)
+
+
+# The iterrows tagger app.build_signal_tags replaced, kept as the baseline.
+def build_signal_tags_rowwise(app: Any, frame: pd.DataFrame, top_n: int = 5) -> dict[Any, dict[str, tuple[str, str]]]:
+    tags = {idx: {"CE": ("-", "neutral"), "PE": ("-", "neutral")} for idx in frame.index}
+    volume_winners: list[tuple[float, Any, str]] = []
+    oi_winners: list[tuple[float, Any, str]] = []
+
+    for idx, row in frame.iterrows():
+        ce_volume = app.safe_float(row["CE Volume"])
+        pe_volume = app.safe_float(row["PE Volume"])
+        ce_oi_pct = app.safe_float(row["CE OI Chg %"])
+        pe_oi_pct = app.safe_float(row["PE OI Chg %"])
+
+        if ce_volume > pe_volume:
+            volume_winners.append((ce_volume, idx, "CE"))
+        elif pe_volume > ce_volume:
+            volume_winners.append((pe_volume, idx, "PE"))
+
+        if ce_oi_pct > pe_oi_pct:
+            oi_winners.append((max(ce_oi_pct, 0.0), idx, "CE"))
+        elif pe_oi_pct > ce_oi_pct:
+            oi_winners.append((max(pe_oi_pct, 0.0), idx, "PE"))
+
+    for rank, (_, idx, side) in enumerate(sorted(volume_winners, reverse=True)[:top_n], start=1):
+        tags[idx][side] = (f"BUY{app._rank_suffix(rank)}", app._tone_for_side_signal(side, "BUY"))
+
+    for rank, (_, idx, side) in enumerate(sorted(oi_winners, reverse=True)[:top_n], start=1):
+        tags[idx][side] = (f"SELL{app._rank_suffix(rank)}", app._tone_for_side_signal(side, "SELL"))
+
+    return tags
+
+
+def bench_signal_tags(args: argparse.Namespace) -> None:
+    import app
+
+    for strikes in (21, 201, 2001):
+        step = 5 if strikes > 400 else 50
+        spot, chain = synthetic_chain(strikes, step, args.seed)
+        frame = app.normalize_chain(spot, chain, step, strikes // 2)
+        expected = build_signal_tags_rowwise(app, frame)
+        tagged = app._compute_signal_tags(frame, app.SIGNAL_TOP_N)
+        assert all(
+            expected[idx][side] == (tagged.at[idx, f"{side} Tag"], tagged.at[idx, f"{side} Tone"]) for idx in frame.index for side in ("CE", "PE")
+        )
+        # Each rerun tags the frame three times: market_bias, format_display and the strike cards.
+        before = timed(lambda: [build_signal_tags_rowwise(app, frame) for _ in range(3)], args.runs)
+        after = timed(lambda: [app._compute_signal_tags(frame, app.SIGNAL_TOP_N)], args.runs)
+        shared = timed(lambda: [app.build_signal_tags(frame) for _ in range(3)], args.runs, app._SIGNAL_TAGS.clear)
+        report(f"signal tags iterrows x3 {strikes} strikes", before)
+        report(f"signal tags vectorized x1 {strikes} strikes", after)
+        report(f"signal tags memoized x3 {strikes} strikes", shared)
+        print(f"{'':<44} speedup x{statistics.median(before) / statistics.median(shared):.1f}", flush=True)
+
+
+# The per-row Styler callbacks app.style_table and app.history_table replaced, kept as the baseline.
+def style_table_rowwise(app: Any, display: pd.DataFrame, raw_frame: pd.DataFrame, atm: int) -> Any:
+    tops = {column: set(raw_frame[column].nlargest(3).index) for column in ("CE Volume", "CE OI", "PE Volume", "PE OI Chg %")}
+    kinds = {"CE Volume": "ce_volume", "CE OI": "ce_oi", "PE Volume": "pe_volume", "PE OI Chg %": "pe_oichg"}
+
+    def tone_from_tag(tag: Any) -> str:
+        text = str(tag or "").upper()
+        return "bullish" if text.startswith("BUY") else "bearish" if text.startswith("SELL") else "neutral"
+
+    def row_style(row: pd.Series) -> list[str]:
+        styles = [""] * len(row)
+        for column in ("CE Tag", "PE Tag"):
+            tone = tone_from_tag(row.get(column))
+            if tone != "neutral" and column in row.index:
+                styles[row.index.get_loc(column)] = app.TABLE_CSS[f"{tone}_tag"]
+        for column, top in tops.items():
+            if row.name in top and column in row.index:
+                styles[row.index.get_loc(column)] = app.TABLE_CSS[kinds[column]]
+        if int(row.get("Strike", 0)) == atm and "Strike" in row.index:
+            styles[row.index.get_loc("Strike")] = app.TABLE_CSS["atm"]
+        return styles
+
+    return display.style.apply(row_style, axis=1)
+
+
+def history_table_rowwise(app: Any, view: pd.DataFrame) -> Any:
+    latest_first = view.sort_values("snapshot_ts", ascending=False).reset_index(drop=True)
+    table = latest_first[["Time", "ltp", "volume", "Δ Volume", "oi", "Δ OI", "oi_change_pct"]].rename(
+        columns={"ltp": "LTP", "volume": "Volume", "oi": "OI", "oi_change_pct": "OI Chg %"}
+    )
+    for column, formatter in (("LTP", app.as_num), ("Volume", app.as_bucket), ("Δ Volume", app.as_bucket), ("OI", app.as_bucket), ("Δ OI", app.as_bucket), ("OI Chg %", app.as_pct)):
+        table[column] = table[column].map(lambda v, formatter=formatter: formatter(v))
+
+    def row_style(row: pd.Series) -> list[str]:
+        raw = latest_first.iloc[int(row.name)]
+        styles = [""] * len(row)
+        for column, raw_column in {"Δ Volume": "volume_delta", "Δ OI": "oi_delta", "OI Chg %": "oi_change_pct"}.items():
+            styles[row.index.get_loc(column)] = delta_cell_style(raw[raw_column])
+        return styles
+
+    return table.style.apply(row_style, axis=1)
+
+
+# The cell colours the history table used before its tones became text marks.
+DELTA_CSS = {
+    "up": "background-color: #dcfce7; color: #0f172a; font-weight: 700;",
+    "down": "background-color: #fee2e2; color: #0f172a; font-weight: 700;",
+    "flat": "color: #475569;",
+}
+
+
+def delta_tone(val: Any) -> str:
+    try:
+        num = float(val)
+    except Exception:
+        return ""
+    return "up" if num > 0 else "down" if num < 0 else "flat"
+
+
+def delta_cell_style(val: Any) -> str:
+    tone = delta_tone(val)
+    return DELTA_CSS[tone] if tone else ""
+
+
+def synthetic_history(rows: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame(
+        {
+            "snapshot_ts": pd.date_range(BENCH_MINUTE, periods=rows, freq="min"),
+            "ltp": rng.uniform(50, 400, rows).round(2),
+            "volume": np.cumsum(rng.integers(0, 200_000, rows)).astype(float),
+            "oi": rng.integers(1_000_000, 9_000_000, rows).astype(float),
+            "oi_change_pct": rng.normal(0, 4, rows).round(2),
+        }
+    )
+    frame.loc[rng.integers(0, rows, rows // 10), "oi"] = frame["oi"].shift(1)
+    frame["volume_delta"] = frame["volume"].diff().fillna(0)
+    frame["oi_delta"] = frame["oi"].diff().fillna(0)
+    frame["Time"] = frame["snapshot_ts"].dt.strftime("%H:%M:%S")
+    frame["Δ Volume"] = frame["volume_delta"].round(0).astype(int)
+    frame["Δ OI"] = frame["oi_delta"].round(0).astype(int)
+    return frame
+
+
+def bench_render(args: argparse.Namespace) -> None:
+    import app
+    from streamlit import dataframe_util
+    from streamlit.elements.lib.column_config_utils import marshall_column_config, process_config_mapping
+    from streamlit.elements.lib.pandas_styler_utils import marshall_styler
+    from streamlit.proto.Dataframe_pb2 import Dataframe as DataframeProto
+
+    def build(make: Callable[[], Any]) -> Any:
+        data = make()
+        return data._compute() if isinstance(data, pd.io.formats.style.Styler) else data
+
+    # The eager half of st.dataframe: Styler CSS (when given one), arrow bytes and the column config.
+    def render(make: Callable[[], Any], config: dict[str, Any] | None = None) -> None:
+        data = make()
+        proto = DataframeProto()
+        if isinstance(data, pd.io.formats.style.Styler):
+            marshall_styler(proto.arrow_data, data, "bench")
+            data = data.data
+        proto.arrow_data.data = dataframe_util.convert_pandas_df_to_arrow_bytes(data)
+        marshall_column_config(proto, process_config_mapping(config))
+
+    spot, chain = synthetic_chain(21, 50, args.seed)
+    frame = app.normalize_chain(spot, chain, 50, 10)
+    atm = app.step_round(spot, 50)
+    display = app.format_display(frame, "NSE:NIFTY50-INDEX", atm)
+    view = synthetic_history(90, args.seed)
+
+    assert style_table_rowwise(app, display, frame, atm)._compute().ctx == app.style_table(display, frame, atm)._compute().ctx
+    # Same text as the Styler table, with each old cell colour carried by its mark instead.
+    old, new = history_table_rowwise(app, view).data, app.history_table(view)
+    latest_first = view.sort_values("snapshot_ts", ascending=False).reset_index(drop=True)
+    for column, raw_column in {"Δ Volume": "volume_delta", "Δ OI": "oi_delta", "OI Chg %": "oi_change_pct"}.items():
+        marks = latest_first[raw_column].map(lambda val: app.DELTA_MARKS.get(delta_tone(val), ""))
+        old[column] = marks + old[column]
+    old["LTP"] = latest_first["ltp"]
+    pd.testing.assert_frame_equal(new, old, check_dtype=False)
+
+    cases = (
+        ("chain table 21 rows", "matrix", lambda: style_table_rowwise(app, display, frame, atm), lambda: app.style_table(display, frame, atm), None),
+        ("history table 90 rows", "config", lambda: history_table_rowwise(app, view), lambda: app.history_table(view), app.HISTORY_COLUMN_CONFIG),
+    )
+    for label, kind, old_make, new_make, config in cases:
+        for stage, before_run, after_run in (
+            ("styles", lambda: build(old_make), lambda: build(new_make)),
+            ("render", lambda: render(old_make), lambda: render(new_make, config)),
+        ):
+            before = timed(before_run, args.runs)
+            after = timed(after_run, args.runs)
+            report(f"{label} {stage} per-row", before)
+            report(f"{label} {stage} {kind}", after)
+            print(f"{'':<44} speedup x{statistics.median(before) / statistics.median(after):.1f}", flush=True)
+
+
+# The pandas-slicing scan app.detect_order_blocks replaced, kept as the baseline.
+def detect_order_blocks_rowwise(
+    candles: pd.DataFrame,
+    spot: float,
+    lb: int = 5,
+    per_side_limit: int = 3,
+    display_date: Any | None = None,
+    keep_earliest: bool = True,
+    reference_label: str = "spot",
+) -> pd.DataFrame:
+    if candles.empty or len(candles) < (lb * 2) + 2:
+        return pd.DataFrame(columns=["Type", "Zone", "Low", "High", "CreatedTS", "Created", "Distance", "Status"])
+
+    frame = candles.sort_values("timestamp").reset_index(drop=True).copy()
+    pivot_highs: dict[int, float] = {}
+    pivot_lows: dict[int, float] = {}
+    for i in range(lb, len(frame) - lb):
+        high_window = frame.loc[i - lb : i + lb, "high"]
+        low_window = frame.loc[i - lb : i + lb, "low"]
+        if frame.at[i, "high"] == high_window.max():
+            pivot_highs[i + lb] = float(frame.at[i, "high"])
+        if frame.at[i, "low"] == low_window.min():
+            pivot_lows[i + lb] = float(frame.at[i, "low"])
+
+    last_swing_high: float | None = None
+    last_swing_low: float | None = None
+    last_red_idx: int | None = None
+    last_green_idx: int | None = None
+    order_blocks: list[dict[str, Any]] = []
+
+    for i, row in frame.iterrows():
+        if i in pivot_highs:
+            last_swing_high = pivot_highs[i]
+        if i in pivot_lows:
+            last_swing_low = pivot_lows[i]
+
+        previous_close = float(frame.at[i - 1, "close"]) if i > 0 else float(row["close"])
+        close = float(row["close"])
+
+        if last_swing_high is not None and previous_close <= last_swing_high < close and last_red_idx is not None:
+            candle = frame.loc[last_red_idx]
+            order_blocks.append(
+                {
+                    "type": "Bullish OB",
+                    "low": float(candle["low"]),
+                    "high": float(candle["high"]),
+                    "created": candle["timestamp"],
+                }
+            )
+            last_swing_high = None
+
+        if last_swing_low is not None and previous_close >= last_swing_low > close and last_green_idx is not None:
+            candle = frame.loc[last_green_idx]
+            order_blocks.append(
+                {
+                    "type": "Bearish OB",
+                    "low": float(candle["low"]),
+                    "high": float(candle["high"]),
+                    "created": candle["timestamp"],
+                }
+            )
+            last_swing_low = None
+
+        if close > float(row["open"]):
+            last_green_idx = i
+        elif close < float(row["open"]):
+            last_red_idx = i
+
+    rows: list[dict[str, Any]] = []
+    for zone in order_blocks:
+        created_ts = pd.to_datetime(zone["created"])
+        if zone["low"] <= spot <= zone["high"]:
+            status = f"{reference_label.title()} inside zone"
+            distance = 0.0
+        elif spot < zone["low"]:
+            status = f"Above {reference_label}"
+            distance = zone["low"] - spot
+        else:
+            status = f"Below {reference_label}"
+            distance = spot - zone["high"]
+        rows.append(
+            {
+                "Type": zone["type"],
+                "Zone": f"{zone['low']:,.2f} - {zone['high']:,.2f}",
+                "Low": zone["low"],
+                "High": zone["high"],
+                "CreatedTS": created_ts,
+                "Created": created_ts.strftime("%d %b %H:%M") if display_date is None else created_ts.strftime("%H:%M"),
+                "Distance": distance,
+                "Status": status,
+            }
+        )
+
+    if not rows:
+        return pd.DataFrame(columns=["Type", "Zone", "Low", "High", "CreatedTS", "Created", "Distance", "Status"])
+
+    zones = pd.DataFrame(rows)
+    if display_date is not None:
+        same_day = zones["CreatedTS"].dt.date == display_date
+        if same_day.any():
+            zones = zones.loc[same_day].copy()
+
+    selected_parts: list[pd.DataFrame] = []
+    for _, side_frame in zones.groupby("Type", sort=False):
+        if keep_earliest:
+            earliest = side_frame.sort_values("CreatedTS", ascending=True).head(1)
+            remaining = side_frame.drop(index=earliest.index)
+            closest = remaining.sort_values(["Distance", "CreatedTS"], ascending=[True, False]).head(max(per_side_limit - 1, 0))
+            selected_parts.append(pd.concat([earliest, closest]))
+        else:
+            closest = side_frame.sort_values(["Distance", "CreatedTS"], ascending=[True, False]).head(per_side_limit)
+            selected_parts.append(closest)
+
+    selected = pd.concat(selected_parts) if selected_parts else zones.head(0)
+    return selected.sort_values("CreatedTS", ascending=False).reset_index(drop=True)
+
+
+def synthetic_candles(days: int, seed: int = 7) -> pd.DataFrame:
+    market = SimulatedFyers(SimConfig(seed=seed, fixed_minute=BENCH_MINUTE)).market
+    start = BENCH_MINUTE
+    while np.busday_count(start.date(), BENCH_MINUTE.date()) < days - 1:
+        start -= timedelta(days=1)
+    candles = market.candles("NSE:NIFTY50-INDEX", "1", start.replace(hour=0, minute=0), BENCH_MINUTE.replace(hour=23, minute=59))
+    frame = pd.DataFrame(candles, columns=CANDLE_COLUMNS)
+    frame["timestamp"] = pd.to_datetime(frame["timestamp"], unit="s", utc=True).dt.tz_convert("Asia/Kolkata")
+    return frame
+
+
+def bench_order_blocks(args: argparse.Namespace) -> None:
+    import app
+
+    for days in (3, 30, 250):
+        candles = synthetic_candles(days, args.seed)
+        spot = float(candles["close"].iloc[-1])
+        pd.testing.assert_frame_equal(detect_order_blocks_rowwise(candles, spot), app.detect_order_blocks(candles, spot))
+        # The rowwise scan takes tens of seconds on a year of minutes; one run is enough to show it.
+        before = timed(lambda: detect_order_blocks_rowwise(candles, spot), args.runs if days < 250 else 1)
+        after = timed(lambda: app.detect_order_blocks(candles, spot), args.runs)
+        report(f"order blocks rowwise {days}d ({len(candles)} candles)", before)
+        report(f"order blocks numpy {days}d", after)
+        print(f"{'':<44} speedup x{statistics.median(before) / statistics.median(after):.1f}", flush=True)
+
+
+# The per-candle .loc scan app.detect_fvg_zones replaced, kept as the baseline.
+def detect_fvg_zones_rowwise(
+    candles: pd.DataFrame,
+    spot: float,
+    display_date: Any | None = None,
+    limit: int = 6,
+    reference_label: str = "spot",
+) -> pd.DataFrame:
+    if candles.empty or len(candles) < 3:
+        return pd.DataFrame(columns=["Type", "Zone", "Low", "High", "CreatedTS", "Created", "Distance", "Status"])
+
+    frame = candles.sort_values("timestamp").reset_index(drop=True).copy()
+    rows: list[dict[str, Any]] = []
+    for i in range(2, len(frame)):
+        current = frame.loc[i]
+        middle = frame.loc[i - 1]
+        prior = frame.loc[i - 2]
+        zone_type: str | None = None
+        low = high = 0.0
+
+        if float(prior["high"]) < float(current["low"]) and float(middle["close"]) > float(prior["high"]):
+            zone_type = "Bullish FVG"
+            low = float(prior["high"])
+            high = float(current["low"])
+        elif float(prior["low"]) > float(current["high"]) and float(middle["close"]) < float(prior["low"]):
+            zone_type = "Bearish FVG"
+            low = float(current["high"])
+            high = float(prior["low"])
+
+        if zone_type is None:
+            continue
+
+        created_ts = pd.to_datetime(current["timestamp"])
+        if low <= spot <= high:
+            status = f"{reference_label.title()} inside zone"
+            distance = 0.0
+        elif spot < low:
+            status = f"Above {reference_label}"
+            distance = low - spot
+        else:
+            status = f"Below {reference_label}"
+            distance = spot - high
+
+        rows.append(
+            {
+                "Type": zone_type,
+                "Zone": f"{low:,.2f} - {high:,.2f}",
+                "Low": low,
+                "High": high,
+                "CreatedTS": created_ts,
+                "Created": created_ts.strftime("%d %b %H:%M") if display_date is None else created_ts.strftime("%H:%M"),
+                "Distance": distance,
+                "Status": status,
+            }
+        )
+
+    if not rows:
+        return pd.DataFrame(columns=["Type", "Zone", "Low", "High", "CreatedTS", "Created", "Distance", "Status"])
+
+    zones = pd.DataFrame(rows)
+    if display_date is not None:
+        same_day = zones["CreatedTS"].dt.date == display_date
+        if same_day.any():
+            zones = zones.loc[same_day].copy()
+
+    return zones.sort_values("CreatedTS", ascending=False).head(limit).reset_index(drop=True)
+
+
+def bench_fvg(args: argparse.Namespace) -> None:
+    import app
+
+    for days in (3, 30, 250):
+        candles = synthetic_candles(days, args.seed)
+        spot = float(candles["close"].iloc[-1])
+        everything = len(candles)
+        pd.testing.assert_frame_equal(
+            detect_fvg_zones_rowwise(candles, spot, limit=everything), app.detect_fvg_zones(candles, spot, limit=everything).drop(columns="MitigatedTS")
+        )
+        live = app.detect_fvg_zones(candles, spot, limit=everything, live_only=True)
+        before = timed(lambda: detect_fvg_zones_rowwise(candles, spot), args.runs if days < 250 else 1)
+        after = timed(lambda: app.detect_fvg_zones(candles, spot, live_only=True), args.runs)
+        report(f"fvg rowwise {days}d ({len(candles)} candles)", before)
+        report(f"fvg numpy + mitigation {days}d ({len(live)} live)", after)
+        print(f"{'':<44} speedup x{statistics.median(before) / statistics.median(after):.1f}", flush=True)
+
+
+def check_zone_stream_sliding(app: Any, seed: int, days: int = 8, window_days: int = 4, chunk: int = 37) -> int:
+    # Candles arrive chunk by chunk while a window of the last window_days sessions slides over them.
+    candles = synthetic_candles(days, seed)
+    dates = candles["timestamp"].dt.date
+    symbol = f"SLIDE:{seed}"
+    windows = 0
+    for end in range(chunk, len(candles) + chunk, chunk):
+        seen = candles.iloc[:end]
+        recent = sorted(set(dates.iloc[:end]))[-window_days:]
+        window = seen[dates.iloc[:end].isin(recent)]
+        spot = float(window["close"].iloc[-1])
+        ob_zones, fvg_zones = app.streamed_zones(symbol, "1", window, spot, display_date=recent[-1])
+        pd.testing.assert_frame_equal(ob_zones, app.detect_order_blocks(window, spot, display_date=recent[-1]), check_dtype=False)
+        pd.testing.assert_frame_equal(fvg_zones, app.detect_fvg_zones(window, spot, display_date=recent[-1], live_only=True), check_dtype=False)
+        windows += 1
+    return windows
+
+
+def bench_zone_stream(args: argparse.Namespace) -> None:
+    import app
+    import zone_stream
+
+    windows = sum(check_zone_stream_sliding(app, args.seed + offset) for offset in range(4))
+    print(f"stream matches the batch detectors on {windows} sliding windows", flush=True)
+    for days in (3, 30):
+        candles = synthetic_candles(days, args.seed)
+        previous = candles.iloc[:-1]
+        spot = float(candles["close"].iloc[-1])
+
+        def rescan() -> None:
+            app.detect_order_blocks(candles, spot, display_date=BENCH_MINUTE.date())
+            app.detect_fvg_zones(candles, spot, live_only=True)
+
+        def warm() -> None:
+            # The previous rerun already streamed every candle but the one that just arrived.
+            zone_stream.STREAMS.clear()
+            app.streamed_zones("NSE:NIFTY50-INDEX", "1", previous, spot, display_date=BENCH_MINUTE.date())
+
+        def stream() -> None:
+            app.streamed_zones("NSE:NIFTY50-INDEX", "1", candles, spot, display_date=BENCH_MINUTE.date())
+
+        before = timed(rescan, args.runs)
+        after = timed(stream, args.runs, warm)
+        # A rerun inside the same minute sees the same forming candle and reuses the selected rows.
+        rerun = timed(stream, args.runs)
+        report(f"zones full rescan {days}d", before)
+        report(f"zones stream one new candle {days}d", after)
+        print(f"{'':<44} speedup x{statistics.median(before) / statistics.median(after):.1f}", flush=True)
+        report(f"zones stream rerun, same candle {days}d", rerun)
+        print(f"{'':<44} speedup x{statistics.median(before) / statistics.median(rerun):.1f}", flush=True)
+
+
+# The scalar per-contract greeks from oldfiles/liveNSE.py, kept as the baseline.
+def bs_greeks_scalar(S: float, K: float, r: float, sigma: float, t: float, option_type: str = "call") -> dict[str, float | None]:
+    if sigma is None or not sigma > 0 or t <= 0:
+        return {"Delta": None, "Gamma": None, "Vega": None, "Theta": None}
+    d1 = (math.log(S / K) + (r + 0.5 * sigma * sigma) * t) / (sigma * math.sqrt(t))
+    d2 = d1 - sigma * math.sqrt(t)
+    nd1 = math.exp(-0.5 * d1 * d1) / math.sqrt(2 * math.pi)
+    cdf_d1 = 0.5 * (1.0 + math.erf(d1 / math.sqrt(2.0)))
+    cdf_d2 = 0.5 * (1.0 + math.erf(d2 / math.sqrt(2.0)))
+    if option_type.lower().startswith("c"):
+        delta = cdf_d1
+        theta = -(S * nd1 * sigma) / (2 * math.sqrt(t)) - r * K * math.exp(-r * t) * cdf_d2
+    else:
+        delta = cdf_d1 - 1
+        theta = -(S * nd1 * sigma) / (2 * math.sqrt(t)) + r * K * math.exp(-r * t) * (1 - cdf_d2)
+    return {"Delta": delta, "Gamma": nd1 / (S * sigma * math.sqrt(t)), "Vega": S * nd1 * math.sqrt(t), "Theta": theta}
+
+
+def bench_greeks(args: argparse.Namespace) -> None:
+    import app
+    from greeks import RISK_FREE_RATE, chain_greek_columns, years_to_expiry
+
+    for strikes in (21, 5000):
+        step = 5 if strikes > 400 else 50
+        spot, chain = synthetic_chain(strikes, step, args.seed)
+        frame = app.normalize_chain(spot, chain, step, strikes // 2)
+        strike = frame["Strike"].to_numpy(dtype=float)
+        years = years_to_expiry(frame["Expiry"].to_numpy(), BENCH_MINUTE.timestamp())
+        ltp = frame[["CE LTP", "PE LTP"]].to_numpy(dtype=float).T
+        columns = chain_greek_columns(spot, strike, years, ltp)
+        legs = [(side, i) for side in ("CE", "PE") for i in range(len(frame))]
+        for side, i in legs[:: max(len(legs) // 500, 1)]:
+            expected = bs_greeks_scalar(spot, strike[i], RISK_FREE_RATE, columns[f"{side} IV"][i] / 100.0, years[i], "call" if side == "CE" else "put")
+            if expected["Delta"] is not None:
+                assert abs(expected["Delta"] - columns[f"{side} Delta"][i]) < 1e-9
+                assert abs(expected["Theta"] / 365.0 - columns[f"{side} Theta"][i]) < 1e-6
+        solved = np.isfinite(ltp) & np.isfinite(np.vstack([columns["CE IV"], columns["PE IV"]]))
+
+        def scalar() -> None:
+            for side, i in legs:
+                vol = columns[f"{side} IV"][i] / 100.0
+                bs_greeks_scalar(spot, strike[i], RISK_FREE_RATE, vol, years[i], "call" if side == "CE" else "put")
+
+        before = timed(scalar, args.runs)
+        after = timed(lambda: chain_greek_columns(spot, strike, years, ltp), args.runs)
+        report(f"greeks scalar loop {len(legs)} contracts", before)
+        report(f"greeks + IV numpy {len(legs)} contracts", after)
+        print(f"{'':<44} {solved.sum()} of {solved.size} legs solved, speedup x{statistics.median(before) / statistics.median(after):.1f}", flush=True)
+
+
+# The double loop from oldfiles/liveNSE.py, kept as the baseline.
+def calc_max_pain_loop(df: pd.DataFrame) -> int | None:
+    if df is None or df.empty:
+        return None
+    strikes = df["Strike"].values
+    ce_oi = df.set_index("Strike")["CE_OI"].to_dict()
+    pe_oi = df.set_index("Strike")["PE_OI"].to_dict()
+    best = None
+    best_val = None
+    for exp in strikes:
+        total = 0
+        for k in strikes:
+            if exp > k:
+                total += (exp - k) * ce_oi[k]
+            if exp < k:
+                total += (k - exp) * pe_oi[k]
+        if best_val is None or total < best_val:
+            best_val = total
+            best = exp
+    return int(best) if best is not None else None
+
+
+def bench_max_pain(args: argparse.Namespace) -> None:
+    import app
+
+    rng = np.random.default_rng(args.seed)
+    for _ in range(300):
+        n = int(rng.integers(1, 40))
+        frame = pd.DataFrame(
+            {
+                "Strike": 20000 + 50 * np.arange(n),
+                "CE OI": rng.integers(0, 4, n) * int(rng.choice([1, 1000])),
+                "PE OI": rng.integers(0, 4, n) * int(rng.choice([1, 1000])),
+            }
+        )
+        legacy = frame.rename(columns={"CE OI": "CE_OI", "PE OI": "PE_OI"})
+        levels = app.frame_levels(frame.sample(frac=1.0, random_state=int(rng.integers(1 << 30))))
+        if frame[["CE OI", "PE OI"]].to_numpy().sum():
+            assert levels["max_pain"] == calc_max_pain_loop(legacy), frame
+
+    for strikes in (21, 200, 2000):
+        step = 5 if strikes > 400 else 50
+        spot, chain = synthetic_chain(strikes, step, args.seed)
+        frame = app.normalize_chain(spot, chain, step, strikes // 2)
+        legacy = frame.rename(columns={"CE OI": "CE_OI", "PE OI": "PE_OI"})
+        assert app.frame_levels(frame)["max_pain"] == calc_max_pain_loop(legacy)
+        runs = args.runs if strikes <= 200 else max(args.runs // 10, 1)
+        before = timed(lambda: calc_max_pain_loop(legacy), runs)
+        after = timed(lambda: app.frame_levels(frame), args.runs)
+        report(f"max pain double loop {len(frame)} strikes", before)
+        report(f"max pain + walls prefix sums {len(frame)} strikes", after)
+        print(f"{'':<44} speedup x{statistics.median(before) / statistics.median(after):.1f}", flush=True)
+
+
+def gex_curve_scalar(levels: np.ndarray, frame: pd.DataFrame, years: np.ndarray) -> list[float]:
+    from greeks import RISK_FREE_RATE
+
+    curve = []
+    for level in levels:
+        total = 0.0
+        for i, strike in enumerate(frame["Strike"]):
+            for side, sign in (("CE", 1.0), ("PE", -1.0)):
+                vol = frame[f"{side} IV"].iloc[i] / 100.0
+                if not np.isfinite(vol) or not np.isfinite(years[i]):
+                    continue
+                gamma = bs_greeks_scalar(level, strike, RISK_FREE_RATE, vol, years[i])["Gamma"]
+                if gamma is not None:
+                    total += sign * gamma * frame[f"{side} OI"].iloc[i]
+        curve.append(total * level * level * 0.01)
+    return curve
+
+
+def bench_gex(args: argparse.Namespace) -> None:
+    import app
+    from greeks import years_to_expiry
+
+    now = BENCH_MINUTE.timestamp()
+    for strikecount in (args.strikecount, 100):
+        frames = []
+        for cfg in app.INDEXES.values():
+            spot, chain = synthetic_chain(2 * strikecount + 1, cfg["step"], args.seed)
+            frames.append((spot, app.normalize_chain(spot, chain, cfg["step"], strikecount)))
+        spot, frame = frames[0]
+        frame = app.with_greeks(frame, spot, now)
+        profile = app.frame_gex(frame, spot, now)
+        years = years_to_expiry(frame["Expiry"].to_numpy(dtype=float), now)
+        expected = gex_curve_scalar(profile["levels"][::10], frame, years)
+        np.testing.assert_allclose(profile["curve"][::10], expected, rtol=1e-6, atol=1e-3 * np.abs(expected).max())
+
+        before = timed(lambda: gex_curve_scalar(profile["levels"], frame, years), max(args.runs // 10, 1))
+        # The collector recomputes every index each minute.
+        after = timed(lambda: [app.frame_gex(f, s, now) for s, f in frames], args.runs, app.GREEK_CACHE.clear)
+        report(f"gex sweep scalar 1 chain x{len(frame)} strikes", before)
+        report(f"gex profile numpy {len(frames)} chains x{len(frame)}", after)
+        print(f"{'':<44} flip {profile['gamma_flip']}, net {profile['net_gex'] / 1e7:+,.1f} Cr at spot {spot:,.2f}", flush=True)
+
+
+# The connect-per-call pattern app.ensure_db used before history_store.py, kept as the baseline.
+def legacy_connect(app: Any, path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False)
+    app.init_history_schema(conn)
+    return conn
+
+
+def contended_reads(read: Callable[[], Any], write: Callable[[], Any], seconds: float, readers: int = 4) -> tuple[list[float], int, int]:
+    stop = threading.Event()
+    samples: list[float] = []
+    errors = 0
+    writes = 0
+    lock = threading.Lock()
+
+    def reader() -> None:
+        nonlocal errors
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                read()
+            except sqlite3.OperationalError:
+                with lock:
+                    errors += 1
+                continue
+            with lock:
+                samples.append((time.perf_counter() - start) * 1000.0)
+
+    def writer() -> None:
+        nonlocal errors, writes
+        while not stop.is_set():
+            try:
+                write()
+                writes += 1
+            except sqlite3.OperationalError:
+                with lock:
+                    errors += 1
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)] + [threading.Thread(target=writer)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return samples, errors, writes
+
+
+def bench_sqlite_engine(args: argparse.Namespace) -> None:
+    import app
+
+    client = SimulatedFyers(SimConfig(seed=args.seed, fixed_minute=BENCH_MINUTE))
+    cfg = app.INDEXES["NIFTY"]
+    chain = client.optionchain({"symbol": cfg["symbol"], "strikecount": args.strikecount})["data"]["optionsChain"]
+    spot = float(chain[0]["ltp"])
+    frame = app.normalize_chain(spot, chain, cfg["step"], args.strikecount)
+    strike = int(frame["Strike"].iloc[len(frame) // 2])
+    captured: list[Any] = []
+    write_sqlite = app.write_snapshots_sqlite
+    app.write_snapshots_sqlite = lambda rows, summaries, wait=False: captured.extend(app.snapshot_statements(rows, summaries))
+    app.store_snapshot(cfg["symbol"], frame, spot, stamp=BENCH_MINUTE, background=False)
+    app.write_snapshots_sqlite = write_sqlite
+    history_sql = "SELECT snapshot_ts, ltp, volume, oi FROM option_chain_snapshots WHERE symbol = ? AND strike = ? AND option_type = ? ORDER BY snapshot_ts"
+    params = (cfg["symbol"], strike, "CE")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        isolate_storage(Path(tmp))
+        legacy_path = Path(tmp) / "legacy.sqlite3"
+        legacy_connect(app, legacy_path).close()
+        store = app.history_db()
+
+        def legacy_write() -> None:
+            with legacy_connect(app, legacy_path) as conn:
+                for sql, rows in captured:
+                    conn.executemany(sql, rows)
+
+        def legacy_read() -> None:
+            with legacy_connect(app, legacy_path) as conn:
+                conn.execute(history_sql, params).fetchall()
+
+        def store_read() -> None:
+            with store.reader() as conn:
+                conn.execute(history_sql, params).fetchall()
+
+        def checkout() -> None:
+            with store.reader():
+                pass
+
+        report("open + schema per call (legacy)", timed(lambda: legacy_connect(app, legacy_path).close(), args.runs))
+        report("pooled reader checkout", timed(checkout, args.runs))
+        report(f"write {len(frame)} strikes (legacy, committed)", timed(legacy_write, args.runs))
+        report(f"write {len(frame)} strikes (store, committed)", timed(lambda: store.write(captured, wait=True), args.runs))
+        report(f"write {len(frame)} strikes (store, queued)", timed(lambda: store.write(captured), args.runs))
+        store.flush()
+
+        for label, read, write in (
+            ("legacy", legacy_read, legacy_write),
+            ("store", store_read, lambda: store.write(captured, wait=True)),
+        ):
+            samples, errors, writes = contended_reads(read, write, seconds=2.0)
+            report(f"history read under writes ({label})", samples)
+            print(f"{'':<44} {len(samples)} reads, {writes} writes, {errors} lock errors", flush=True)
+
+
+# The full-scan SQLite branch of app.load_history before the windowed read, kept as the baseline.
+def load_history_fullscan(app: Any, symbol: str, strike: int, option_type: str, limit: int = 90) -> pd.DataFrame:
+    with app.history_db().reader() as conn:
+        df = pd.read_sql_query(
+            """
+            SELECT snapshot_ts, snapshot_minute, ltp, ltp_change_pct, volume, oi, oi_change_pct, oi_change, iv
+            FROM option_chain_snapshots
+            WHERE symbol = ? AND strike = ? AND option_type = ?
+            ORDER BY snapshot_ts ASC
+            """,
+            conn,
+            params=(symbol, int(strike), option_type),
+        )
+    if df.empty:
+        return df
+    df["snapshot_ts"] = pd.to_datetime(df["snapshot_ts"], errors="coerce")
+    df["volume_delta"] = df["volume"].diff().fillna(0)
+    df["oi_delta"] = df["oi"].diff().fillna(0)
+    df["oi_pct_delta"] = df["oi_change_pct"].diff().fillna(0)
+    return df.tail(limit).reset_index(drop=True)
+
+
+def fill_strike_history(app: Any, symbol: str, strike: int, start: int, minutes: int, rng: np.random.Generator) -> None:
+    # Stored minutes [start, minutes) counting from the oldest, both legs, random values.
+    stamps = BENCH_MINUTE - timedelta(minutes=minutes) + pd.to_timedelta(np.arange(start, minutes), unit="min")
+    rows = [
+        {
+            "snapshot_ts": stamp.isoformat(),
+            "snapshot_minute": stamp.strftime("%Y-%m-%d %H:%M"),
+            "symbol": symbol,
+            "strike": strike,
+            "option_type": side,
+            **dict(zip(("ltp", "ltp_change_pct", "volume", "oi", "oi_change_pct", "oi_change", "iv"), rng.uniform(1.0, 1e6, 7).tolist())),
+            "option_symbol": "",
+        }
+        for stamp in stamps
+        for side in ("CE", "PE")
+    ]
+    app.write_snapshots_sqlite(rows, [], wait=True)
+
+
+def bench_history_window(args: argparse.Namespace) -> None:
+    import app
+
+    symbol, strike = app.INDEXES["NIFTY"]["symbol"], 24600
+    rng = np.random.default_rng(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        isolate_storage(Path(tmp))
+        stored = 0
+        for minutes in (60, 1_000, 10_000, 100_000):
+            fill_strike_history(app, symbol, strike, stored, minutes, rng)
+            stored = minutes
+            for limit in (90, minutes + 5):
+                pd.testing.assert_frame_equal(load_history_fullscan(app, symbol, strike, "CE", limit), app.load_history(symbol, strike, "CE", limit))
+            before = timed(lambda: load_history_fullscan(app, symbol, strike, "CE"), args.runs)
+            after = timed(lambda: app.load_history(symbol, strike, "CE"), args.runs)
+            report(f"load_history full scan, {minutes} minutes", before)
+            report(f"load_history window of 91, {minutes} minutes", after)
+            print(f"{'':<44} speedup x{statistics.median(before) / statistics.median(after):.1f}", flush=True)
+
+
+def bench_strike_history(args: argparse.Namespace) -> None:
+    import app
+
+    symbol, strike = app.INDEXES["NIFTY"]["symbol"], 24600
+    with tempfile.TemporaryDirectory() as tmp:
+        isolate_storage(Path(tmp))
+        fill_strike_history(app, symbol, strike, 0, 10_000, np.random.default_rng(args.seed))
+
+        def per_leg() -> list[pd.DataFrame]:
+            return [app.load_history(symbol, strike, side) for side in ("CE", "PE")]
+
+        both = app.load_strike_history(symbol, strike)
+        for side, leg in zip(("CE", "PE"), per_leg()):
+            pd.testing.assert_frame_equal(both[both["option_type"] == side].drop(columns="option_type").reset_index(drop=True), leg)
+        report("load_history CE + PE (2 queries)", timed(per_leg, args.runs))
+        report("load_strike_history (1 window query)", timed(lambda: app.load_strike_history(symbol, strike), args.runs))
+
+
+def bench_archive(args: argparse.Namespace) -> None:
+    import app
+    from snapshot_archive import read_day_frame
+
+    day = BENCH_MINUTE.date()
+    minutes = pd.date_range(datetime.combine(day, datetime.min.time(), IST) + timedelta(hours=9, minutes=15), periods=375, freq="min")
+    rng = np.random.default_rng(args.seed)
+    scan_columns = ["snapshot_ts", "strike", "option_type", "oi"]
+    with tempfile.TemporaryDirectory() as tmp:
+        isolate_storage(Path(tmp))
+        app.ARCHIVE_PATH = Path(tmp) / "archive"
+        for cfg in app.INDEXES.values():
+            strikes = 20000 + cfg["step"] * np.arange(2 * args.strikecount + 1)
+            oi = rng.integers(10_000, 5_000_000, (len(strikes), 2)).astype(float)
+            rows = []
+            for stamp in minutes:
+                oi += rng.integers(-5_000, 5_000, oi.shape)
+                for i, strike in enumerate(strikes):
+                    for leg, side in enumerate(("CE", "PE")):
+                        rows.append(
+                            {
+                                "snapshot_ts": stamp.isoformat(),
+                                "snapshot_minute": stamp.strftime("%Y-%m-%d %H:%M"),
+                                "symbol": cfg["symbol"],
+                                "strike": int(strike),
+                                "option_type": side,
+                                **dict(zip(("ltp", "ltp_change_pct", "volume"), np.round(rng.uniform(0.05, 500.0, 3), 2).tolist())),
+                                "oi": oi[i, leg],
+                                **dict(zip(("oi_change_pct", "oi_change", "iv"), np.round(rng.uniform(-50.0, 50.0, 3), 2).tolist())),
+                                "option_symbol": f"{cfg['symbol'][:-6]}{strike}{side}",
+                            }
+                        )
+            app.write_snapshots_sqlite(rows, [], wait=True)
+        symbol = app.INDEXES["NIFTY"]["symbol"]
+
+        def row_scan() -> pd.DataFrame:
+            with app.history_db().reader() as conn:
+                df = pd.read_sql_query(
+                    "SELECT snapshot_ts, strike, option_type, oi FROM option_chain_snapshots WHERE snapshot_minute >= ? AND snapshot_minute < ? AND symbol = ?",
+                    conn,
+                    params=(f"{day:%Y-%m-%d}", f"{day + timedelta(days=1):%Y-%m-%d}", symbol),
+                )
+            df["snapshot_ts"] = pd.to_datetime(df["snapshot_ts"])
+            return df
+
+        started = time.perf_counter()
+        counts = app.archive_snapshots(day)
+        print(f"compacted {sum(counts.values())} rows over {len(counts)} symbols in {time.perf_counter() - started:.2f} s", flush=True)
+        expected = row_scan().sort_values(["option_type", "strike", "snapshot_ts"]).reset_index(drop=True)
+        archived = read_day_frame(app.ARCHIVE_PATH, day, symbol, scan_columns)
+        assert (archived["snapshot_ts"] == expected["snapshot_ts"]).all() and (archived["strike"] == expected["strike"]).all()
+        assert (archived["option_type"].astype(str) == expected["option_type"]).all()
+        np.testing.assert_allclose(archived["oi"].to_numpy(), expected["oi"].to_numpy(), rtol=1e-6)
+
+        with app.history_db().reader() as conn:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        row_bytes = app.DB_PATH.stat().st_size
+        archive_bytes = sum(path.stat().st_size for path in app.ARCHIVE_PATH.rglob("*.parquet"))
+        print(f"{'day on disk':<44} SQLite {row_bytes / 1e6:.1f} MB, Parquet {archive_bytes / 1e6:.1f} MB (x{row_bytes / archive_bytes:.1f} smaller)", flush=True)
+        before = timed(row_scan, args.runs)
+        after = timed(lambda: read_day_frame(app.ARCHIVE_PATH, day, symbol, scan_columns), args.runs)
+        report(f"session OI scan, row store ({len(expected)} rows)", before)
+        report("session OI scan, Parquet archive", after)
+        print(f"{'':<44} speedup x{statistics.median(before) / statistics.median(after):.1f}", flush=True)
+
+
+def rollups_from_minutes(app: Any, symbol: str, strike: int, option_type: str, resolution: str) -> pd.DataFrame:
+    # Reference aggregation of the stored minutes with pandas.
+    with app.history_db().reader() as conn:
+        df = pd.read_sql_query(
+            "SELECT snapshot_ts, ltp, volume, oi FROM option_chain_snapshots WHERE symbol = ? AND strike = ? AND option_type = ? ORDER BY snapshot_ts",
+            conn,
+            params=(symbol, strike, option_type),
+        )
+    stamps = pd.to_datetime(df["snapshot_ts"]).dt.tz_convert(IST)
+    df["bucket"] = stamps.dt.floor("D" if resolution == "1d" else f"{app.ROLLUP_MINUTES[resolution]}min")
+    grouped = df.groupby("bucket")
+    out = pd.DataFrame({"ltp": grouped["ltp"].last(), "volume": grouped["volume"].max(), "oi": grouped["oi"].last()})
+    out["oi_change"] = out["oi"] - grouped["oi"].first()
+    return out.rename_axis("snapshot_ts").reset_index()
+
+
+def bench_rollups(args: argparse.Namespace) -> None:
+    import app
+
+    symbol, strike, days = app.INDEXES["NIFTY"]["symbol"], 24600, 10
+    rng = np.random.default_rng(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        isolate_storage(Path(tmp))
+        minutes = days * 1440
+        # Each minute folds into its buckets row by row, so one batch exercises the same merge as live writes.
+        fill_strike_history(app, symbol, strike, 0, minutes, rng)
+        for resolution in app.ROLLUP_MINUTES:
+            expected = rollups_from_minutes(app, symbol, strike, "CE", resolution)
+            got = app.load_history(symbol, strike, "CE", len(expected), resolution)
+            pd.testing.assert_frame_equal(got[expected.columns.tolist()], expected, check_dtype=False)
+        before = app.load_strike_history(symbol, strike, 5_000, "15m")
+        print(f"backfill replayed {app.backfill_rollups()} minutes", flush=True)
+        pd.testing.assert_frame_equal(app.load_strike_history(symbol, strike, 5_000, "15m"), before)
+
+        def resampled() -> pd.DataFrame:
+            df = app.load_history(symbol, strike, "CE", minutes)
+            return df.set_index("snapshot_ts").resample("15min").agg({"ltp": "last", "volume": "max", "oi": "last"})
+
+        report(f"{days} days of 1m rows + pandas resample to 15m", timed(resampled, args.runs))
+        report(f"{days} days of 15m rollups", timed(lambda: app.load_history(symbol, strike, "CE", days * 96, "15m"), args.runs))
+        report(f"{days} days of 1d rollups", timed(lambda: app.load_history(symbol, strike, "CE", days, "1d"), args.runs))
+
+        stamp = BENCH_MINUTE + timedelta(days=1)
+        rows = [
+            {
+                "snapshot_ts": stamp.isoformat(),
+                "snapshot_minute": stamp.strftime("%Y-%m-%d %H:%M"),
+                "symbol": symbol,
+                "strike": 24000 + 50 * i,
+                "option_type": side,
+                **dict(zip(("ltp", "ltp_change_pct", "volume", "oi", "oi_change_pct", "oi_change", "iv"), rng.uniform(1.0, 1e6, 7).tolist())),
+                "option_symbol": "",
+            }
+            for i in range(2 * args.strikecount + 1)
+            for side in ("CE", "PE")
+        ]
+        report(f"store {len(rows)} rows, minutes only", timed(lambda: app.history_db().write(app.snapshot_statements(rows, [])[:2], wait=True), args.runs))
+        report(f"store {len(rows)} rows, minutes + rollups", timed(lambda: app.history_db().write(app.snapshot_statements(rows, []), wait=True), args.runs))
+
+
+COMMANDS: dict[str, Callable[[argparse.Namespace], None]] = {
+    "pipeline": bench_pipeline,
+    "storage": bench_storage,
+    "app-main": bench_app_main,
+    "alert": bench_alert,
+    "normalize": bench_normalize,
+    "signal-tags": bench_signal_tags,
+    "render": bench_render,
+    "order-blocks": bench_order_blocks,
+    "fvg": bench_fvg,
+    "zone-stream": bench_zone_stream,
+    "greeks": bench_greeks,
+    "max-pain": bench_max_pain,
+    "gex": bench_gex,
+    "sqlite-engine": bench_sqlite_engine,
+    "history-window": bench_history_window,
+    "strike-history": bench_strike_history,
+    "archive": bench_archive,
+    "rollups": bench_rollups,
+}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline benchmarks against the simulated brokers in broker_sim.py.")
+    parser.add_argument("command", choices=[*COMMANDS, "all"])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--strikecount", type=int, default=15)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated broker round-trip latency.")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of broker calls that fail.")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--respect-limits", action="store_true", help="Keep the production rate-limit budgets.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if not args.respect_limits:
+        # Measure the pipeline itself rather than the broker budgets in rate_limit.py.
+        SCHEDULER.configure({})
+    for name, command in COMMANDS.items():
+        if args.command in {name, "all"}:
+            print(f"== {name}", flush=True)
+            command(args)
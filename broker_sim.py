@@ -0,0 +1,558 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import date, datetime, time as dt_time, timedelta
+from pathlib import Path
+from typing import Any
+from zoneinfo import ZoneInfo
+
+
+IST = ZoneInfo("Asia/Kolkata")
+SESSION_OPEN = dt_time(9, 15)
+SESSION_CLOSE = dt_time(15, 30)
+FYERS_METHODS = {"quotes", "optionchain", "history"}
+KITE_METHODS = {"quote", "instruments"}
+DHAN_ENDPOINTS = {"optionchain/expirylist": "expirylist", "optionchain": "optionchain"}
+
+# name -> (base spot, strike step, Dhan scrip id)
+UNDERLYINGS = {
+    "NIFTY50": (24500.0, 50, 13),
+    "NIFTYBANK": (52000.0, 100, 25),
+    "FINNIFTY": (23500.0, 50, 27),
+    "MIDCPNIFTY": (12500.0, 25, 442),
+    "SENSEX": (80500.0, 100, 1),
+}
+KITE_NAMES = {"NIFTY": "NIFTY50", "BANKNIFTY": "NIFTYBANK", "FINNIFTY": "FINNIFTY", "MIDCPNIFTY": "MIDCPNIFTY", "SENSEX": "SENSEX"}
+ROOTS = {key: name for name, key in KITE_NAMES.items()}
+KITE_SYMBOL = re.compile(r"^(?P<name>[A-Z]+?)(?P<yy>\d{2})(?P<mon>[A-Z]{3})(?P<strike>\d+)(?P<side>CE|PE)$")
+MONTHS = ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"]
+
+
+class SimulatedBrokerError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class SimConfig:
+    latency_s: float = 0.0
+    jitter_s: float = 0.0
+    error_rate: float = 0.0
+    seed: int = 7
+    # Pins the synthetic market clock so repeated runs see identical chains.
+    fixed_minute: datetime | None = None
+    # Strikes each side of ATM for brokers that return the whole chain (Dhan, Kite).
+    full_chain_strikes: int = 50
+    # Replay misses raise unless this is set; then they are synthesized and reported once per namespace.
+    replay_fallback: bool = False
+
+
+def sim_config_from_env() -> SimConfig:
+    minute = os.getenv("BROKER_SIM_MINUTE", "").strip()
+    return SimConfig(
+        latency_s=float(os.getenv("BROKER_SIM_LATENCY_MS", "0") or 0) / 1000.0,
+        jitter_s=float(os.getenv("BROKER_SIM_JITTER_MS", "0") or 0) / 1000.0,
+        error_rate=float(os.getenv("BROKER_SIM_ERROR_RATE", "0") or 0),
+        seed=int(os.getenv("BROKER_SIM_SEED", "7") or 7),
+        fixed_minute=datetime.strptime(minute, "%Y-%m-%d %H:%M").replace(tzinfo=IST) if minute else None,
+        replay_fallback=os.getenv("BROKER_SIM_FALLBACK", "").strip().lower() == "synthetic",
+    )
+
+
+def enabled() -> bool:
+    return bool(os.getenv("BROKER_SIM", "").strip())
+
+
+def _env_store() -> "ResponseStore | None":
+    # BROKER_SIM=synthetic generates everything; any other value is a recording directory to replay.
+    value = os.getenv("BROKER_SIM", "").strip()
+    if not value or value.lower() == "synthetic":
+        return None
+    return ResponseStore(Path(value).expanduser())
+
+
+def _record_store() -> "ResponseStore | None":
+    value = os.getenv("BROKER_RECORD", "").strip()
+    return ResponseStore(Path(value).expanduser()) if value else None
+
+
+HISTORY_NAMESPACE = "fyers/history"
+
+
+def _history_span(payload: dict[str, Any]) -> tuple[dict[str, Any], int, int]:
+    # History ranges move with the clock (incremental fetches end at the current bar), so they are kept
+    # out of the key: one recording per symbol and resolution holds every candle seen, plus the spans covered.
+    if str(payload.get("date_format")) == "1":
+        start = int(datetime.combine(date.fromisoformat(str(payload["range_from"])), dt_time.min, IST).timestamp())
+        end = int(datetime.combine(date.fromisoformat(str(payload["range_to"])), dt_time.max, IST).timestamp())
+    else:
+        start, end = int(payload["range_from"]), int(payload["range_to"])
+    key = {name: value for name, value in payload.items() if name not in ("date_format", "range_from", "range_to")}
+    return key, start, end
+
+
+def _merge_spans(spans: list[list[int]]) -> list[list[int]]:
+    merged: list[list[int]] = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+class ResponseStore:
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def _path(self, namespace: str, payload: Any) -> Path:
+        digest = hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+        return self.directory / namespace / f"{digest}.json"
+
+    def _read(self, path: Path) -> Any | None:
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def _write(self, path: Path, record: Any) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(record, default=str), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def load(self, namespace: str, payload: Any) -> Any | None:
+        if namespace == HISTORY_NAMESPACE:
+            return self._load_history(payload)
+        record = self._read(self._path(namespace, payload))
+        return None if record is None else record["response"]
+
+    def save(self, namespace: str, payload: Any, response: Any) -> None:
+        if namespace == HISTORY_NAMESPACE:
+            self._save_history(payload, response)
+            return
+        self._write(self._path(namespace, payload), {"request": payload, "response": response})
+
+    def _load_history(self, payload: dict[str, Any]) -> dict[str, Any] | None:
+        key, start, end = _history_span(payload)
+        record = self._read(self._path(HISTORY_NAMESPACE, key))
+        # Only a range the recordings fully cover can be answered; a partial answer would look like real gaps.
+        if record is None or not any(low <= start and end <= high for low, high in record["spans"]):
+            return None
+        candles = [candle for candle in record["candles"] if start <= int(candle[0]) <= end]
+        return {"s": "ok" if candles else "no_data", "code": 200, "message": "", "candles": candles}
+
+    def _save_history(self, payload: dict[str, Any], response: dict[str, Any]) -> None:
+        key, start, end = _history_span(payload)
+        path = self._path(HISTORY_NAMESPACE, key)
+        with self._lock:
+            record = self._read(path) or {"request": key, "spans": [], "candles": []}
+            # Later fetches restate the forming bar, so they win on the same timestamp.
+            candles = {int(candle[0]): candle for candle in record["candles"]}
+            candles.update((int(candle[0]), candle) for candle in response.get("candles") or [])
+            record["candles"] = [candles[stamp] for stamp in sorted(candles)]
+            record["spans"] = _merge_spans([*record["spans"], [start, end]])
+            self._write(path, record)
+
+
+def _underlying_key(symbol: str) -> str:
+    name = symbol.split(":", 1)[-1].upper().replace("-INDEX", "").replace(" ", "")
+    return KITE_NAMES.get(name, name)
+
+
+def _norm_cdf(value: float) -> float:
+    return 0.5 * (1.0 + math.erf(value / math.sqrt(2.0)))
+
+
+def _bs_price(spot: float, strike: float, vol: float, years: float, side: str) -> float:
+    if years <= 0 or vol <= 0:
+        return max(spot - strike, 0.0) if side == "CE" else max(strike - spot, 0.0)
+    d1 = (math.log(spot / strike) + 0.5 * vol * vol * years) / (vol * math.sqrt(years))
+    d2 = d1 - vol * math.sqrt(years)
+    if side == "CE":
+        return spot * _norm_cdf(d1) - strike * _norm_cdf(d2)
+    return strike * _norm_cdf(-d2) - spot * _norm_cdf(-d1)
+
+
+def _next_expiry(day: date, weeks: int = 0) -> date:
+    return day + timedelta(days=(3 - day.weekday()) % 7 + 7 * weeks)
+
+
+class SyntheticMarket:
+    def __init__(self, config: SimConfig) -> None:
+        self.config = config
+
+    def now(self) -> datetime:
+        return self.config.fixed_minute or datetime.now(IST).replace(second=0, microsecond=0)
+
+    def _rng(self, *parts: Any) -> random.Random:
+        return random.Random(zlib.crc32(":".join(str(part) for part in (self.config.seed, *parts)).encode("utf-8")))
+
+    def underlying(self, symbol: str) -> tuple[float, int]:
+        key = _underlying_key(symbol)
+        if key in UNDERLYINGS:
+            base, step, _ = UNDERLYINGS[key]
+            return base, step
+        return 100.0 + zlib.crc32(key.encode("utf-8")) % 400, 5
+
+    def spot(self, symbol: str, stamp: datetime | None = None) -> float:
+        stamp = stamp or self.now()
+        base, step = self.underlying(symbol)
+        minute = int(stamp.timestamp() // 60)
+        wave = 0.004 * math.sin(minute / 37.0) + 0.002 * math.sin(minute / 11.0)
+        noise = self._rng("spot", _underlying_key(symbol), minute).uniform(-0.0005, 0.0005)
+        return round(base * (1.0 + wave + noise), 2)
+
+    def contract(self, name: str, spot: float, strike: float, side: str, step: int, expiry: date) -> dict[str, float]:
+        rng = self._rng("leg", name, strike, side, int(self.now().timestamp() // 60))
+        distance = (strike - spot) / step
+        years = max((expiry - self.now().date()).days, 0) / 365.0 + 1.0 / 365.0
+        vol = 0.13 + 0.0009 * abs(distance) + rng.uniform(-0.005, 0.005)
+        ltp = max(round(_bs_price(spot, strike, vol, years, side), 2), 0.05)
+        # OI clusters a few strikes out of the money on each side.
+        wall = 4.0 if side == "CE" else -4.0
+        oi = round(2_000_000 * math.exp(-(((distance - wall) / 7.0) ** 2)) * rng.uniform(0.6, 1.4) + 25_000)
+        oi_pct = round(rng.uniform(-25.0, 45.0), 2)
+        prev_oi = round(oi / (1.0 + oi_pct / 100.0))
+        return {
+            "ltp": ltp,
+            "ltpchp": round(rng.uniform(-35.0, 35.0), 2),
+            "oi": oi,
+            "prev_oi": prev_oi,
+            "oichp": oi_pct,
+            "volume": round(oi * rng.uniform(0.5, 4.0)),
+            "iv": round(vol * 100.0, 2),
+        }
+
+    def strikes(self, symbol: str, strikecount: int) -> tuple[float, int, list[int]]:
+        spot = self.spot(symbol)
+        _, step = self.underlying(symbol)
+        atm = int(round(spot / step) * step)
+        return spot, step, [atm + i * step for i in range(-strikecount, strikecount + 1) if atm + i * step > 0]
+
+    def candles(self, symbol: str, resolution: str, start: datetime, end: datetime) -> list[list[float]]:
+        base, _ = self.underlying(symbol)
+        minutes = 1440 if resolution.upper() in {"D", "1D"} else max(int(resolution), 1)
+        limit = min(end, self.now() + timedelta(minutes=1))
+        candles: list[list[float]] = []
+        day = start.astimezone(IST).date()
+        while day <= end.astimezone(IST).date():
+            if day.weekday() < 5:
+                rng = self._rng("candles", _underlying_key(symbol), day.isoformat(), minutes)
+                price = base * (1.0 + rng.uniform(-0.02, 0.02))
+                bar = datetime.combine(day, SESSION_OPEN, IST)
+                close_at = datetime.combine(day, SESSION_CLOSE, IST)
+                while bar < close_at:
+                    move = price * rng.gauss(0.0, 0.0006 * math.sqrt(min(minutes, 375)))
+                    high = max(price, price + move) + abs(rng.gauss(0.0, price * 0.0003))
+                    low = min(price, price + move) - abs(rng.gauss(0.0, price * 0.0003))
+                    if start <= bar <= end and bar < limit:
+                        volume = round(rng.uniform(5_000, 50_000) * min(minutes, 375))
+                        candles.append([int(bar.timestamp()), round(price, 2), round(high, 2), round(low, 2), round(price + move, 2), volume])
+                    price += move
+                    bar += timedelta(minutes=minutes)
+            day += timedelta(days=1)
+        return candles
+
+
+class _Transport:
+    def __init__(self, config: SimConfig | None = None, store: ResponseStore | None = None) -> None:
+        self.config = config or SimConfig()
+        self.store = store
+        self.market = SyntheticMarket(self.config)
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.replayed = 0
+        self.missed = 0
+        self.failures = 0
+        self._reported: set[str] = set()
+
+    def _delay_and_roll(self) -> bool:
+        with self._lock:
+            self.calls += 1
+            delay = self.config.latency_s + (self._rng.uniform(0.0, self.config.jitter_s) if self.config.jitter_s else 0.0)
+            failed = self.config.error_rate > 0 and self._rng.random() < self.config.error_rate
+            if failed:
+                self.failures += 1
+        if delay > 0:
+            time.sleep(delay)
+        return failed
+
+    def _replay(self, namespace: str, payload: Any) -> Any | None:
+        if self.store is None:
+            return None
+        response = self.store.load(namespace, payload)
+        with self._lock:
+            if response is not None:
+                self.replayed += 1
+                return response
+            self.missed += 1
+            report = namespace not in self._reported
+            self._reported.add(namespace)
+        if not self.config.replay_fallback:
+            raise SimulatedBrokerError(f"replay miss: no {namespace} recording in {self.store.directory} for {payload!r}")
+        if report:
+            print(f"[broker_sim] replay miss for {namespace} {payload!r}; synthesizing this and later misses", flush=True)
+        return None
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"calls": self.calls, "replayed": self.replayed, "missed": self.missed, "failures": self.failures}
+
+
+class SimulatedFyers(_Transport):
+    client_id = "SIM-100"
+    token = "simulated"
+
+    def quotes(self, data: dict[str, Any]) -> dict[str, Any]:
+        if self._delay_and_roll():
+            return {"s": "error", "code": 429, "message": "simulated: request limit reached"}
+        replayed = self._replay("fyers/quotes", data)
+        if replayed is not None:
+            return replayed
+        items = []
+        for symbol in [part.strip() for part in str(data.get("symbols", "")).split(",") if part.strip()]:
+            spot = self.market.spot(symbol)
+            change = round(spot * 0.003, 2)
+            items.append({"n": symbol, "s": "ok", "v": {"symbol": symbol, "lp": spot, "ch": change, "chp": round(change / spot * 100.0, 2)}})
+        return {"s": "ok", "code": 200, "d": items}
+
+    def optionchain(self, data: dict[str, Any]) -> dict[str, Any]:
+        if self._delay_and_roll():
+            return {"s": "error", "code": 429, "message": "simulated: request limit reached"}
+        replayed = self._replay("fyers/optionchain", data)
+        if replayed is not None:
+            return replayed
+        symbol = str(data.get("symbol", ""))
+        spot, step, strikes = self.market.strikes(symbol, int(data.get("strikecount") or 10))
+        expiry = _next_expiry(self.market.now().date())
+        root = symbol.split(":", 1)[0] + ":" + ROOTS.get(_underlying_key(symbol), _underlying_key(symbol))
+        chain: list[dict[str, Any]] = [
+            {"symbol": symbol, "strike_price": -1, "option_type": "", "ltp": spot, "description": _underlying_key(symbol)}
+        ]
+        for strike in strikes:
+            for side in ("CE", "PE"):
+                leg = self.market.contract(symbol, spot, strike, side, step, expiry)
+                chain.append({"symbol": f"{root}{expiry:%y%m%d}{strike}{side}", "strike_price": strike, "option_type": side, **leg})
+        return {
+            "s": "ok",
+            "code": 200,
+            "message": "",
+            "data": {
+                "optionsChain": chain,
+                "expiryData": [{"date": expiry.strftime("%d-%m-%Y"), "expiry": str(int(datetime.combine(expiry, SESSION_CLOSE, IST).timestamp()))}],
+                "callOi": sum(row.get("oi", 0) for row in chain if row["option_type"] == "CE"),
+                "putOi": sum(row.get("oi", 0) for row in chain if row["option_type"] == "PE"),
+            },
+        }
+
+    def history(self, data: dict[str, Any]) -> dict[str, Any]:
+        if self._delay_and_roll():
+            return {"s": "error", "code": 429, "message": "simulated: request limit reached"}
+        replayed = self._replay("fyers/history", data)
+        if replayed is not None:
+            return replayed
+        if str(data.get("date_format")) == "1":
+            start = datetime.combine(date.fromisoformat(str(data["range_from"])), dt_time.min, IST)
+            end = datetime.combine(date.fromisoformat(str(data["range_to"])), dt_time.max, IST)
+        else:
+            start = datetime.fromtimestamp(int(data["range_from"]), IST)
+            end = datetime.fromtimestamp(int(data["range_to"]), IST)
+        candles = self.market.candles(str(data.get("symbol", "")), str(data.get("resolution", "1")), start, end)
+        if not candles:
+            return {"s": "no_data", "code": 200, "candles": []}
+        return {"s": "ok", "code": 200, "candles": candles}
+
+
+class SimulatedResponse:
+    def __init__(self, payload: Any, status_code: int = 200) -> None:
+        self.payload = payload
+        self.status_code = status_code
+        self.ok = status_code < 400
+
+    def json(self) -> Any:
+        return self.payload
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            raise SimulatedBrokerError(f"simulated HTTP {self.status_code}")
+
+
+def _dhan_endpoint(url: str) -> str | None:
+    for suffix, endpoint in DHAN_ENDPOINTS.items():
+        if url.rstrip("/").endswith(suffix):
+            return endpoint
+    return None
+
+
+class SimulatedDhanHttp(_Transport):
+    def post(self, url: str, json: Any = None, **_: Any) -> SimulatedResponse:
+        endpoint = _dhan_endpoint(url)
+        if endpoint is None:
+            # Telegram and other side effects are acknowledged without leaving the machine.
+            return SimulatedResponse({"ok": True})
+        if self._delay_and_roll():
+            return SimulatedResponse({"status": "failure", "remarks": "simulated: too many requests", "data": {}}, 429)
+        replayed = self._replay(f"dhan/{endpoint}", json)
+        if replayed is not None:
+            return SimulatedResponse(replayed)
+        payload = json or {}
+        name = next((key for key, value in UNDERLYINGS.items() if value[2] == int(payload.get("UnderlyingScrip") or 0)), "NIFTY50")
+        today = self.market.now().date()
+        if endpoint == "expirylist":
+            return SimulatedResponse({"status": "success", "data": [_next_expiry(today, weeks).isoformat() for weeks in range(4)]})
+
+        spot, step, strikes = self.market.strikes(name, self.config.full_chain_strikes)
+        expiry = date.fromisoformat(str(payload.get("Expiry") or _next_expiry(today).isoformat()))
+        oc: dict[str, dict[str, Any]] = {}
+        for strike in strikes:
+            legs = {}
+            for side in ("CE", "PE"):
+                leg = self.market.contract(name, spot, strike, side, step, expiry)
+                legs[side.lower()] = {
+                    "last_price": leg["ltp"],
+                    "oi": leg["oi"],
+                    "previous_oi": leg["prev_oi"],
+                    "volume": leg["volume"],
+                    "implied_volatility": leg["iv"],
+                    "previous_close_price": round(leg["ltp"] / (1.0 + leg["ltpchp"] / 100.0), 2),
+                }
+            oc[f"{strike:.6f}"] = legs
+        return SimulatedResponse({"status": "success", "data": {"last_price": spot, "oc": oc}})
+
+
+class SimulatedKite(_Transport):
+    def instruments(self, exchange: str | None = None) -> list[dict[str, Any]]:
+        if self._delay_and_roll():
+            raise SimulatedBrokerError("simulated: instruments download failed")
+        replayed = self._replay("kite/instruments", exchange)
+        if replayed is not None:
+            return replayed
+        rows: list[dict[str, Any]] = []
+        today = self.market.now().date()
+        for kite_name, key in KITE_NAMES.items():
+            spot, step, strikes = self.market.strikes(key, self.config.full_chain_strikes)
+            for weeks in range(2):
+                expiry = _next_expiry(today, weeks)
+                for strike in strikes:
+                    for side in ("CE", "PE"):
+                        tradingsymbol = f"{kite_name}{expiry:%y}{MONTHS[expiry.month - 1]}{strike}{side}"
+                        rows.append(
+                            {
+                                "instrument_token": zlib.crc32(f"{tradingsymbol}{expiry}".encode("utf-8")),
+                                "exchange": exchange or "NFO",
+                                "tradingsymbol": tradingsymbol,
+                                "name": kite_name,
+                                "expiry": expiry,
+                                "strike": float(strike),
+                                "tick_size": 0.05,
+                                "lot_size": 75,
+                                "instrument_type": side,
+                                "segment": "NFO-OPT",
+                            }
+                        )
+        return rows
+
+    def quote(self, instruments: str | list[str]) -> dict[str, dict[str, Any]]:
+        if self._delay_and_roll():
+            raise SimulatedBrokerError("simulated: too many requests")
+        replayed = self._replay("kite/quote", instruments)
+        if replayed is not None:
+            return replayed
+        instruments = [instruments] if isinstance(instruments, str) else list(instruments)
+        today = self.market.now().date()
+        quotes: dict[str, dict[str, Any]] = {}
+        for instrument in instruments:
+            tradingsymbol = instrument.split(":", 1)[-1]
+            match = KITE_SYMBOL.match(tradingsymbol)
+            if match is None:
+                quotes[instrument] = {"last_price": self.market.spot(instrument)}
+                continue
+            key = KITE_NAMES.get(match["name"], match["name"])
+            spot = self.market.spot(key)
+            _, step = self.market.underlying(key)
+            leg = self.market.contract(key, spot, float(match["strike"]), match["side"], step, _next_expiry(today))
+            quotes[instrument] = {
+                "last_price": leg["ltp"],
+                "oi": leg["oi"],
+                "volume": leg["volume"],
+                "change": leg["ltpchp"],
+                "ohlc": {"open": leg["ltp"], "high": leg["ltp"], "low": leg["ltp"], "close": round(leg["ltp"] / (1.0 + leg["ltpchp"] / 100.0), 2)},
+            }
+        return quotes
+
+
+class RecordingProxy:
+    def __init__(self, inner: Any, store: ResponseStore, namespace: str, methods: set[str]) -> None:
+        self._inner = inner
+        self._store = store
+        self._namespace = namespace
+        self._methods = methods
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._inner, name)
+        if name not in self._methods:
+            return attr
+
+        def recorded(*args: Any, **kwargs: Any) -> Any:
+            response = attr(*args, **kwargs)
+            payload = kwargs.get("data", args[0] if args else None)
+            # no_data still records which history span was covered.
+            if not isinstance(response, dict) or response.get("s", "ok") in ("ok", "no_data"):
+                self._store.save(f"{self._namespace}/{name}", payload, response)
+            return response
+
+        return recorded
+
+
+class RecordingHttp:
+    def __init__(self, store: ResponseStore, inner: Any = None) -> None:
+        import requests
+
+        self._store = store
+        self._inner = inner or requests
+
+    def post(self, url: str, **kwargs: Any) -> Any:
+        response = self._inner.post(url, **kwargs)
+        endpoint = _dhan_endpoint(url)
+        if endpoint is not None and response.ok:
+            self._store.save(f"dhan/{endpoint}", kwargs.get("json"), response.json())
+        return response
+
+
+def simulated_fyers() -> SimulatedFyers:
+    return SimulatedFyers(sim_config_from_env(), _env_store())
+
+
+def record_fyers(model: Any) -> Any:
+    store = _record_store()
+    return RecordingProxy(model, store, "fyers", FYERS_METHODS) if store else model
+
+
+def dhan_http() -> Any:
+    if enabled():
+        return SimulatedDhanHttp(sim_config_from_env(), _env_store())
+    store = _record_store()
+    if store is not None:
+        return RecordingHttp(store)
+    import requests
+
+    return requests
+
+
+def kite_client(real: Any = None) -> Any:
+    if enabled():
+        return SimulatedKite(sim_config_from_env(), _env_store())
+    store = _record_store()
+    if store is not None and real is not None:
+        return RecordingProxy(real, store, "kite", KITE_METHODS)
+    return real
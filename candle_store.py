@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any
+
+
+def default_candle_path() -> Path:
+    default = Path(__file__).resolve().with_name("candle_cache.sqlite3")
+    return Path(os.getenv("FYERS_CANDLE_CACHE", str(default))).expanduser()
+
+
+class CandleStore:
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path or default_candle_path()
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS candles (
+                    symbol TEXT NOT NULL,
+                    resolution TEXT NOT NULL,
+                    ts INTEGER NOT NULL,
+                    open REAL,
+                    high REAL,
+                    low REAL,
+                    close REAL,
+                    volume REAL,
+                    PRIMARY KEY (symbol, resolution, ts)
+                ) WITHOUT ROWID
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS candle_coverage (
+                    symbol TEXT NOT NULL,
+                    resolution TEXT NOT NULL,
+                    first_day TEXT NOT NULL,
+                    PRIMARY KEY (symbol, resolution)
+                )
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+
+    def coverage(self, symbol: str, resolution: str) -> tuple[str | None, int | None]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT first_day FROM candle_coverage WHERE symbol = ? AND resolution = ?",
+                (symbol, resolution),
+            ).fetchone()
+            last = conn.execute(
+                "SELECT MAX(ts) FROM candles WHERE symbol = ? AND resolution = ?",
+                (symbol, resolution),
+            ).fetchone()
+        return (row[0] if row else None), (int(last[0]) if last and last[0] is not None else None)
+
+    def merge(self, symbol: str, resolution: str, candles: list[list[Any]], first_day: str | None = None) -> None:
+        payload = [
+            (symbol, resolution, int(candle[0]), candle[1], candle[2], candle[3], candle[4], candle[5])
+            for candle in candles
+            if len(candle) >= 6
+        ]
+        with self._lock, self._connect() as conn:
+            # The newest candle may still be forming, so later fetches overwrite it.
+            conn.executemany(
+                "INSERT OR REPLACE INTO candles (symbol, resolution, ts, open, high, low, close, volume) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                payload,
+            )
+            if first_day is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO candle_coverage (symbol, resolution, first_day) VALUES (?, ?, ?)",
+                    (symbol, resolution, first_day),
+                )
+
+    def load(self, symbol: str, resolution: str, start_ts: int, end_ts: int) -> list[tuple[Any, ...]]:
+        with self._connect() as conn:
+            return conn.execute(
+                """
+                SELECT ts, open, high, low, close, volume
+                FROM candles
+                WHERE symbol = ? AND resolution = ? AND ts BETWEEN ? AND ?
+                ORDER BY ts
+                """,
+                (symbol, resolution, start_ts, end_ts),
+            ).fetchall()
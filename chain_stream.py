@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+
+SIDES = ("CE", "PE")
+# The SDK strips OI from SymbolUpdate ticks, so OI columns only move when the
+# book is reseeded from REST. Ticks still carry LTP, change % and volume.
+# Reseeds happen once per clock window, so every stored minute has its own OI.
+OI_RESEED_SECONDS = 60.0
+
+
+class ChainBook:
+    def __init__(self, underlying: str, frame: pd.DataFrame, spot: float, strikecount: int, step: int) -> None:
+        self.underlying = underlying
+        self._lock = threading.Lock()
+        self.last_tick = 0.0
+        self.tick_count = 0
+        self._stored_minute = ""
+        self.reseed(frame, spot, strikecount, step)
+
+    def reseed(self, frame: pd.DataFrame, spot: float, strikecount: int, step: int) -> None:
+        strikes = frame["Strike"].to_numpy(dtype=np.int64)
+        symbols = np.vstack([frame[f"{side} Symbol"].fillna("").astype(str).to_numpy() for side in SIDES])
+
+        def legs(suffix: str) -> np.ndarray:
+            return np.vstack([pd.to_numeric(frame[f"{side} {suffix}"], errors="coerce").fillna(0.0).to_numpy(dtype=float) for side in SIDES])
+
+        oi = legs("OI")
+        oi_pct = legs("OI Chg %")
+        denom = 1.0 + oi_pct / 100.0
+        prev_oi = np.where(np.abs(denom) > 1e-11, oi / np.where(denom == 0, 1.0, denom), oi)
+        index = {
+            symbol: (side, row)
+            for side in range(len(SIDES))
+            for row, symbol in enumerate(symbols[side])
+            if symbol
+        }
+
+        with self._lock:
+            self.spot = float(spot)
+            self.strikecount = int(strikecount)
+            self.step = int(step)
+            self._strikes = strikes
+            self._symbols = symbols
+            self._iv = frame["IV"].tolist()
+            self._expiry = frame["Expiry"].to_numpy(dtype=float) if "Expiry" in frame else np.zeros(len(strikes))
+            self._ltp = legs("LTP")
+            self._change = legs("Change")
+            self._volume = legs("Volume")
+            self._oi = oi
+            self._seed_oi = oi.copy()
+            self._seed_oi_pct = oi_pct
+            self._prev_oi = prev_oi
+            self._index = index
+            self.seeded_at = time.time()
+
+    @property
+    def symbols(self) -> set[str]:
+        with self._lock:
+            return set(self._index)
+
+    def needs_reseed(self, spot: float, strikecount: int, step: int) -> bool:
+        if strikecount != self.strikecount or step != self.step:
+            return True
+        if not self.oi_fresh():
+            return True
+        # Re-centre once the live spot has walked two strikes away from the seeded ATM.
+        center = int(self._strikes[len(self._strikes) // 2]) if len(self._strikes) else 0
+        return abs(spot - center) > 2 * step
+
+    def apply_tick(self, message: dict[str, Any]) -> bool:
+        symbol = str(message.get("symbol", ""))
+        with self._lock:
+            if symbol == self.underlying:
+                if "ltp" in message:
+                    self.spot = float(message["ltp"])
+                    self.last_tick = time.time()
+                return True
+
+            loc = self._index.get(symbol)
+            if loc is None:
+                return False
+            side, row = loc
+            if "ltp" in message:
+                self._ltp[side, row] = float(message["ltp"])
+            if "chp" in message:
+                self._change[side, row] = float(message["chp"])
+            if "vol_traded_today" in message:
+                self._volume[side, row] = float(message["vol_traded_today"])
+            oi = message.get("oi", message.get("OI"))
+            if oi is not None:
+                self._oi[side, row] = float(oi)
+            self.last_tick = time.time()
+            self.tick_count += 1
+            return True
+
+    def oi_fresh(self) -> bool:
+        return time.time() // OI_RESEED_SECONDS == self.seeded_at // OI_RESEED_SECONDS
+
+    def claim_minute(self, minute: str) -> bool:
+        # A minute is only stored from a book whose OI was reseeded within it.
+        if not self.oi_fresh():
+            return False
+        with self._lock:
+            if minute == self._stored_minute:
+                return False
+            self._stored_minute = minute
+            return True
+
+    def snapshot(self) -> tuple[float, pd.DataFrame]:
+        with self._lock:
+            spot = self.spot
+            strikes = self._strikes.copy()
+            symbols = self._symbols.copy()
+            iv = list(self._iv)
+            expiry = self._expiry
+            ltp = self._ltp.copy()
+            change = self._change.copy()
+            volume = self._volume.copy()
+            oi = self._oi.copy()
+            seed_oi = self._seed_oi
+            seed_pct = self._seed_oi_pct
+            prev_oi = self._prev_oi
+
+        live_pct = np.divide((oi - prev_oi) * 100.0, prev_oi, out=np.zeros_like(oi), where=prev_oi > 0)
+        oi_pct = np.where(oi == seed_oi, seed_pct, live_pct)
+        oi_chg = np.where((oi > 0) & (oi_pct != 0), oi - prev_oi, 0.0)
+        ce, pe = 0, 1
+        frame = pd.DataFrame(
+            {
+                "Strike": strikes,
+                "IV": iv,
+                "CE Symbol": symbols[ce],
+                "CE Volume": volume[ce],
+                "CE OI": oi[ce],
+                "CE OI Chg": oi_chg[ce],
+                "CE OI Chg %": oi_pct[ce],
+                "CE Change": change[ce],
+                "CE LTP": ltp[ce],
+                "PE Symbol": symbols[pe],
+                "PE LTP": ltp[pe],
+                "PE Change": change[pe],
+                "PE OI Chg %": oi_pct[pe],
+                "PE OI Chg": oi_chg[pe],
+                "PE OI": oi[pe],
+                "PE Volume": volume[pe],
+                "Expiry": expiry,
+            }
+        )
+        return spot, frame
+
+
+class ChainStream:
+    def __init__(self, socket_token: str, socket_factory: Callable[..., Any] | None = None) -> None:
+        self._lock = threading.Lock()
+        self._books: dict[str, ChainBook] = {}
+        self._routes: dict[str, ChainBook] = {}
+        self._subscribed: set[str] = set()
+        self.connected = False
+        self.last_error: Any = None
+
+        if socket_factory is None:
+            from fyers_apiv3.FyersWebsocket import data_ws
+
+            socket_factory = data_ws.FyersDataSocket
+        self._socket_factory = socket_factory
+        self.socket_token = socket_token
+        self._socket = self._open(socket_token)
+        self._socket.connect()
+
+    def _open(self, socket_token: str) -> Any:
+        # write_to_file only makes the SDK run its socket thread as a daemon;
+        # messages still go to on_message.
+        return self._socket_factory(
+            access_token=socket_token,
+            write_to_file=True,
+            log_path="",
+            litemode=False,
+            reconnect=True,
+            on_message=self._on_message,
+            on_error=self._on_error,
+            on_connect=self._on_connect,
+            on_close=self._on_close,
+        )
+
+    def use_token(self, socket_token: str) -> None:
+        """Reconnect with a rolled-over token; books and subscriptions carry over and resubscribe on connect."""
+        if socket_token == self.socket_token:
+            return
+        # The SDK socket is a process-wide singleton, so the old connection has to be closed before it is re-created.
+        self._socket.close_connection()
+        self.connected = False
+        self.socket_token = socket_token
+        self._socket = self._open(socket_token)
+        self._socket.connect()
+
+    def book(self, underlying: str) -> ChainBook | None:
+        with self._lock:
+            return self._books.get(underlying)
+
+    def track(self, underlying: str, frame: pd.DataFrame, spot: float, strikecount: int, step: int) -> ChainBook:
+        with self._lock:
+            book = self._books.get(underlying)
+            if book is None:
+                book = ChainBook(underlying, frame, spot, strikecount, step)
+                self._books[underlying] = book
+            else:
+                book.reseed(frame, spot, strikecount, step)
+            self._routes = {symbol: owner for owner in self._books.values() for symbol in owner.symbols}
+            for owner in self._books.values():
+                self._routes[owner.underlying] = owner
+            wanted = set(self._routes)
+            added = sorted(wanted - self._subscribed)
+            removed = sorted(self._subscribed - wanted)
+            self._subscribed = wanted
+
+        if removed:
+            self._socket.unsubscribe(symbols=removed, data_type="SymbolUpdate")
+        if added and self.connected:
+            self._socket.subscribe(symbols=added, data_type="SymbolUpdate")
+        return book
+
+    def _on_connect(self) -> None:
+        self.connected = True
+        with self._lock:
+            symbols = sorted(self._subscribed)
+        if symbols:
+            self._socket.subscribe(symbols=symbols, data_type="SymbolUpdate")
+
+    def _on_message(self, message: Any) -> None:
+        if not isinstance(message, dict):
+            return
+        book = self._routes.get(str(message.get("symbol", "")))
+        if book is not None:
+            book.apply_tick(message)
+
+    def _on_error(self, message: Any) -> None:
+        self.last_error = message
+
+    def _on_close(self, message: Any) -> None:
+        self.connected = False
+        self.last_error = message
+
+
+_STREAM: ChainStream | None = None
+_STREAM_LOCK = threading.Lock()
+
+
+def chain_stream(socket_token: str) -> ChainStream:
+    """The process-wide tick stream, moved onto socket_token if the token has rolled over since."""
+    global _STREAM
+    with _STREAM_LOCK:
+        if _STREAM is None:
+            _STREAM = ChainStream(socket_token)
+        else:
+            _STREAM.use_token(socket_token)
+        return _STREAM
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import date, datetime, time as dt_time, timedelta
+
+from app import INDEXES, archive_snapshots, backfill_rollups, fetch_snapshots, history_db, normalize_chain, now_ist, store_snapshot, supabase_config
+from fyers_client import FyersDataClient
+from supabase_client import write_queue
+
+
+MARKET_OPEN = dt_time(9, 15)
+MARKET_CLOSE = dt_time(15, 30)
+DEFAULT_STRIKECOUNT = 15
+# Give FYERS a moment to publish the closed minute before polling it.
+SETTLE_SECONDS = 2.0
+
+
+def is_market_open(stamp: datetime) -> bool:
+    return stamp.weekday() < 5 and MARKET_OPEN <= stamp.time() <= MARKET_CLOSE
+
+
+def next_minute(stamp: datetime) -> datetime:
+    return stamp.replace(second=0, microsecond=0) + timedelta(minutes=1)
+
+
+def collect_minute(client: FyersDataClient, index_keys: list[str], strikecount: int, stamp: datetime) -> None:
+    symbols = [INDEXES[key]["symbol"] for key in index_keys]
+    snapshots, errors = fetch_snapshots(client, symbols, strikecount)
+
+    for key in index_keys:
+        cfg = INDEXES[key]
+        symbol = cfg["symbol"]
+        if symbol in errors:
+            print(f"[{key}] {stamp:%H:%M} fetch failed: {errors[symbol]}", flush=True)
+            continue
+        spot, options_chain = snapshots[symbol]
+        frame = normalize_chain(spot, options_chain, cfg["step"], strikecount)
+        if frame.empty:
+            print(f"[{key}] {stamp:%H:%M} no option-chain rows.", flush=True)
+            continue
+        try:
+            store_snapshot(symbol, frame, spot, stamp=stamp)
+        except Exception as exc:
+            print(f"[{key}] {stamp:%H:%M} store failed: {exc}", flush=True)
+            continue
+        print(f"[{key}] {stamp:%H:%M} stored {len(frame)} strikes, spot {spot:,.2f}", flush=True)
+
+    if supabase_config():
+        # Every index for this minute goes out as one bulk upsert per table.
+        queue = write_queue()
+        if not queue.flush(timeout=45.0):
+            print(f"[supabase] {stamp:%H:%M} {queue.pending()} batches still pending", flush=True)
+        elif queue.stats()["last_error"]:
+            print(f"[supabase] {stamp:%H:%M} last error: {queue.stats()['last_error']}", flush=True)
+
+    # Local writes (and Supabase fallbacks) land through the SQLite writer thread.
+    store = history_db()
+    if not store.flush(timeout=30.0):
+        print(f"[sqlite] {stamp:%H:%M} {store.pending()} writes still pending", flush=True)
+    elif store.stats()["last_error"]:
+        print(f"[sqlite] {stamp:%H:%M} last error: {store.stats()['last_error']}", flush=True)
+
+
+def archive_day(day: date, prune: bool = False) -> None:
+    try:
+        counts = archive_snapshots(day, prune=prune)
+    except Exception as exc:
+        print(f"[archive] {day} failed: {exc}", flush=True)
+        return
+    for symbol, rows in counts.items():
+        print(f"[archive] {day} {symbol}: {rows} rows", flush=True)
+    if not counts:
+        print(f"[archive] {day}: no snapshots", flush=True)
+
+
+def run(index_keys: list[str], strikecount: int, once: bool = False, market_hours_only: bool = True, archive: bool = True, prune: bool = False) -> None:
+    client = FyersDataClient.from_env()
+    if once:
+        collect_minute(client, index_keys, strikecount, now_ist().replace(second=0, microsecond=0))
+        return
+
+    archived: date | None = None
+    while True:
+        due = next_minute(now_ist())
+        time.sleep(max((due - now_ist()).total_seconds() + SETTLE_SECONDS, 0.0))
+        try:
+            # Rolls the daily token over ahead of the open instead of on the first failed call.
+            client.ensure_fresh()
+        except Exception as exc:
+            print(f"[auth] token refresh failed: {exc}", flush=True)
+        # The first idle minute after the close rolls the session into the Parquet archive.
+        if archive and due.weekday() < 5 and due.time() > MARKET_CLOSE and archived != due.date():
+            archive_day(due.date(), prune)
+            archived = due.date()
+        if market_hours_only and not is_market_open(due):
+            continue
+        collect_minute(client, index_keys, strikecount, due)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Poll FYERS option chains once a minute and persist snapshots.")
+    parser.add_argument("--indexes", default=",".join(INDEXES), help="Comma-separated keys from INDEXES.")
+    parser.add_argument("--strikecount", type=int, default=DEFAULT_STRIKECOUNT, help="Strikes each side of ATM.")
+    parser.add_argument("--once", action="store_true", help="Collect a single snapshot and exit.")
+    parser.add_argument("--all-hours", action="store_true", help="Keep polling outside market hours.")
+    parser.add_argument("--no-archive", action="store_true", help="Skip the after-close Parquet compaction.")
+    parser.add_argument("--prune", action="store_true", help="Delete archived days from the local SQLite table.")
+    parser.add_argument("--archive", metavar="YYYY-MM-DD", help="Compact one stored day into the archive and exit.")
+    parser.add_argument("--backfill-rollups", action="store_true", help="Rebuild 5m/15m/daily rollups from stored minutes and exit.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.archive:
+        archive_day(date.fromisoformat(args.archive), prune=args.prune)
+        raise SystemExit(0)
+    if args.backfill_rollups:
+        print(f"[rollups] rebuilt from {backfill_rollups()} stored minutes", flush=True)
+        raise SystemExit(0)
+    keys = [key.strip().upper() for key in args.indexes.split(",") if key.strip()]
+    unknown = [key for key in keys if key not in INDEXES]
+    if unknown:
+        raise SystemExit(f"Unknown index keys: {', '.join(unknown)}")
+    run(keys, args.strikecount, once=args.once, market_hours_only=not args.all_hours, archive=not args.no_archive, prune=args.prune)
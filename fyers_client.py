@@ -2,19 +2,29 @@ from __future__ import annotations
 
 import base64
 import hashlib
+import json
 import os
+import threading
+import time
 import tomllib
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as dt_time, timedelta
 from functools import lru_cache
 from pathlib import Path
 from typing import Any
 from urllib.parse import parse_qs, urlparse
+from zoneinfo import ZoneInfo
 
 import pandas as pd
 import pyotp
 import requests
 from fyers_apiv3 import fyersModel
 
+import broker_sim
+from candle_store import CandleStore
+from rate_limit import SCHEDULER
+from single_flight import SingleFlightCache
+
 
 def _load_dotenv_if_present() -> None:
     env_path = Path(__file__).resolve().with_name(".env")
@@ -34,6 +44,18 @@ def _load_dotenv_if_present() -> None:
 
 _load_dotenv_if_present()
 
+IST = ZoneInfo("Asia/Kolkata")
+# FYERS access tokens stop working at the first 06:00 IST after they are issued.
+TOKEN_ROLLOVER_HOUR = 6
+AUTH_ERROR_CODES = {401, -8, -15, -16, -17}
+HISTORY_CACHE_SECONDS = 60.0
+CANDLE_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+
+# Shared by every Streamlit session in the process: identical requests made in
+# the same window wait on one upstream call and reuse its response.
+SHARED_RESPONSES = SingleFlightCache(maxsize=512)
+_CLIENT_LOCK = threading.Lock()
+
 
 def _b64(value: str) -> str:
     return base64.b64encode(str(value).encode()).decode()
@@ -80,7 +102,11 @@ def _read_streamlit_secrets() -> tuple[dict[str, str], str | None]:
         return {}, None
 
     def pick(key: str, nested_key: str | None = None, default: str = "") -> str:
-        value = flat.get(key, "")
+        try:
+            value = flat.get(key, "")
+        except Exception:
+            # st.secrets only parses on first access and raises when no secrets file exists.
+            value = ""
         if value:
             return str(value).strip()
         if nested_key is None:
@@ -127,16 +153,89 @@ def resolve_fyers_credentials() -> dict[str, str]:
 
 
 def fyers_credentials_source() -> str:
+    if broker_sim.enabled():
+        return "broker simulator"
     return resolve_fyers_credentials()["source"]
 
 
+def _token_cache_path() -> Path:
+    default = Path(__file__).resolve().with_name(".fyers_token.json")
+    return Path(os.getenv("FYERS_TOKEN_CACHE", str(default))).expanduser()
+
+
+def _token_expiry(issued_at: datetime) -> datetime:
+    rollover = issued_at.replace(hour=TOKEN_ROLLOVER_HOUR, minute=0, second=0, microsecond=0)
+    return rollover if issued_at < rollover else rollover + timedelta(days=1)
+
+
+def _read_cached_token(fy_id: str, app_id: str) -> tuple[str, datetime] | None:
+    path = _token_cache_path()
+    try:
+        data = json.loads(path.read_text())
+        expires_at = datetime.fromisoformat(data["expires_at"])
+    except Exception:
+        return None
+    if data.get("fy_id") != fy_id or data.get("app_id") != app_id or not data.get("access_token"):
+        return None
+    if datetime.now(IST) >= expires_at:
+        return None
+    return str(data["access_token"]), expires_at
+
+
+def _write_cached_token(fy_id: str, app_id: str, access_token: str, issued_at: datetime) -> datetime:
+    expires_at = _token_expiry(issued_at)
+    path = _token_cache_path()
+    payload = {
+        "fy_id": fy_id,
+        "app_id": app_id,
+        "access_token": access_token,
+        "issued_at": issued_at.isoformat(),
+        "expires_at": expires_at.isoformat(),
+    }
+    try:
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(payload))
+        tmp_path.chmod(0o600)
+        tmp_path.replace(path)
+    except OSError:
+        pass
+    return expires_at
+
+
+def _range_end(resolution: str, now: float) -> int:
+    # Floored to the candle boundary so refreshes within one candle share a request key;
+    # the forming candle starts at that boundary, so it is still included.
+    step = int(resolution) * 60 if resolution.isdigit() else int(HISTORY_CACHE_SECONDS)
+    return int(now // step * step)
+
+
+def _is_auth_error(response: Any) -> bool:
+    if not isinstance(response, dict) or response.get("s") == "ok":
+        return False
+    try:
+        return int(response.get("code", 0)) in AUTH_ERROR_CODES
+    except (TypeError, ValueError):
+        return False
+
+
 @dataclass
 class FyersDataClient:
     fyers: Any
+    credentials: dict[str, str] = field(default_factory=dict, repr=False)
+    expires_at: datetime | None = None
+    candle_store: CandleStore | None = None
+    _auth_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
 
     @classmethod
-    @lru_cache(maxsize=1)
     def from_env(cls) -> "FyersDataClient":
+        with _CLIENT_LOCK:
+            return cls._shared_from_env()
+
+    @classmethod
+    @lru_cache(maxsize=1)
+    def _shared_from_env(cls) -> "FyersDataClient":
+        if broker_sim.enabled():
+            return cls(fyers=broker_sim.simulated_fyers())
         credentials = resolve_fyers_credentials()
         fy_id = credentials["fy_id"]
         app_id = credentials["app_id"]
@@ -151,10 +250,83 @@ class FyersDataClient:
                 "FYERS_REDIRECT_URI, FYERS_PIN, and FYERS_TOTP_KEY."
             )
 
-        access_token = cls._login(fy_id, app_id, app_secret, redirect_uri, pin, totp_key)
+        cached = _read_cached_token(fy_id, app_id)
+        if cached is not None:
+            access_token, expires_at = cached
+        else:
+            access_token, expires_at = cls._fresh_token(credentials)
+        return cls(
+            fyers=cls._model(app_id, access_token),
+            credentials=credentials,
+            expires_at=expires_at,
+            candle_store=CandleStore(),
+        )
+
+    @staticmethod
+    def _model(app_id: str, access_token: str) -> Any:
         client_id = _normalize_client_id(app_id)
-        fyers = fyersModel.FyersModel(client_id=client_id, token=access_token, is_async=False, log_path="")
-        return cls(fyers=fyers)
+        return broker_sim.record_fyers(fyersModel.FyersModel(client_id=client_id, token=access_token, is_async=False, log_path=""))
+
+    @classmethod
+    def _fresh_token(cls, credentials: dict[str, str]) -> tuple[str, datetime]:
+        issued_at = datetime.now(IST)
+        access_token = cls._login(
+            credentials["fy_id"],
+            credentials["app_id"],
+            credentials["app_secret"],
+            credentials["redirect_uri"],
+            credentials["pin"],
+            credentials["totp_key"],
+        )
+        expires_at = _write_cached_token(credentials["fy_id"], credentials["app_id"], access_token, issued_at)
+        return access_token, expires_at
+
+    @property
+    def socket_token(self) -> str:
+        return f"{self.fyers.client_id}:{self.fyers.token}"
+
+    def relogin(self, stale_token: str | None = None) -> None:
+        if not self.credentials:
+            raise RuntimeError("FYERS session expired and no credentials are available to log in again.")
+        with self._auth_lock:
+            # Another thread may already have replaced the token that failed.
+            if stale_token is not None and self.fyers.token != stale_token:
+                return
+            access_token, self.expires_at = self._fresh_token(self.credentials)
+            self.fyers = self._model(self.credentials["app_id"], access_token)
+
+    def ensure_fresh(self) -> None:
+        if self.expires_at is None or datetime.now(IST) < self.expires_at:
+            return
+        self.relogin(self.fyers.token)
+
+    def _call_upstream(self, method: str, data: dict[str, Any], priority: int | None = None) -> dict[str, Any]:
+        fyers = self.fyers
+        SCHEDULER.acquire("fyers", method, priority)
+        response = getattr(fyers, method)(data=data)
+        if _is_auth_error(response) and self.credentials:
+            self.relogin(fyers.token)
+            SCHEDULER.acquire("fyers", method, priority)
+            response = getattr(self.fyers, method)(data=data)
+        return response
+
+    def call(
+        self,
+        method: str,
+        data: dict[str, Any],
+        cache_seconds: float = 0.0,
+        priority: int | None = None,
+    ) -> dict[str, Any]:
+        if cache_seconds <= 0:
+            return self._call_upstream(method, data, priority)
+        window = int(time.time() // cache_seconds)
+        key = (method, json.dumps(data, sort_keys=True, default=str), window)
+        return SHARED_RESPONSES.get(
+            key,
+            lambda: self._call_upstream(method, data, priority),
+            ttl=cache_seconds,
+            keep=lambda response: isinstance(response, dict) and response.get("s") == "ok",
+        )
 
     @staticmethod
     def _login(fy_id: str, app_id: str, app_secret: str, redirect_uri: str, pin: str, totp_key: str) -> str:
@@ -220,24 +392,48 @@ class FyersDataClient:
             raise RuntimeError(response)
         return access_token
 
-    def fetch_history(self, symbol: str, resolution: str, start_date: str, end_date: str) -> pd.DataFrame:
+    def _request_candles(self, symbol: str, resolution: str, range_from: str, range_to: str, date_format: str) -> list[list[Any]]:
         payload = {
             "symbol": symbol,
             "resolution": resolution,
-            "date_format": "1",
-            "range_from": start_date,
-            "range_to": end_date,
+            "date_format": date_format,
+            "range_from": range_from,
+            "range_to": range_to,
             "cont_flag": "1",
         }
-        response = self.fyers.history(data=payload)
+        response = self.call("history", payload, cache_seconds=HISTORY_CACHE_SECONDS)
+        if response.get("s") == "no_data":
+            return []
         if response.get("s") != "ok":
             raise RuntimeError(response.get("message", "FYERS history request failed."))
+        return response.get("candles", [])
+
+    def _cached_candles(self, symbol: str, resolution: str, start_date: str, end_date: str) -> list[Any]:
+        store = self.candle_store
+        start_ts = int(datetime.combine(date.fromisoformat(start_date), dt_time.min, IST).timestamp())
+        end_ts = int(datetime.combine(date.fromisoformat(end_date), dt_time.max, IST).timestamp())
+        first_day, last_ts = store.coverage(symbol, resolution)
+
+        if first_day is None or last_ts is None or start_date < first_day:
+            candles = self._request_candles(symbol, resolution, start_date, end_date, "1")
+            store.merge(symbol, resolution, candles, first_day=min(start_date, first_day or start_date))
+        elif last_ts < end_ts:
+            # Only ask for candles from the last cached one onward; it is
+            # refetched because it may have been captured before it closed.
+            range_to = min(end_ts, _range_end(resolution, time.time()))
+            if range_to >= last_ts:
+                store.merge(symbol, resolution, self._request_candles(symbol, resolution, str(last_ts), str(range_to), "0"))
+        return store.load(symbol, resolution, start_ts, end_ts)
 
-        candles = response.get("candles", [])
+    def fetch_history(self, symbol: str, resolution: str, start_date: str, end_date: str) -> pd.DataFrame:
+        if self.candle_store is not None:
+            candles = self._cached_candles(symbol, resolution, start_date, end_date)
+        else:
+            candles = self._request_candles(symbol, resolution, start_date, end_date, "1")
         if not candles:
-            return pd.DataFrame(columns=["timestamp", "open", "high", "low", "close", "volume"])
+            return pd.DataFrame(columns=CANDLE_COLUMNS)
 
-        df = pd.DataFrame(candles, columns=["timestamp", "open", "high", "low", "close", "volume"])
+        df = pd.DataFrame(candles, columns=CANDLE_COLUMNS)
         df["timestamp"] = pd.to_datetime(df["timestamp"], unit="s", utc=True).dt.tz_convert("Asia/Kolkata")
         for col in ["open", "high", "low", "close", "volume"]:
             df[col] = pd.to_numeric(df[col], errors="coerce")
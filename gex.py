@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import numpy as np
+
+from greeks import RISK_FREE_RATE, gamma
+
+
+# Exposure is quoted per 1% move of the underlying.
+GEX_MOVE = 0.01
+
+
+def _filled(values: np.ndarray) -> np.ndarray:
+    return np.nan_to_num(np.asarray(values, dtype=float), nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def strike_gex(
+    spot: float, ce_gamma: np.ndarray, pe_gamma: np.ndarray, ce_oi: np.ndarray, pe_oi: np.ndarray, units_per_oi: float = 1.0
+) -> np.ndarray:
+    """Net dealer gamma exposure by strike, in rupees per 1% move.
+
+    Uses the usual convention that dealers are long the calls and short the
+    puts the market holds, so CE gamma counts positive and PE gamma negative.
+    units_per_oi is the lot size when a feed reports OI in lots rather than units.
+    """
+    scale = spot * spot * GEX_MOVE * units_per_oi
+    return (_filled(ce_gamma) * _filled(ce_oi) - _filled(pe_gamma) * _filled(pe_oi)) * scale
+
+
+def gex_curve(
+    levels: np.ndarray,
+    strikes: np.ndarray,
+    years: np.ndarray,
+    ce_iv: np.ndarray,
+    pe_iv: np.ndarray,
+    ce_oi: np.ndarray,
+    pe_oi: np.ndarray,
+    units_per_oi: float = 1.0,
+    rate: float = RISK_FREE_RATE,
+) -> np.ndarray:
+    """Total GEX if the underlying moved to each level, holding every contract's IV (sticky strike)."""
+    spot = np.asarray(levels, dtype=float)[:, None]
+    ce = _filled(gamma(spot, strikes, years, np.asarray(ce_iv, dtype=float), rate))
+    pe = _filled(gamma(spot, strikes, years, np.asarray(pe_iv, dtype=float), rate))
+    exposure = ce @ _filled(ce_oi) - pe @ _filled(pe_oi)
+    return exposure * spot[:, 0] ** 2 * GEX_MOVE * units_per_oi
+
+
+def zero_gamma(levels: np.ndarray, curve: np.ndarray, spot: float) -> float | None:
+    """Level where the GEX curve changes sign, interpolated linearly; the crossing nearest spot wins."""
+    sign = np.sign(curve)
+    crossings = np.flatnonzero((sign[:-1] != sign[1:]) & (sign[:-1] != 0) & (sign[1:] != 0))
+    exact = levels[sign == 0]
+    lo, hi = curve[crossings], curve[crossings + 1]
+    points = np.concatenate((levels[crossings] + (levels[crossings + 1] - levels[crossings]) * lo / (lo - hi), exact))
+    if not len(points):
+        return None
+    return float(points[np.argmin(np.abs(points - spot))])
+
+
+def gex_profile(
+    spot: float,
+    strikes: np.ndarray,
+    years: np.ndarray,
+    ce_iv: np.ndarray,
+    pe_iv: np.ndarray,
+    ce_gamma: np.ndarray,
+    pe_gamma: np.ndarray,
+    ce_oi: np.ndarray,
+    pe_oi: np.ndarray,
+    units_per_oi: float = 1.0,
+    width: float = 0.05,
+    points: int = 101,
+) -> dict[str, object]:
+    """GEX by strike at the current spot plus the zero-gamma flip found over spot +/- width."""
+    strikes = np.asarray(strikes, dtype=float)
+    by_strike = strike_gex(spot, ce_gamma, pe_gamma, ce_oi, pe_oi, units_per_oi)
+    levels = spot * np.linspace(1.0 - width, 1.0 + width, points)
+    # IV columns are in percent, as on the chain frame.
+    curve = gex_curve(levels, strikes, years, np.asarray(ce_iv, dtype=float) / 100.0, np.asarray(pe_iv, dtype=float) / 100.0, ce_oi, pe_oi, units_per_oi)
+    return {
+        "by_strike": by_strike,
+        "levels": levels,
+        "curve": curve,
+        "net_gex": float(by_strike.sum()),
+        "gamma_flip": zero_gamma(levels, curve, spot),
+    }
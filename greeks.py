@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+RISK_FREE_RATE = 0.06
+YEAR_SECONDS = 365.0 * 86400.0
+SQRT_2PI = 2.506628274631
+SIDES = ("CE", "PE")
+GREEK_FIELDS = ("IV", "Delta", "Gamma", "Vega", "Theta")
+
+
+def norm_pdf(x: np.ndarray) -> np.ndarray:
+    return np.exp(-0.5 * x * x) / SQRT_2PI
+
+
+def norm_cdf(x: np.ndarray) -> np.ndarray:
+    # Hart's double-precision rational approximation (as given by West), so no SciPy is needed.
+    x = np.asarray(x, dtype=float)
+    z = np.abs(x)
+    tail = np.exp(-0.5 * z * z)
+    num = 3.52624965998911e-02 * z + 0.700383064443688
+    for coef in (6.37396220353165, 33.912866078383, 112.079291497871, 221.213596169931, 220.206867912376):
+        num = num * z + coef
+    den = 8.83883476483184e-02 * z + 1.75566716318264
+    for coef in (16.064177579207, 86.7807322029461, 296.564248779674, 637.333633378831, 793.826512519948, 440.413735824752):
+        den = den * z + coef
+    with np.errstate(divide="ignore", invalid="ignore"):
+        far = tail / (z + 1.0 / (z + 2.0 / (z + 3.0 / (z + 4.0 / (z + 0.65))))) / SQRT_2PI
+    lower = np.where(z < 7.07106781186547, tail * num / den, far)
+    lower = np.where(z > 37.0, 0.0, lower)
+    return np.where(x > 0, 1.0 - lower, lower)
+
+
+def _d1(spot: np.ndarray, strike: np.ndarray, years: np.ndarray, vol: np.ndarray, rate: float) -> np.ndarray:
+    return (np.log(spot / strike) + (rate + 0.5 * vol * vol) * years) / (vol * np.sqrt(years))
+
+
+def call_price(spot: np.ndarray, strike: np.ndarray, years: np.ndarray, vol: np.ndarray, rate: float = RISK_FREE_RATE) -> np.ndarray:
+    d1 = _d1(spot, strike, years, vol, rate)
+    return spot * norm_cdf(d1) - strike * np.exp(-rate * years) * norm_cdf(d1 - vol * np.sqrt(years))
+
+
+def implied_vol(
+    price: np.ndarray,
+    spot: np.ndarray,
+    strike: np.ndarray,
+    years: np.ndarray,
+    is_call: np.ndarray,
+    rate: float = RISK_FREE_RATE,
+    tol: float = 1e-7,
+    max_iter: int = 60,
+) -> np.ndarray:
+    """Black-Scholes implied volatility (decimal) for every contract at once.
+
+    Puts are solved as calls through put-call parity. Each contract starts
+    from the Corrado-Miller estimate and takes Newton steps, falling back to
+    bisection whenever a step leaves its bracket. Prices outside the
+    no-arbitrage bounds return NaN.
+    """
+    price, spot, strike, years = np.broadcast_arrays(*(np.asarray(value, dtype=float) for value in (price, spot, strike, years)))
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), price.shape)
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        discounted = strike * np.exp(-rate * years)
+        target = np.where(is_call, price, price + spot - discounted)
+        valid = (
+            np.isfinite(target) & (spot > 0) & (strike > 0) & (years > 0) & (target > np.maximum(spot - discounted, 0.0)) & (target < spot)
+        )
+        vol = np.full(price.shape, np.nan)
+        idx = np.flatnonzero(valid)
+        if not len(idx):
+            return vol
+
+        s, k, t, c = spot.flat[idx], strike.flat[idx], years.flat[idx], target.flat[idx]
+        k_disc = discounted.flat[idx]
+        half_gap = c - (s - k_disc) / 2.0
+        guess = np.sqrt(2.0 * np.pi / t) / (s + k_disc) * (half_gap + np.sqrt(np.maximum(half_gap * half_gap - (s - k_disc) ** 2 / np.pi, 0.0)))
+        sigma = np.clip(np.where(np.isfinite(guess) & (guess > 0), guess, 0.2), 0.01, 3.0)
+        lo = np.full(len(idx), 1e-4)
+        hi = np.full(len(idx), 5.0)
+        active = np.arange(len(idx))
+        for _ in range(max_iter):
+            sa, ka, ta, ca, sig = s[active], k[active], t[active], c[active], sigma[active]
+            d1 = _d1(sa, ka, ta, sig, rate)
+            diff = call_price(sa, ka, ta, sig, rate) - ca
+            converged = np.abs(diff) <= tol * np.maximum(ca, 1.0)
+            lo[active] = np.where(diff < 0, sig, lo[active])
+            hi[active] = np.where(diff > 0, sig, hi[active])
+            step = sig - diff / (sa * norm_pdf(d1) * np.sqrt(ta))
+            inside = np.isfinite(step) & (step > lo[active]) & (step < hi[active])
+            sigma[active] = np.where(converged, sig, np.where(inside, step, 0.5 * (lo[active] + hi[active])))
+            active = active[~(converged | (hi[active] - lo[active] < 1e-10))]
+            if not len(active):
+                break
+        # Anything still unresolved sits on the solver's bounds, which is not a usable quote.
+        sigma[active] = np.nan
+        sigma[(sigma <= 1e-4 + 1e-9) | (sigma >= 5.0 - 1e-9)] = np.nan
+        vol.flat[idx] = sigma
+    return vol
+
+
+def gamma(spot: np.ndarray, strike: np.ndarray, years: np.ndarray, vol: np.ndarray, rate: float = RISK_FREE_RATE) -> np.ndarray:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return norm_pdf(_d1(spot, strike, years, vol, rate)) / (spot * vol * np.sqrt(years))
+
+
+def greeks(
+    spot: np.ndarray, strike: np.ndarray, years: np.ndarray, vol: np.ndarray, is_call: np.ndarray, rate: float = RISK_FREE_RATE
+) -> dict[str, np.ndarray]:
+    """Delta, gamma, vega per vol point and theta per calendar day; NaN where vol or time is missing."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        root_t = np.sqrt(years)
+        d1 = _d1(spot, strike, years, vol, rate)
+        d2 = d1 - vol * root_t
+        pdf = norm_pdf(d1)
+        carry = rate * strike * np.exp(-rate * years)
+        decay = -(spot * pdf * vol) / (2.0 * root_t)
+        return {
+            "Delta": np.where(is_call, norm_cdf(d1), norm_cdf(d1) - 1.0),
+            "Gamma": pdf / (spot * vol * root_t),
+            "Vega": spot * pdf * root_t / 100.0,
+            "Theta": np.where(is_call, decay - carry * norm_cdf(d2), decay + carry * norm_cdf(-d2)) / 365.0,
+        }
+
+
+def chain_greek_columns(
+    spot: float, strikes: np.ndarray, years: np.ndarray, ltp: np.ndarray, rate: float = RISK_FREE_RATE
+) -> dict[str, np.ndarray]:
+    """IV (in percent, like FYERS reports it) and greeks for both legs of a (2, strikes) LTP grid."""
+    strike_grid = np.broadcast_to(np.asarray(strikes, dtype=float), ltp.shape)
+    years_grid = np.broadcast_to(np.asarray(years, dtype=float), ltp.shape)
+    is_call = np.array([[True], [False]])
+    vol = implied_vol(np.where(ltp > 0, ltp, np.nan), spot, strike_grid, years_grid, is_call, rate)
+    values = {"IV": vol * 100.0, **greeks(float(spot), strike_grid, years_grid, vol, is_call, rate)}
+    return {f"{side} {field}": values[field][leg] for field in GREEK_FIELDS for leg, side in enumerate(SIDES)}
+
+
+def years_to_expiry(expiry_epoch: np.ndarray, now: float, session_close_s: float = 15.5 * 3600.0) -> np.ndarray:
+    # FYERS stamps expiries at different times of day; anchor each to its IST session close.
+    epoch = np.asarray(expiry_epoch, dtype=float)
+    ist_day = np.floor((epoch + 19800.0) / 86400.0)
+    close = ist_day * 86400.0 - 19800.0 + session_close_s
+    return np.where(epoch > 0, (close - now) / YEAR_SECONDS, np.nan)
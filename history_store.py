@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, Sequence
+
+
+BUSY_TIMEOUT_MS = 5_000
+MAX_READERS = 8
+MAX_BATCH_JOBS = 64
+PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA mmap_size=268435456",
+)
+
+# One statement and its parameter rows, run with executemany.
+Statement = tuple[str, Sequence[Sequence[Any]]]
+
+_STORES: dict[Path, "HistoryStore"] = {}
+_STORES_LOCK = threading.Lock()
+
+
+class HistoryStore:
+    """One SQLite file in WAL mode: pooled read connections and a single writer thread.
+
+    The schema runs once when the store is created. Writes are queued and
+    applied in order by the writer, which folds whatever is waiting into one
+    transaction; WAL lets readers keep working on the last committed state
+    meanwhile, so neither side waits on the file lock.
+    """
+
+    def __init__(self, path: Path, init: Callable[[sqlite3.Connection], None] | None = None) -> None:
+        self.path = path
+        self._writer = self._connect()
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        if init is not None:
+            with self._writer:
+                init(self._writer)
+        self._readers: queue.SimpleQueue[sqlite3.Connection] = queue.SimpleQueue()
+        self._queue: queue.Queue[tuple[list[Statement], Future[None]]] = queue.Queue()
+        self._lock = threading.Lock()
+        self.rows_written = 0
+        self.last_error = ""
+        self._thread = threading.Thread(target=self._run, name=f"sqlite-writer-{path.name}", daemon=True)
+        self._thread.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+            conn.execute("PRAGMA query_only=ON")
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            if self._readers.qsize() < MAX_READERS:
+                self._readers.put(conn)
+            else:
+                conn.close()
+
+    def write(self, statements: list[Statement], wait: bool = False) -> Future[None]:
+        """Queue statements to run in one transaction; wait=True blocks until they are committed."""
+        future: Future[None] = Future()
+        self._queue.put((statements, future))
+        if wait:
+            future.result()
+        return future
+
+    def flush(self, timeout: float | None = None) -> bool:
+        done = self.write([])
+        try:
+            done.result(timeout)
+        except TimeoutError:
+            return False
+        return True
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _drain(self) -> list[tuple[list[Statement], Future[None]]]:
+        jobs = [self._queue.get()]
+        while len(jobs) < MAX_BATCH_JOBS:
+            try:
+                jobs.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return jobs
+
+    def _apply(self, jobs: list[tuple[list[Statement], Future[None]]]) -> int:
+        rows = 0
+        with self._writer:
+            for statements, _ in jobs:
+                for sql, params in statements:
+                    self._writer.executemany(sql, params)
+                    rows += len(params)
+        return rows
+
+    def _run(self) -> None:
+        while True:
+            jobs = self._drain()
+            try:
+                rows = self._apply(jobs)
+                if rows:
+                    # A committed write means the file is healthy again.
+                    self._record_error("")
+            except Exception:
+                # One bad job must not take the rest of the batch down with it.
+                rows = 0
+                for job in jobs:
+                    try:
+                        rows += self._apply([job])
+                    except Exception as exc:
+                        self._record_error(f"SQLite write failed: {exc}")
+                        job[1].set_exception(exc)
+            with self._lock:
+                self.rows_written += rows
+            for _, future in jobs:
+                if not future.done():
+                    future.set_result(None)
+
+    def _record_error(self, message: str) -> None:
+        with self._lock:
+            self.last_error = message
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"pending": self.pending(), "rows_written": self.rows_written, "last_error": self.last_error}
+
+
+def history_store(path: Path, init: Callable[[sqlite3.Connection], None] | None = None) -> HistoryStore:
+    with _STORES_LOCK:
+        key = path.resolve()
+        if key not in _STORES:
+            _STORES[key] = HistoryStore(path, init)
+        return _STORES[key]
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+def payout_curve(strikes: np.ndarray, ce_oi: np.ndarray, pe_oi: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Total option-writer payout if the underlying settles at each strike, strikes ascending.
+
+    CE writers owe sum((E - K) * ce_oi) over strikes below E and PE writers
+    owe sum((K - E) * pe_oi) over strikes above it. Prefix sums of OI and
+    OI * strike turn both into E * count - weighted sum, so the whole curve
+    costs one sort plus linear work instead of a pass per candidate.
+    """
+    strikes = np.asarray(strikes, dtype=float)
+    order = np.argsort(strikes, kind="stable")
+    strikes = strikes[order]
+    ce_oi = np.nan_to_num(np.asarray(ce_oi, dtype=float)[order])
+    pe_oi = np.nan_to_num(np.asarray(pe_oi, dtype=float)[order])
+
+    # Exclusive prefix sums for CE (strikes strictly below) and suffix sums for PE (strictly above).
+    ce_count = np.concatenate(([0.0], np.cumsum(ce_oi)[:-1]))
+    ce_weighted = np.concatenate(([0.0], np.cumsum(ce_oi * strikes)[:-1]))
+    pe_count = np.concatenate((np.cumsum(pe_oi[::-1])[::-1][1:], [0.0]))
+    pe_weighted = np.concatenate((np.cumsum((pe_oi * strikes)[::-1])[::-1][1:], [0.0]))
+    pain = (strikes * ce_count - ce_weighted) + (pe_weighted - strikes * pe_count)
+    return strikes, pain
+
+
+def max_pain(strikes: np.ndarray, ce_oi: np.ndarray, pe_oi: np.ndarray) -> float | None:
+    sorted_strikes, pain = payout_curve(strikes, ce_oi, pe_oi)
+    if not len(pain):
+        return None
+    # Ties resolve to the lowest strike, like the legacy scan over an ascending chain.
+    return float(sorted_strikes[int(np.argmin(pain))])
+
+
+def oi_walls(strikes: np.ndarray, ce_oi: np.ndarray, pe_oi: np.ndarray) -> tuple[float | None, float | None]:
+    """(call wall, put wall): the strikes holding the most CE and PE open interest."""
+    strikes = np.asarray(strikes, dtype=float)
+
+    def wall(oi: np.ndarray) -> float | None:
+        oi = np.nan_to_num(np.asarray(oi, dtype=float))
+        if not len(oi) or oi.max() <= 0:
+            return None
+        return float(strikes[oi == oi.max()].min())
+
+    return wall(ce_oi), wall(pe_oi)
+
+
+def chain_levels(strikes: np.ndarray, ce_oi: np.ndarray, pe_oi: np.ndarray) -> dict[str, float | None]:
+    call_wall, put_wall = oi_walls(strikes, ce_oi, pe_oi)
+    has_oi = bool(np.nansum(ce_oi) + np.nansum(pe_oi) > 0)
+    return {"max_pain": max_pain(strikes, ce_oi, pe_oi) if has_oi else None, "call_wall": call_wall, "put_wall": put_wall}
@@ -1,8 +1,10 @@
 import streamlit as st
-import requests
 import pandas as pd
 import time
 
+from broker_sim import dhan_http
+from rate_limit import SCHEDULER
+
 # ──────────────────────────────────────────────
 # CONFIG
 # ──────────────────────────────────────────────
@@ -14,6 +16,9 @@ API_BASE        = "https://api.dhan.co/v2"
 OPTIONCHAIN_URL = f"{API_BASE}/optionchain"
 EXPIRY_LIST_URL = f"{API_BASE}/optionchain/expirylist"
 
+# requests, or the offline simulator / recorder when BROKER_SIM / BROKER_RECORD is set
+HTTP = dhan_http()
+
 UNDERLYING_MAP = {
     "NIFTY":  {"Scrip": 13, "Segments": ["IDX_I", "NSE_FNO"], "step": 50},
     "SENSEX": {"Scrip": 1,  "Segments": ["BSE_FNO", "IDX_I"], "step": 100},
@@ -113,14 +118,16 @@ cfg = UNDERLYING_MAP[st.session_state.index_choice]
 # ──────────────────────────────────────────────
 found_expiry, used_seg = None, None
 for seg in cfg["Segments"]:
-    r_exp = requests.post(EXPIRY_LIST_URL, json={"UnderlyingScrip": cfg["Scrip"], "UnderlyingSeg": seg}, headers=_headers())
+    SCHEDULER.acquire("dhan", "expirylist")
+    r_exp = HTTP.post(EXPIRY_LIST_URL, json={"UnderlyingScrip": cfg["Scrip"], "UnderlyingSeg": seg}, headers=_headers())
     exp_list = r_exp.json().get("data", [])
     if exp_list:
         found_expiry, used_seg = exp_list[0], seg
         break
 
 if found_expiry:
-    r_oc = requests.post(OPTIONCHAIN_URL, json={"UnderlyingScrip": cfg["Scrip"], "UnderlyingSeg": used_seg, "Expiry": found_expiry}, headers=_headers())
+    SCHEDULER.acquire("dhan", "optionchain")
+    r_oc = HTTP.post(OPTIONCHAIN_URL, json={"UnderlyingScrip": cfg["Scrip"], "UnderlyingSeg": used_seg, "Expiry": found_expiry}, headers=_headers())
     data_sec = r_oc.json().get("data", {})
     oc_map   = data_sec.get("oc", {})
     ltp      = float(data_sec.get("last_price") or 0)
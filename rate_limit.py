@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+
+LIVE = 0
+BACKGROUND = 1
+LANE_NAMES = {LIVE: "live", BACKGROUND: "background"}
+
+# (requests per second, burst) per broker and per "broker:endpoint".
+# Several buckets on one key are all enforced, e.g. per-second and per-minute caps.
+DEFAULT_BUDGETS: dict[str, list[tuple[float, float]]] = {
+    "fyers": [(10.0, 10.0), (200.0 / 60.0, 200.0)],
+    "fyers:history": [(1.0, 3.0)],
+    "dhan": [(20.0, 20.0)],
+    "dhan:optionchain": [(1.0 / 3.0, 1.0)],
+    "dhan:expirylist": [(1.0 / 3.0, 1.0)],
+    "kite": [(10.0, 10.0)],
+    "kite:quote": [(1.0, 1.0)],
+}
+
+# Endpoints that feed the live table stay in the default lane; backfill-style
+# reads yield to them when a broker is saturated.
+ENDPOINT_LANES = {
+    "fyers:history": BACKGROUND,
+}
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= 1.0
+
+    def wait_time(self, now: float) -> float:
+        self._refill(now)
+        return 0.0 if self.tokens >= 1.0 else (1.0 - self.tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1.0
+
+
+class RequestScheduler:
+    def __init__(self, budgets: dict[str, list[tuple[float, float]]] | None = None) -> None:
+        self.budgets = DEFAULT_BUDGETS if budgets is None else budgets
+        self._cond = threading.Condition()
+        self._buckets: dict[str, list[TokenBucket]] = {}
+        self._waiting: list[tuple[int, int, str, str]] = []
+        self._seq = itertools.count()
+        self._metrics: dict[str, dict[str, float]] = {}
+
+    def configure(self, budgets: dict[str, list[tuple[float, float]]]) -> None:
+        with self._cond:
+            self.budgets = budgets
+            self._buckets.clear()
+            self._cond.notify_all()
+
+    def _bucket_list(self, key: str) -> list[TokenBucket]:
+        if key not in self._buckets:
+            self._buckets[key] = [TokenBucket(rate, capacity) for rate, capacity in self.budgets.get(key, [])]
+        return self._buckets[key]
+
+    def _buckets_for(self, broker: str, endpoint: str) -> list[TokenBucket]:
+        return self._bucket_list(broker) + self._bucket_list(f"{broker}:{endpoint}")
+
+    def _eligible(self, waiter: tuple[int, int, str, str], now: float) -> bool:
+        priority, seq, broker, endpoint = waiter
+        if not all(bucket.available(now) for bucket in self._buckets_for(broker, endpoint)):
+            return False
+        for other in self._waiting:
+            if other is waiter or other[2] != broker:
+                continue
+            if other[0] < priority:
+                return False
+            if other[0] == priority and other[1] < seq and all(
+                bucket.available(now) for bucket in self._buckets_for(other[2], other[3])
+            ):
+                return False
+        return True
+
+    def acquire(self, broker: str, endpoint: str, priority: int | None = None) -> float:
+        if priority is None:
+            priority = ENDPOINT_LANES.get(f"{broker}:{endpoint}", LIVE)
+        started = time.monotonic()
+        with self._cond:
+            waiter = (priority, next(self._seq), broker, endpoint)
+            self._waiting.append(waiter)
+            try:
+                while True:
+                    now = time.monotonic()
+                    buckets = self._buckets_for(broker, endpoint)
+                    if self._eligible(waiter, now):
+                        for bucket in buckets:
+                            bucket.take(now)
+                        break
+                    delay = max((bucket.wait_time(now) for bucket in buckets), default=0.0)
+                    self._cond.wait(timeout=min(max(delay, 0.005), 0.25))
+            finally:
+                self._waiting.remove(waiter)
+                self._cond.notify_all()
+
+            waited = time.monotonic() - started
+            metrics = self._metrics.setdefault(f"{broker}:{endpoint}", {"granted": 0, "total_wait": 0.0, "max_wait": 0.0})
+            metrics["granted"] += 1
+            metrics["total_wait"] += waited
+            metrics["max_wait"] = max(metrics["max_wait"], waited)
+        return waited
+
+    @contextmanager
+    def slot(self, broker: str, endpoint: str, priority: int | None = None) -> Iterator[float]:
+        yield self.acquire(broker, endpoint, priority)
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        with self._cond:
+            depth: dict[str, dict[str, int]] = {}
+            for priority, _, broker, endpoint in self._waiting:
+                lanes = depth.setdefault(f"{broker}:{endpoint}", {})
+                lanes[LANE_NAMES.get(priority, str(priority))] = lanes.get(LANE_NAMES.get(priority, str(priority)), 0) + 1
+            report: dict[str, dict[str, float]] = {}
+            for key in set(self._metrics) | set(depth):
+                metrics = self._metrics.get(key, {"granted": 0, "total_wait": 0.0, "max_wait": 0.0})
+                granted = metrics["granted"]
+                report[key] = {
+                    "queued_live": depth.get(key, {}).get("live", 0),
+                    "queued_background": depth.get(key, {}).get("background", 0),
+                    "granted": granted,
+                    "avg_wait_ms": (metrics["total_wait"] / granted * 1000.0) if granted else 0.0,
+                    "max_wait_ms": metrics["max_wait"] * 1000.0,
+                }
+            return report
+
+
+SCHEDULER = RequestScheduler()
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, TypeVar
+
+
+T = TypeVar("T")
+
+
+class _InFlight:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlightCache:
+    def __init__(self, maxsize: int = 256, ttl: float = 60.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._values: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._in_flight: dict[Hashable, _InFlight] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(
+        self,
+        key: Hashable,
+        loader: Callable[[], T],
+        ttl: float | None = None,
+        keep: Callable[[T], bool] | None = None,
+    ) -> T:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._values.get(key)
+            if cached is not None and cached[0] > now:
+                self._values.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = _InFlight()
+                self._in_flight[key] = call
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = loader()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+                if call.error is None and (keep is None or keep(call.value)):
+                    self._values[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), call.value)
+                    self._values.move_to_end(key)
+                    while len(self._values) > self.maxsize:
+                        self._values.popitem(last=False)
+            call.done.set()
+        return call.value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "size": len(self._values),
+                "in_flight": len(self._in_flight),
+            }
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import os
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+METRIC_COLUMNS = ("ltp", "ltp_change_pct", "volume", "oi", "oi_change_pct", "oi_change", "iv")
+KEY_COLUMNS = ("snapshot_ts", "strike", "option_type")
+ARCHIVE_SCHEMA = pa.schema(
+    [
+        ("snapshot_ts", pa.timestamp("s", tz="Asia/Kolkata")),
+        ("symbol", pa.dictionary(pa.int8(), pa.string())),
+        ("strike", pa.int32()),
+        ("option_type", pa.dictionary(pa.int8(), pa.string())),
+        ("option_symbol", pa.dictionary(pa.int32(), pa.string())),
+        *((name, pa.float32()) for name in METRIC_COLUMNS),
+    ]
+)
+ROW_GROUP_ROWS = 128_000
+
+
+def default_archive_path() -> Path:
+    default = Path(__file__).resolve().with_name("snapshot_archive")
+    return Path(os.getenv("SNAPSHOT_ARCHIVE", str(default))).expanduser()
+
+
+def partition_path(root: Path, day: date, symbol: str) -> Path:
+    # Exchange prefixes carry a colon, which not every filesystem accepts.
+    return root / f"date={day:%Y-%m-%d}" / f"symbol={symbol.replace(':', '_')}" / "snapshots.parquet"
+
+
+def _normalize(rows: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "snapshot_ts": pd.to_datetime(rows["snapshot_ts"], utc=True).dt.tz_convert("Asia/Kolkata").dt.floor("s"),
+            "symbol": rows["symbol"].astype(str),
+            "strike": pd.to_numeric(rows["strike"]).astype("int32"),
+            "option_type": rows["option_type"].astype(str),
+            "option_symbol": rows["option_symbol"].fillna("").astype(str),
+            **{name: pd.to_numeric(rows[name], errors="coerce").astype("float32") for name in METRIC_COLUMNS},
+        }
+    )
+
+
+def to_table(rows: pd.DataFrame) -> pa.Table:
+    """Snapshot rows (the option_chain_snapshots columns) as an archive table sorted for compression."""
+    # Grouping each contract's minutes together keeps runs of similar values adjacent.
+    frame = _normalize(rows).sort_values(["option_type", "strike", "snapshot_ts"], kind="stable")
+    return pa.Table.from_pandas(frame, schema=ARCHIVE_SCHEMA, preserve_index=False)
+
+
+def write_day(root: Path, day: date, symbol: str, rows: pd.DataFrame) -> int:
+    """Merge one symbol's rows for a day into its partition file and return the archived row count.
+
+    Rows already archived for the same (minute, strike, leg) are replaced, so
+    compacting a day twice is harmless. The file is swapped in atomically.
+    """
+    path = partition_path(root, day, symbol)
+    if path.exists():
+        existing = pq.read_table(path, memory_map=True).to_pandas()
+        rows = pd.concat([_normalize(existing), _normalize(rows)], ignore_index=True).drop_duplicates(list(KEY_COLUMNS), keep="last")
+    table = to_table(rows)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staging = path.with_suffix(".parquet.tmp")
+    pq.write_table(
+        table,
+        staging,
+        compression="zstd",
+        row_group_size=ROW_GROUP_ROWS,
+        use_dictionary=["symbol", "option_type", "option_symbol"],
+        write_statistics=["snapshot_ts", "strike"],
+    )
+    os.replace(staging, path)
+    return table.num_rows
+
+
+def archived_days(root: Path, symbol: str | None = None) -> list[date]:
+    days = []
+    for folder in sorted(root.glob("date=*")):
+        if symbol is None or partition_path(root, date.fromisoformat(folder.name[5:]), symbol).exists():
+            days.append(date.fromisoformat(folder.name[5:]))
+    return days
+
+
+def read_day(root: Path, day: date, symbol: str, columns: list[str] | None = None, strikes: list[int] | None = None) -> pa.Table:
+    """Memory-map one day of one symbol; an empty table when nothing was archived."""
+    path = partition_path(root, day, symbol)
+    if not path.exists():
+        return ARCHIVE_SCHEMA.empty_table().select(columns or ARCHIVE_SCHEMA.names)
+    filters = [("strike", "in", [int(strike) for strike in strikes])] if strikes else None
+    return pq.read_table(path, columns=columns, memory_map=True, filters=filters)
+
+
+def read_day_frame(root: Path, day: date, symbol: str, columns: list[str] | None = None, strikes: list[int] | None = None) -> pd.DataFrame:
+    return read_day(root, day, symbol, columns, strikes).to_pandas()
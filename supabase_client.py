@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+REQUEST_TIMEOUT_S = 20
+FLUSH_INTERVAL_S = 1.0
+MAX_BATCH_ROWS = 5_000
+MAX_ATTEMPTS = 4
+BACKOFF_BASE_S = 1.0
+BACKOFF_CAP_S = 30.0
+MAX_PENDING_BATCHES = 1_000
+
+_SESSION: requests.Session | None = None
+_SESSION_LOCK = threading.Lock()
+_QUEUE: "WriteBehindQueue | None" = None
+_QUEUE_LOCK = threading.Lock()
+
+
+def pooled_session() -> requests.Session:
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _SESSION = session
+        return _SESSION
+
+
+def rest_headers(api_key: str, prefer: str | None = None) -> dict[str, str]:
+    headers = {
+        "apikey": api_key,
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+    }
+    if prefer:
+        headers["Prefer"] = prefer
+    return headers
+
+
+@dataclass(frozen=True)
+class UpsertTarget:
+    url: str
+    api_key: str
+    on_conflict: str
+
+    @property
+    def conflict_columns(self) -> tuple[str, ...]:
+        return tuple(self.on_conflict.split(","))
+
+
+def upsert_rows(target: UpsertTarget, rows: list[dict[str, Any]]) -> None:
+    response = pooled_session().post(
+        target.url,
+        params={"on_conflict": target.on_conflict},
+        headers=rest_headers(target.api_key, "resolution=merge-duplicates"),
+        json=rows,
+        timeout=REQUEST_TIMEOUT_S,
+    )
+    response.raise_for_status()
+
+
+class WriteBehindQueue:
+    def __init__(self) -> None:
+        self._queue: queue.Queue[tuple[UpsertTarget, list[dict[str, Any]], Callable[[list[dict[str, Any]]], None] | None]] = queue.Queue(
+            maxsize=MAX_PENDING_BATCHES
+        )
+        self._lock = threading.Lock()
+        self._idle = threading.Event()
+        self._idle.set()
+        self.rows_written = 0
+        self.rows_fallback = 0
+        self.last_error: str = ""
+        self._thread = threading.Thread(target=self._run, name="supabase-write-behind", daemon=True)
+        self._thread.start()
+
+    def submit(
+        self,
+        target: UpsertTarget,
+        rows: list[dict[str, Any]],
+        fallback: Callable[[list[dict[str, Any]]], None] | None = None,
+    ) -> None:
+        if not rows:
+            return
+        try:
+            with self._lock:
+                self._idle.clear()
+                self._queue.put_nowait((target, rows, fallback))
+        except queue.Full:
+            self._record_error("write-behind queue is full")
+            self._fallback(rows, fallback)
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        return self._idle.wait(timeout)
+
+    def _record_error(self, message: str) -> None:
+        with self._lock:
+            self.last_error = message
+
+    def _fallback(self, rows: list[dict[str, Any]], fallback: Callable[[list[dict[str, Any]]], None] | None) -> None:
+        if fallback is None:
+            return
+        try:
+            fallback(rows)
+            with self._lock:
+                self.rows_fallback += len(rows)
+        except Exception as exc:
+            self._record_error(f"fallback write failed: {exc}")
+
+    def _drain(self) -> list[tuple[UpsertTarget, list[dict[str, Any]], Callable[[list[dict[str, Any]]], None] | None]]:
+        items = [self._queue.get()]
+        deadline = time.monotonic() + FLUSH_INTERVAL_S
+        row_count = len(items[0][1])
+        while row_count < MAX_BATCH_ROWS:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            items.append(item)
+            row_count += len(item[1])
+        return items
+
+    def _run(self) -> None:
+        while True:
+            items = self._drain()
+            batches: dict[UpsertTarget, dict[tuple[Any, ...], dict[str, Any]]] = {}
+            fallbacks: dict[UpsertTarget, Callable[[list[dict[str, Any]]], None] | None] = {}
+            for target, rows, fallback in items:
+                # Postgres rejects an upsert that touches the same key twice, so
+                # later rows for a key replace earlier ones within a batch.
+                merged = batches.setdefault(target, {})
+                for row in rows:
+                    merged[tuple(row.get(col) for col in target.conflict_columns)] = row
+                fallbacks[target] = fallback or fallbacks.get(target)
+
+            for target, merged in batches.items():
+                self._write(target, list(merged.values()), fallbacks[target])
+
+            with self._lock:
+                for _ in items:
+                    self._queue.task_done()
+                if self._queue.unfinished_tasks == 0:
+                    self._idle.set()
+
+    def _write(
+        self,
+        target: UpsertTarget,
+        rows: list[dict[str, Any]],
+        fallback: Callable[[list[dict[str, Any]]], None] | None,
+    ) -> None:
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                upsert_rows(target, rows)
+            except Exception as exc:
+                self._record_error(f"Supabase upsert failed (attempt {attempt + 1}/{MAX_ATTEMPTS}): {exc}")
+                if attempt + 1 < MAX_ATTEMPTS:
+                    time.sleep(min(BACKOFF_BASE_S * (2**attempt), BACKOFF_CAP_S))
+                continue
+            with self._lock:
+                self.rows_written += len(rows)
+                # The backend is reachable again, so an earlier failure is no longer news.
+                self.last_error = ""
+            return
+        self._fallback(rows, fallback)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "pending": self.pending(),
+                "rows_written": self.rows_written,
+                "rows_fallback": self.rows_fallback,
+                "last_error": self.last_error,
+            }
+
+
+def write_queue() -> WriteBehindQueue:
+    global _QUEUE
+    with _QUEUE_LOCK:
+        if _QUEUE is None:
+            _QUEUE = WriteBehindQueue()
+        return _QUEUE
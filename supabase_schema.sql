@@ -17,3 +17,141 @@ CREATE TABLE IF NOT EXISTS public.option_chain_snapshots (
 CREATE INDEX IF NOT EXISTS idx_option_chain_snapshots_lookup
     ON public.option_chain_snapshots(symbol, strike, option_type, snapshot_ts DESC);
 
+
+ALTER TABLE public.option_chain_snapshots
+    ADD COLUMN IF NOT EXISTS option_symbol text;
+
+CREATE TABLE IF NOT EXISTS public.option_chain_summaries (
+    snapshot_ts timestamptz NOT NULL,
+    snapshot_minute text NOT NULL,
+    symbol text NOT NULL,
+    spot double precision,
+    PRIMARY KEY (snapshot_minute, symbol)
+);
+
+CREATE INDEX IF NOT EXISTS idx_option_chain_summaries_lookup
+    ON public.option_chain_summaries(symbol, snapshot_ts DESC);
+
+ALTER TABLE public.option_chain_summaries
+    ADD COLUMN IF NOT EXISTS bias_score double precision;
+
+ALTER TABLE public.option_chain_summaries
+    ADD COLUMN IF NOT EXISTS max_pain double precision,
+    ADD COLUMN IF NOT EXISTS call_wall double precision,
+    ADD COLUMN IF NOT EXISTS put_wall double precision;
+
+ALTER TABLE public.option_chain_summaries
+    ADD COLUMN IF NOT EXISTS net_gex double precision,
+    ADD COLUMN IF NOT EXISTS gamma_flip double precision;
+
+-- Both legs of one strike in a single round-trip, deltas computed next to the data.
+-- Each leg reads its newest p_limit + 1 rows off the lookup index; the extra row seeds lag() and is dropped.
+CREATE OR REPLACE FUNCTION public.strike_history(p_symbol text, p_strike integer, p_limit integer DEFAULT 90)
+RETURNS TABLE (
+    option_type text,
+    snapshot_ts timestamptz,
+    snapshot_minute text,
+    ltp double precision,
+    ltp_change_pct double precision,
+    volume double precision,
+    oi double precision,
+    oi_change_pct double precision,
+    oi_change double precision,
+    iv double precision,
+    volume_delta double precision,
+    oi_delta double precision,
+    oi_pct_delta double precision
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT w.option_type, w.snapshot_ts, w.snapshot_minute, w.ltp, w.ltp_change_pct, w.volume, w.oi,
+        w.oi_change_pct, w.oi_change, w.iv, w.volume_delta, w.oi_delta, w.oi_pct_delta
+    FROM (
+        SELECT s.*,
+            COALESCE(s.volume - lag(s.volume) OVER leg, 0) AS volume_delta,
+            COALESCE(s.oi - lag(s.oi) OVER leg, 0) AS oi_delta,
+            COALESCE(s.oi_change_pct - lag(s.oi_change_pct) OVER leg, 0) AS oi_pct_delta,
+            row_number() OVER (PARTITION BY s.option_type ORDER BY s.snapshot_ts DESC) AS recent
+        FROM unnest(ARRAY['CE', 'PE']) AS side(option_type)
+        CROSS JOIN LATERAL (
+            SELECT c.option_type, c.snapshot_ts, c.snapshot_minute, c.ltp, c.ltp_change_pct, c.volume, c.oi,
+                c.oi_change_pct, c.oi_change, c.iv
+            FROM public.option_chain_snapshots c
+            WHERE c.symbol = p_symbol AND c.strike = p_strike AND c.option_type = side.option_type
+            ORDER BY c.snapshot_ts DESC
+            LIMIT p_limit + 1
+        ) s
+        WINDOW leg AS (PARTITION BY s.option_type ORDER BY s.snapshot_ts)
+    ) w
+    WHERE w.recent <= p_limit
+    ORDER BY w.option_type, w.snapshot_ts;
+$$;
+
+-- 5-minute, 15-minute and daily aggregates per contract, kept current by a trigger on the minute table.
+-- Buckets are aligned to IST; each keeps its closing values, its opening OI and the peak volume seen.
+CREATE TABLE IF NOT EXISTS public.option_chain_rollups (
+    resolution text NOT NULL CHECK (resolution IN ('5m', '15m', '1d')),
+    symbol text NOT NULL,
+    strike integer NOT NULL,
+    option_type text NOT NULL CHECK (option_type IN ('CE', 'PE')),
+    bucket_ts timestamptz NOT NULL,
+    bucket_minute text NOT NULL,
+    first_ts timestamptz NOT NULL,
+    last_ts timestamptz NOT NULL,
+    ltp double precision,
+    ltp_change_pct double precision,
+    volume double precision,
+    oi_open double precision,
+    oi double precision,
+    oi_change_pct double precision,
+    iv double precision,
+    PRIMARY KEY (resolution, symbol, strike, option_type, bucket_ts)
+);
+
+CREATE OR REPLACE FUNCTION public.roll_up_snapshot()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    local_ts timestamp := NEW.snapshot_ts AT TIME ZONE 'Asia/Kolkata';
+    bucket timestamp;
+    width integer;
+    res text;
+BEGIN
+    FOREACH res IN ARRAY ARRAY['5m', '15m', '1d'] LOOP
+        IF res = '1d' THEN
+            bucket := date_trunc('day', local_ts);
+        ELSE
+            width := CASE res WHEN '5m' THEN 5 ELSE 15 END;
+            bucket := date_trunc('hour', local_ts) + make_interval(mins => (extract(minute FROM local_ts)::integer / width) * width);
+        END IF;
+        INSERT INTO public.option_chain_rollups AS r
+            (resolution, symbol, strike, option_type, bucket_ts, bucket_minute, first_ts, last_ts,
+             ltp, ltp_change_pct, volume, oi_open, oi, oi_change_pct, iv)
+        VALUES
+            (res, NEW.symbol, NEW.strike, NEW.option_type, bucket AT TIME ZONE 'Asia/Kolkata',
+             to_char(bucket, 'YYYY-MM-DD HH24:MI'), NEW.snapshot_ts, NEW.snapshot_ts,
+             NEW.ltp, NEW.ltp_change_pct, NEW.volume, NEW.oi, NEW.oi, NEW.oi_change_pct, NEW.iv)
+        ON CONFLICT (resolution, symbol, strike, option_type, bucket_ts) DO UPDATE SET
+            oi_open = CASE WHEN EXCLUDED.first_ts <= r.first_ts THEN EXCLUDED.oi_open ELSE r.oi_open END,
+            first_ts = LEAST(r.first_ts, EXCLUDED.first_ts),
+            ltp = CASE WHEN EXCLUDED.last_ts >= r.last_ts THEN EXCLUDED.ltp ELSE r.ltp END,
+            ltp_change_pct = CASE WHEN EXCLUDED.last_ts >= r.last_ts THEN EXCLUDED.ltp_change_pct ELSE r.ltp_change_pct END,
+            oi = CASE WHEN EXCLUDED.last_ts >= r.last_ts THEN EXCLUDED.oi ELSE r.oi END,
+            oi_change_pct = CASE WHEN EXCLUDED.last_ts >= r.last_ts THEN EXCLUDED.oi_change_pct ELSE r.oi_change_pct END,
+            iv = CASE WHEN EXCLUDED.last_ts >= r.last_ts THEN EXCLUDED.iv ELSE r.iv END,
+            last_ts = GREATEST(r.last_ts, EXCLUDED.last_ts),
+            volume = GREATEST(r.volume, EXCLUDED.volume);
+    END LOOP;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS option_chain_snapshots_rollup ON public.option_chain_snapshots;
+CREATE TRIGGER option_chain_snapshots_rollup
+    AFTER INSERT OR UPDATE ON public.option_chain_snapshots
+    FOR EACH ROW EXECUTE FUNCTION public.roll_up_snapshot();
+
+-- Fills the rollups for minutes stored before the trigger existed.
+-- UPDATE public.option_chain_snapshots SET ltp = ltp;
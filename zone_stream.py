@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict, deque
+from typing import Any
+
+import pandas as pd
+
+
+# (type, low, high, created timestamp), the raw shape both detectors report.
+Zone = tuple[str, float, float, Any]
+
+
+class ZoneStream:
+    """Incremental order-block and FVG state for one candle series.
+
+    push() applies one closed candle in O(lb) for pivots plus the open FVGs it
+    has to check for mitigation, and reproduces what the batch detectors in
+    app.py report for the same candles.
+    """
+
+    def __init__(self, lb: int = 5) -> None:
+        self.lb = lb
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.first_ts: Any = None
+        self.last_ts: Any = None
+        self.highs: deque[float] = deque(maxlen=2 * self.lb + 1)
+        self.lows: deque[float] = deque(maxlen=2 * self.lb + 1)
+        self.recent: deque[tuple[Any, float, float, float, float]] = deque(maxlen=3)
+        self.swing_high: float | None = None
+        self.swing_low: float | None = None
+        self.last_red: tuple[float, float, Any] | None = None
+        self.last_green: tuple[float, float, Any] | None = None
+        self.blocks: list[Zone] = []
+        self.open_gaps: list[Zone] = []
+        # The last view handed out, the forming candle it was built from, and what the caller derived from it.
+        self.view: ZoneStream | None = None
+        self.view_row: tuple[Any, ...] | None = None
+        self.selected: tuple[Any, Any] | None = None
+
+    def clone(self) -> ZoneStream:
+        other = ZoneStream.__new__(ZoneStream)
+        other.__dict__.update(self.__dict__)
+        other.lock = threading.Lock()
+        other.highs = deque(self.highs, maxlen=self.highs.maxlen)
+        other.lows = deque(self.lows, maxlen=self.lows.maxlen)
+        other.recent = deque(self.recent, maxlen=3)
+        other.blocks = list(self.blocks)
+        other.open_gaps = list(self.open_gaps)
+        other.view = other.view_row = other.selected = None
+        return other
+
+    def push(self, ts: Any, open_: float, high: float, low: float, close: float) -> None:
+        previous_close = self.recent[-1][4] if self.recent else close
+        if self.first_ts is None:
+            self.first_ts = ts
+        self.last_ts = ts
+
+        # The centre of a full window is a pivot once lb later candles have closed.
+        self.highs.append(high)
+        self.lows.append(low)
+        if len(self.highs) == self.highs.maxlen:
+            if self.highs[self.lb] == max(self.highs):
+                self.swing_high = self.highs[self.lb]
+            if self.lows[self.lb] == min(self.lows):
+                self.swing_low = self.lows[self.lb]
+
+        if self.swing_high is not None and previous_close <= self.swing_high < close and self.last_red is not None:
+            self.blocks.append(("Bullish OB", *self.last_red))
+            self.swing_high = None
+        if self.swing_low is not None and previous_close >= self.swing_low > close and self.last_green is not None:
+            self.blocks.append(("Bearish OB", *self.last_green))
+            self.swing_low = None
+        if close > open_:
+            self.last_green = (low, high, ts)
+        elif close < open_:
+            self.last_red = (low, high, ts)
+
+        self.open_gaps = [
+            gap for gap in self.open_gaps if not (low <= gap[1] if gap[0] == "Bullish FVG" else high >= gap[2])
+        ]
+        self.recent.append((ts, open_, high, low, close))
+        if len(self.recent) == 3:
+            prior, middle = self.recent[0], self.recent[1]
+            if prior[2] < low and middle[4] > prior[2]:
+                self.open_gaps.append(("Bullish FVG", prior[2], low, ts))
+            elif prior[3] > high and middle[4] < prior[3]:
+                self.open_gaps.append(("Bearish FVG", high, prior[3], ts))
+
+    def sync(self, candles: pd.DataFrame) -> ZoneStream:
+        """Push the candles newer than the last one seen and return a view that includes the forming candle.
+
+        The newest row may still be forming, so it is applied to a clone and
+        only committed once a later candle arrives. Pivots, swings and open
+        gaps all depend on where the window starts, so any change of start
+        (the daily slide included) replays the window from scratch. Otherwise
+        only the tail after the last committed candle is read, and a rerun
+        whose forming candle has not changed gets the same view back.
+        """
+        frame = candles if candles["timestamp"].is_monotonic_increasing else candles.sort_values("timestamp", kind="stable")
+        with self.lock:
+            if frame.empty:
+                self.reset()
+                return self.clone()
+            stamps = frame["timestamp"]
+            start = 0
+            if self.last_ts is not None:
+                start = int(stamps.searchsorted(self.last_ts, side="right"))
+                if not (start and stamps.iloc[0] == self.first_ts and stamps.iloc[start - 1] == self.last_ts):
+                    self.reset()
+                    start = 0
+            rows = list(frame[["timestamp", "open", "high", "low", "close"]].iloc[start:].itertuples(index=False, name=None))
+            for ts, open_, high, low, close in rows[:-1]:
+                self.push(ts, float(open_), float(high), float(low), float(close))
+            forming = rows[-1] if rows else None
+            if len(rows) > 1 or self.view is None or forming != self.view_row:
+                view = self.clone()
+                if forming is not None:
+                    ts, open_, high, low, close = forming
+                    view.push(ts, float(open_), float(high), float(low), float(close))
+                self.view, self.view_row = view, forming
+            return self.view
+
+
+# Least recently used streams are evicted past this; a dropped stream just replays on its next view.
+MAX_STREAMS = 64
+STREAMS: OrderedDict[tuple[str, str, int], ZoneStream] = OrderedDict()
+_STREAMS_LOCK = threading.Lock()
+
+
+def zone_stream(symbol: str, resolution: str, lb: int = 5) -> ZoneStream:
+    with _STREAMS_LOCK:
+        key = (symbol, resolution, lb)
+        if key in STREAMS:
+            STREAMS.move_to_end(key)
+        else:
+            STREAMS[key] = ZoneStream(lb)
+            while len(STREAMS) > MAX_STREAMS:
+                STREAMS.popitem(last=False)
+        return STREAMS[key]